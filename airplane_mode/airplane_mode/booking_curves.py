@@ -0,0 +1,301 @@
+"""
+Flight booking curves.
+
+One row per flight in a plain table, holding the cumulative bookings on
+each day before departure as a packed little-endian uint16 array:
+curve[d] = bookings d days before departure, d = 0..CURVE_DAYS. Days with
+no snapshot are stored as MISSING and forward-filled on read. A flight
+costs a fixed 2 * (CURVE_DAYS + 1) bytes, and any set of flights loads
+with one query into an N x (CURVE_DAYS + 1) NumPy matrix.
+"""
+
+import frappe
+import numpy as np
+from frappe.utils import add_days, cint, getdate, now_datetime, today
+
+from airplane_mode.job_telemetry import record_progress
+
+
+CURVE_TABLE = "__airplane_mode_booking_curve"
+CURVE_DAYS = 180
+CURVE_DTYPE = np.dtype("<u2")
+MISSING = np.iinfo(CURVE_DTYPE).max
+WRITE_BATCH_SIZE = 1000
+PACE_CHECKPOINTS = (180, 120, 90, 60, 30, 14, 7, 3, 1, 0)
+# Origin-destination pair; Airplane Flight.route is the web page URL, not this
+ROUTE_SQL = "CONCAT(IFNULL(flight.source_airport_code, ''), '-', IFNULL(flight.destination_airport_code, ''))"
+
+
+def ensure_curve_table():
+    frappe.db.sql_ddl(f"""CREATE TABLE IF NOT EXISTS `{CURVE_TABLE}` (
+        `flight` VARCHAR(140) NOT NULL PRIMARY KEY,
+        `departure_date` DATE NOT NULL,
+        `airline` VARCHAR(140),
+        `route` VARCHAR(140),
+        `capacity` INT NOT NULL DEFAULT 0,
+        `curve` VARBINARY({CURVE_DTYPE.itemsize * (CURVE_DAYS + 1)}) NOT NULL,
+        `updated_at` DATETIME(6),
+        KEY `departure_date` (`departure_date`),
+        KEY `route_departure` (`route`, `departure_date`),
+        KEY `airline_departure` (`airline`, `departure_date`)
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci ROW_FORMAT=COMPRESSED""")
+
+
+def pack(curve):
+    return np.asarray(curve, dtype=CURVE_DTYPE).tobytes()
+
+
+def unpack(blobs):
+    """Stack packed curves into an N x (CURVE_DAYS + 1) matrix, MISSING kept"""
+    if not blobs:
+        return np.empty((0, CURVE_DAYS + 1), dtype=CURVE_DTYPE)
+    return np.frombuffer(b"".join(bytes(blob) for blob in blobs), dtype=CURVE_DTYPE).reshape(len(blobs), CURVE_DAYS + 1)
+
+
+def fill_missing(curves):
+    """
+    Forward-fill MISSING days in booking order (from CURVE_DAYS down to 0);
+    days before the first snapshot count as 0 bookings.
+    """
+    ordered = curves[:, ::-1]
+    recorded = ordered != MISSING
+    positions = np.where(recorded, np.arange(ordered.shape[1]), 0)
+    np.maximum.accumulate(positions, axis=1, out=positions)
+    filled = np.take_along_axis(ordered, positions, axis=1)
+    filled = np.where(np.maximum.accumulate(recorded, axis=1), filled, 0)
+    return filled[:, ::-1].astype(np.int32)
+
+
+def get_flight_meta(flights=None, from_date=None, to_date=None):
+    conditions, values = ["flight.docstatus < 2"], {}
+    if flights is not None:
+        conditions.append("flight.name IN %(flights)s")
+        values["flights"] = tuple(flights) or ("",)
+    if from_date:
+        conditions.append("flight.date_of_departure >= %(from_date)s")
+        values["from_date"] = getdate(from_date)
+    if to_date:
+        conditions.append("flight.date_of_departure <= %(to_date)s")
+        values["to_date"] = getdate(to_date)
+
+    return frappe.db.sql(f"""
+        SELECT flight.name, flight.date_of_departure, flight.capacity,
+            IFNULL(NULLIF(flight.airline, ''), airplane.airline) AS airline,
+            {ROUTE_SQL} AS route
+        FROM `tabAirplane Flight` flight
+        LEFT JOIN `tabAirplane` airplane ON airplane.name = flight.airplane
+        WHERE {" AND ".join(conditions)} AND flight.date_of_departure IS NOT NULL
+    """, values, as_dict=True)
+
+
+def write_curves(flights, curves):
+    """Upsert packed curves for flight meta rows, in batches"""
+    now = now_datetime()
+    for start in range(0, len(flights), WRITE_BATCH_SIZE):
+        batch = range(start, min(start + WRITE_BATCH_SIZE, len(flights)))
+        placeholders = ", ".join(["(%s, %s, %s, %s, %s, %s, %s)"] * len(batch))
+        values = []
+        for i in batch:
+            flight = flights[i]
+            values.extend([
+                flight.name, flight.date_of_departure, flight.airline, flight.route,
+                cint(flight.capacity), pack(curves[i]), now
+            ])
+
+        frappe.db.sql(f"""
+            INSERT INTO `{CURVE_TABLE}` (flight, departure_date, airline, route, capacity, curve, updated_at)
+            VALUES {placeholders}
+            ON DUPLICATE KEY UPDATE departure_date = VALUES(departure_date), airline = VALUES(airline),
+                route = VALUES(route), capacity = VALUES(capacity), curve = VALUES(curve),
+                updated_at = VALUES(updated_at)
+        """, values)
+
+
+def count_bookings(flights):
+    """Current bookings per flight; cancelled tickets (docstatus 2) are not counted"""
+    if not flights:
+        return {}
+    return dict(frappe.db.sql("""
+        SELECT flight, COUNT(*)
+        FROM `tabAirplane Ticket`
+        WHERE flight IN %(flights)s AND docstatus < 2
+        GROUP BY flight
+    """, {"flights": tuple(flights)}))
+
+
+def record_booking_curves(as_of=None):
+    """
+    Daily snapshot, scheduled via hooks.py: store today's bookings for every
+    flight departing within CURVE_DAYS days at its day-before-departure slot.
+    The table is created here too, in case the patch that creates and
+    backfills it failed.
+    """
+    ensure_curve_table()
+    as_of = getdate(as_of or today())
+
+    flights = get_flight_meta(from_date=as_of, to_date=add_days(as_of, CURVE_DAYS))
+    if not flights:
+        return 0
+
+    names = [flight.name for flight in flights]
+    stored = dict(frappe.db.sql(f"SELECT flight, curve FROM `{CURVE_TABLE}` WHERE flight IN %(flights)s", {"flights": tuple(names)}))
+
+    curves = np.full((len(flights), CURVE_DAYS + 1), MISSING, dtype=CURVE_DTYPE)
+    existing = [i for i, name in enumerate(names) if name in stored]
+    if existing:
+        curves[existing] = unpack([stored[names[i]] for i in existing])
+
+    bookings = count_bookings(names)
+    days_out = np.array([(getdate(flight.date_of_departure) - as_of).days for flight in flights])
+    counts = np.array([bookings.get(name, 0) for name in names])
+    curves[np.arange(len(flights)), days_out] = np.minimum(counts, MISSING - 1)
+
+    write_curves(flights, curves)
+    record_progress(rows=len(flights))
+    return len(flights)
+
+
+def backfill_booking_curves(from_date, to_date=None):
+    """
+    Rebuild curves for flights departing between the dates from ticket
+    creation times. Tickets cancelled later are not counted on any day.
+        bench --site <site> execute airplane_mode.airplane_mode.booking_curves.backfill_booking_curves --kwargs "{'from_date': '2023-01-01'}"
+    """
+    ensure_curve_table()
+    flights = get_flight_meta(from_date=from_date, to_date=to_date or today())
+    if not flights:
+        return 0
+
+    index = {flight.name: i for i, flight in enumerate(flights)}
+    rows = frappe.db.sql("""
+        SELECT ticket.flight, DATEDIFF(flight.date_of_departure, DATE(ticket.creation)) AS days_out, COUNT(*)
+        FROM `tabAirplane Ticket` ticket
+        INNER JOIN `tabAirplane Flight` flight ON flight.name = ticket.flight
+        WHERE ticket.docstatus < 2
+        AND flight.date_of_departure BETWEEN %(from_date)s AND %(to_date)s
+        GROUP BY ticket.flight, days_out
+    """, {"from_date": getdate(from_date), "to_date": getdate(to_date or today())})
+
+    # Daily new bookings, then a cumulative sum in booking order (far to near)
+    daily = np.zeros((len(flights), CURVE_DAYS + 1), dtype=np.int64)
+    for flight, days_out, count in rows:
+        if flight in index:
+            daily[index[flight], min(max(cint(days_out), 0), CURVE_DAYS)] += count
+
+    curves = np.cumsum(daily[:, ::-1], axis=1)[:, ::-1]
+    write_curves(flights, np.minimum(curves, MISSING - 1))
+    frappe.db.commit()
+    return len(flights)
+
+
+def load_curves(from_date=None, to_date=None, airline=None, route=None):
+    """
+    Curves and their flight meta for a departure window, with one query.
+    Returns (meta rows, N x (CURVE_DAYS + 1) int32 matrix, missing days filled).
+    """
+    conditions, values = ["1 = 1"], {}
+    for field, value in (("airline", airline), ("route", route)):
+        if value:
+            conditions.append(f"{field} = %({field})s")
+            values[field] = value
+    if from_date:
+        conditions.append("departure_date >= %(from_date)s")
+        values["from_date"] = getdate(from_date)
+    if to_date:
+        conditions.append("departure_date <= %(to_date)s")
+        values["to_date"] = getdate(to_date)
+
+    rows = frappe.db.sql(f"""
+        SELECT flight, departure_date, airline, route, capacity, curve
+        FROM `{CURVE_TABLE}`
+        WHERE {" AND ".join(conditions)}
+        ORDER BY departure_date, flight
+    """, values, as_dict=True)
+
+    curves = fill_missing(unpack([row.pop("curve") for row in rows]))
+    return rows, curves
+
+
+def group_curves(rows, curves, group_by):
+    """Mean load factor curve per group: {group: (flights, N-day curve)}"""
+    if not rows:
+        return {}
+
+    labels = np.array([row.get(group_by) or "Unassigned" for row in rows], dtype=object).astype(str)
+    capacity = np.array([cint(row.capacity) for row in rows], dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        load = np.where(capacity[:, None] > 0, curves / capacity[:, None], np.nan)
+
+    groups, codes = np.unique(labels, return_inverse=True)
+    grouped = {}
+    for code, group in enumerate(groups):
+        members = load[codes == code]
+        grouped[group] = (len(members), np.nanmean(members, axis=0) if np.isfinite(members).any() else None)
+    return grouped
+
+
+@frappe.whitelist()
+def get_booking_pace(group_by="route", lookback_days=365, upcoming_days=60, airline=None, route=None):
+    """
+    Pace of upcoming flights against history, per route or airline.
+
+    history: mean load factor at each checkpoint for flights that departed
+    in the last lookback_days. upcoming: each flight's load factor today and
+    its pace index (today's load over the historical load at the same
+    number of days before departure; 1.0 means on pace).
+    """
+    if group_by not in ("route", "airline"):
+        frappe.throw("group_by must be route or airline")
+
+    current = getdate(today())
+    hist_rows, hist_curves = load_curves(add_days(current, -cint(lookback_days)), add_days(current, -1), airline, route)
+    history = group_curves(hist_rows, hist_curves, group_by)
+
+    up_rows, up_curves = load_curves(current, add_days(current, cint(upcoming_days)), airline, route)
+    days_out = np.array([(getdate(row.departure_date) - current).days for row in up_rows], dtype=np.int64)
+    today_bookings = up_curves[np.arange(len(up_rows)), np.clip(days_out, 0, CURVE_DAYS)] if up_rows else np.array([])
+
+    upcoming = {}
+    for i, row in enumerate(up_rows):
+        group = row.get(group_by) or "Unassigned"
+        capacity = cint(row.capacity)
+        load = today_bookings[i] / capacity if capacity else None
+        baseline = history.get(group, (0, None))[1]
+        expected = baseline[min(days_out[i], CURVE_DAYS)] if baseline is not None else None
+        upcoming.setdefault(group, []).append({
+            "flight": row.flight,
+            "departure_date": str(row.departure_date),
+            "days_out": int(days_out[i]),
+            "bookings": int(today_bookings[i]),
+            "load_factor": round(float(load), 4) if load is not None else None,
+            "pace_index": round(float(load / expected), 3) if load is not None and expected else None
+        })
+
+    return {
+        "group_by": group_by,
+        "checkpoints": list(PACE_CHECKPOINTS),
+        "history": {
+            group: {
+                "flights": flights,
+                "load_factor": [round(float(curve[d]), 4) for d in PACE_CHECKPOINTS] if curve is not None else None
+            }
+            for group, (flights, curve) in history.items()
+        },
+        "upcoming": upcoming
+    }
+
+
+def get_storage_stats():
+    """Row count and on-disk size of the curve table"""
+    stats = frappe.db.sql("""
+        SELECT table_rows, data_length, index_length
+        FROM information_schema.tables
+        WHERE table_schema = DATABASE() AND table_name = %s
+    """, CURVE_TABLE, as_dict=True)
+    stats = stats[0] if stats else {}
+    return {
+        "flights": frappe.db.sql(f"SELECT COUNT(*) FROM `{CURVE_TABLE}`")[0][0],
+        "bytes_per_curve": CURVE_DTYPE.itemsize * (CURVE_DAYS + 1),
+        "data_bytes": cint(stats.get("data_length")),
+        "index_bytes": cint(stats.get("index_length"))
+    }
@@ -0,0 +1,202 @@
+"""
+Crew roster index.
+
+Every crew member's flights are kept as an interval tree over
+[departure, departure + duration). A flight save checks each of its crew
+against their cached tree in O(log n + overlaps), instead of scanning every
+flight. Trees are cached per crew member, dropped after commit whenever a
+flight they are (or were) on changes, and rebuilt with one query on the
+next lookup.
+
+validate_roster() builds the trees for a whole date range and lists every
+double booking; it backs the validate-crew-roster bench command.
+"""
+
+from datetime import datetime, timedelta
+
+import frappe
+from frappe import _
+from frappe.utils import cint, format_datetime, get_datetime, getdate
+
+
+ROSTER_KEY = "airplane_mode_crew_roster"
+EPOCH = datetime(1970, 1, 1)
+# A flight with no duration still blocks its crew for a minute
+MIN_DURATION = 60
+
+
+class IntervalTree:
+    """
+    Static augmented interval tree over half-open [start, end) intervals.
+    Intervals are sorted by start and the tree is implicit: the node for
+    a slice [lo, hi) is its midpoint, and max_end[mid] is the largest end
+    in that slice, so whole subtrees ending before a query are skipped.
+    """
+
+    def __init__(self, intervals):
+        intervals = sorted(intervals)
+        self.starts = [interval[0] for interval in intervals]
+        self.ends = [interval[1] for interval in intervals]
+        self.keys = [interval[2] for interval in intervals]
+        self.max_end = list(self.ends)
+        self._build(0, len(intervals))
+
+    def _build(self, lo, hi):
+        if lo >= hi:
+            return None
+        mid = (lo + hi) // 2
+        for child in (self._build(lo, mid), self._build(mid + 1, hi)):
+            if child is not None and self.max_end[child] > self.max_end[mid]:
+                self.max_end[mid] = self.max_end[child]
+        return mid
+
+    def __len__(self):
+        return len(self.starts)
+
+    def overlaps(self, start, end):
+        """Keys of every interval overlapping [start, end), in start order"""
+        found = []
+        stack = [(0, len(self.starts))]
+        while stack:
+            lo, hi = stack.pop()
+            if lo >= hi:
+                continue
+            mid = (lo + hi) // 2
+            if self.max_end[mid] <= start:
+                continue
+            # Right subtree and mid start at or after starts[mid]
+            if self.starts[mid] < end:
+                stack.append((mid + 1, hi))
+                if self.ends[mid] > start:
+                    found.append((self.starts[mid], self.keys[mid]))
+            stack.append((lo, mid))
+        return [key for _, key in sorted(found)]
+
+
+def to_seconds(value):
+    return int((value - EPOCH).total_seconds())
+
+
+def flight_interval(date_of_departure, time_of_departure, duration):
+    """[start, end) of a flight in seconds, or None without a departure date"""
+    if not date_of_departure:
+        return None
+    start = get_datetime(f"{getdate(date_of_departure)} {time_of_departure or '00:00:00'}")
+    start = to_seconds(start)
+    return start, start + max(cint(duration), MIN_DURATION)
+
+
+def load_assignments(crew_members=None, from_date=None, to_date=None):
+    """Crew assignments of every flight that is not cancelled, with one query"""
+    conditions, values = ["crew.parenttype = 'Airplane Flight'", "flight.docstatus < 2",
+                          "IFNULL(flight.status, '') != 'Cancelled'"], {}
+    if crew_members is not None:
+        conditions.append("crew.crew_member IN %(crew_members)s")
+        values["crew_members"] = tuple(crew_members) or ("",)
+    if from_date:
+        conditions.append("flight.date_of_departure >= %(from_date)s")
+        values["from_date"] = getdate(from_date)
+    if to_date:
+        conditions.append("flight.date_of_departure <= %(to_date)s")
+        values["to_date"] = getdate(to_date)
+
+    return frappe.db.sql(f"""
+        SELECT crew.crew_member, flight.name AS flight, flight.date_of_departure,
+            flight.time_of_departure, flight.duration
+        FROM `tabFlight Crew` crew
+        INNER JOIN `tabAirplane Flight` flight ON flight.name = crew.parent
+        WHERE {" AND ".join(conditions)}
+    """, values, as_dict=True)
+
+
+def build_trees(assignments):
+    intervals = {}
+    for row in assignments:
+        interval = flight_interval(row.date_of_departure, row.time_of_departure, row.duration)
+        if interval:
+            intervals.setdefault(row.crew_member, set()).add((*interval, row.flight))
+    return {member: IntervalTree(rows) for member, rows in intervals.items()}
+
+
+def get_rosters(crew_members):
+    """{crew member: IntervalTree}, from the cache where possible"""
+    crew_members = list({member for member in crew_members if member})
+    cache = frappe.cache()
+
+    rosters, missing = {}, []
+    for member in crew_members:
+        tree = cache.hget(ROSTER_KEY, member)
+        if tree is None:
+            missing.append(member)
+        else:
+            rosters[member] = tree
+
+    if missing:
+        built = build_trees(load_assignments(missing))
+        for member in missing:
+            rosters[member] = built.get(member) or IntervalTree([])
+            cache.hset(ROSTER_KEY, member, rosters[member])
+
+    return rosters
+
+
+def validate_flight_crew(doc):
+    """Throw when a crew member is listed twice or already flies during this flight"""
+    members = [row.crew_member for row in doc.get("flight_crew") or [] if row.crew_member]
+    duplicates = sorted({member for member in members if members.count(member) > 1})
+    if duplicates:
+        frappe.throw(_("Crew member {0} is listed more than once").format(", ".join(duplicates)))
+
+    interval = flight_interval(doc.date_of_departure, doc.time_of_departure, doc.duration)
+    if not members or not interval or doc.docstatus == 2 or doc.status == "Cancelled":
+        return
+
+    conflicts = []
+    for member, tree in get_rosters(members).items():
+        for flight in tree.overlaps(*interval):
+            if flight != doc.name:
+                conflicts.append(_("{0} is already on flight {1}").format(member, flight))
+
+    if conflicts:
+        frappe.throw(
+            "<br>".join(conflicts),
+            title=_("Crew double booked between {0} and {1}").format(
+                format_datetime(EPOCH + timedelta(seconds=interval[0])),
+                format_datetime(EPOCH + timedelta(seconds=interval[1]))
+            )
+        )
+
+
+def invalidate_flight_crew(doc, method=None):
+    """Airplane Flight doc event: drop the rosters of its old and new crew after commit"""
+    members = {row.crew_member for row in doc.get("flight_crew") or []}
+    before = doc.get_doc_before_save() if hasattr(doc, "get_doc_before_save") else None
+    if before:
+        members.update(row.crew_member for row in before.get("flight_crew") or [])
+    members = [member for member in members if member]
+
+    if members:
+        frappe.db.after_commit.add(lambda: frappe.cache().hdel(ROSTER_KEY, members))
+
+
+def validate_roster(from_date, to_date):
+    """
+    Every double booking among flights departing between the dates, as
+    {"crew_member", "flight", "overlaps_with"} pairs, each pair listed once.
+    """
+    trees = build_trees(load_assignments(from_date=from_date, to_date=to_date))
+
+    conflicts = []
+    for member, tree in sorted(trees.items()):
+        for start, end, flight in zip(tree.starts, tree.ends, tree.keys):
+            for other in tree.overlaps(start, end):
+                if other > flight:
+                    conflicts.append({"crew_member": member, "flight": flight, "overlaps_with": other})
+
+    return {
+        "from_date": str(getdate(from_date)),
+        "to_date": str(getdate(to_date)),
+        "crew_members": len(trees),
+        "assignments": sum(len(tree) for tree in trees.values()),
+        "conflicts": conflicts
+    }
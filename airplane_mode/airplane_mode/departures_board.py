@@ -0,0 +1,161 @@
+"""
+Departures board.
+
+Published flights departing within HORIZON_HOURS are kept in one cache
+hash, one field per flight, so a doc event can add, move or drop a single
+flight without rebuilding the board. Readers filter the hash down to the
+next N hours per airport, so board screens and the /flights page never
+query the database once the board is warm.
+
+Gate, status and schedule changes are pushed to open boards over
+realtime after commit, and the cached /flights page is dropped so the
+next guest render picks them up.
+"""
+
+import frappe
+from frappe.realtime import get_website_room
+from frappe.utils import add_to_date, cint, get_datetime, getdate, now_datetime
+
+from airplane_mode.airplane_mode.flight_page_cache import invalidate_flight_list
+from airplane_mode.job_telemetry import record_progress
+
+
+BOARD_KEY = "airplane_mode_departures_board"
+BUILT_KEY = "airplane_mode_departures_board_built"
+HORIZON_HOURS = 48
+DEFAULT_WINDOW_HOURS = 12
+REALTIME_EVENT = "departures_board"
+# Fields whose change is worth a push to the screens
+PUSHED_FIELDS = ("departure", "gate_number", "status", "destination_airport_code", "source_airport")
+
+
+def fetch_board_rows(flights=None, until=None):
+    conditions, values = ["flight.is_published = 1"], {}
+    if flights:
+        conditions.append("flight.name IN %(flights)s")
+        values["flights"] = tuple(flights)
+    else:
+        conditions.append("flight.date_of_departure BETWEEN %(from_date)s AND %(to_date)s")
+        values.update(from_date=getdate(now_datetime()), to_date=getdate(until))
+
+    rows = frappe.db.sql(f"""
+        SELECT flight.name AS flight, flight.docstatus, flight.status, flight.route,
+            IFNULL(NULLIF(flight.airline, ''), airplane.airline) AS airline,
+            flight.source_airport, flight.source_airport_code,
+            flight.destination_airport, flight.destination_airport_code,
+            flight.date_of_departure, flight.time_of_departure, flight.duration, flight.gate_number
+        FROM `tabAirplane Flight` flight
+        LEFT JOIN `tabAirplane` airplane ON airplane.name = flight.airplane
+        WHERE {" AND ".join(conditions)}
+    """, values, as_dict=True)
+
+    return [board_row(row) for row in rows if row.date_of_departure]
+
+
+def board_row(row):
+    departure = get_datetime(f"{row.date_of_departure} {row.time_of_departure or '00:00:00'}")
+    return {
+        "flight": row.flight,
+        "airline": row.airline,
+        "route": row.route,
+        "source_airport": row.source_airport,
+        "source_airport_code": row.source_airport_code,
+        "destination_airport": row.destination_airport,
+        "destination_airport_code": row.destination_airport_code,
+        "departure": departure.strftime("%Y-%m-%d %H:%M:%S"),
+        "duration": row.duration,
+        "gate_number": row.gate_number,
+        "status": "Cancelled" if row.docstatus == 2 else row.status
+    }
+
+
+def rebuild_board():
+    """
+    Reload every flight departing within HORIZON_HOURS. Scheduled hourly via
+    hooks.py, so the horizon always covers the largest window served.
+    """
+    now = now_datetime()
+    until = add_to_date(now, hours=HORIZON_HOURS)
+    rows = {row["flight"]: row for row in fetch_board_rows(until=until)
+            if now <= get_datetime(row["departure"]) <= until}
+
+    cache = frappe.cache()
+    stale = [frappe.safe_decode(name) for name in cache.hkeys(BOARD_KEY) if frappe.safe_decode(name) not in rows]
+    if stale:
+        cache.hdel(BOARD_KEY, stale)
+    for name, row in rows.items():
+        cache.hset(BOARD_KEY, name, row)
+    cache.set_value(BUILT_KEY, str(until), expires_in_sec=2 * HORIZON_HOURS * 60 * 60)
+
+    record_progress(rows=len(rows))
+    return len(rows)
+
+
+def get_board_rows():
+    """All cached board rows, rebuilding the board when it has expired"""
+    if not frappe.cache().get_value(BUILT_KEY):
+        rebuild_board()
+    return list(frappe.cache().hgetall(BOARD_KEY).values())
+
+
+def get_board(airport=None, hours=DEFAULT_WINDOW_HOURS):
+    """{airport: [rows]} for departures in the next `hours`, ordered by departure time"""
+    now = now_datetime()
+    until = add_to_date(now, hours=min(max(cint(hours), 1), HORIZON_HOURS))
+
+    board = {}
+    for row in sorted(get_board_rows(), key=lambda row: (row["departure"], row["flight"])):
+        if airport and row["source_airport"] != airport:
+            continue
+        if now <= get_datetime(row["departure"]) <= until:
+            board.setdefault(row["source_airport"] or "Unassigned", []).append(row)
+    return board
+
+
+@frappe.whitelist(allow_guest=True)
+def get_departures(airport=None, hours=DEFAULT_WINDOW_HOURS):
+    """Board for screens and the /flights page; served from cache"""
+    return {
+        "generated_at": str(now_datetime()),
+        "hours": min(max(cint(hours), 1), HORIZON_HOURS),
+        "airports": get_board(airport, hours)
+    }
+
+
+def update_flight(doc, method=None):
+    """Airplane Flight doc event: refresh this flight's board row once the change commits"""
+    flight, deleted = doc.name, method == "on_trash"
+    frappe.db.after_commit.add(lambda: apply_flight_change(flight, deleted))
+
+
+def apply_flight_change(flight, deleted=False):
+    try:
+        cache = frappe.cache()
+        previous = cache.hget(BOARD_KEY, flight)
+
+        row = None
+        if not deleted:
+            rows = fetch_board_rows(flights=[flight])
+            now = now_datetime()
+            if rows and now <= get_datetime(rows[0]["departure"]) <= add_to_date(now, hours=HORIZON_HOURS):
+                row = rows[0]
+
+        if row:
+            cache.hset(BOARD_KEY, flight, row)
+        elif previous:
+            cache.hdel(BOARD_KEY, flight)
+
+        if previous == row:
+            return
+
+        invalidate_flight_list()
+        if row and previous and all(row.get(field) == previous.get(field) for field in PUSHED_FIELDS):
+            return
+
+        frappe.publish_realtime(
+            REALTIME_EVENT,
+            {"action": "update" if row else "remove", "flight": flight, "row": row, "previous": previous},
+            room=get_website_room()
+        )
+    except Exception as e:
+        frappe.log_error(f"Departures board update failed for {flight}: {str(e)}", "Departures Board")
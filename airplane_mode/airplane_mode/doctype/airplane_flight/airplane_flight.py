@@ -1,6 +1,9 @@
 import frappe
 from frappe.website.website_generator import WebsiteGenerator
 from datetime import datetime
+from airplane_mode.airplane_mode.crew_roster import validate_flight_crew
+from airplane_mode.job_telemetry import record_progress
+from airplane_mode.reference_cache import get_reference_value
 
 class AirplaneFlight(WebsiteGenerator):
     """Tracks a single flight and exposes it as a web page."""
@@ -9,9 +12,18 @@ class AirplaneFlight(WebsiteGenerator):
         today = datetime.today()
         date_part = today.strftime("%m-%Y")
         count = frappe.db.count("Airplane Flight") + 1
-        prefix = frappe.get_value("Airplane", self.airplane, "airline").upper()
+        prefix = get_reference_value("Airplane", self.airplane, "airline").upper()
         self.name = f"{prefix}-{date_part}-{str(count).zfill(5)}"
 
+    def validate(self):
+        # WebsiteGenerator.validate sets the route the flight page is served at
+        super().validate()
+        validate_flight_crew(self)
+
+    def get_context(self, context):
+        # Guest HTML is cached by flight_page_cache, keyed on modified
+        context.no_cache = 1
+
     def on_submit(self):
         self.db_set("status", "Completed")
 
@@ -140,6 +152,7 @@ def recalculate_all_flight_occupancy():
         flight_doc.calculate_occupancy()
     
     frappe.db.commit()
+    record_progress(rows=len(flights))
     return f"Updated occupancy for {len(flights)} flights"
 
 def sync_gate_to_tickets(doc, method=None):
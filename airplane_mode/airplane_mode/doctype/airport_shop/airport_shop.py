@@ -4,6 +4,8 @@
 import frappe
 from frappe.model.document import Document
 
+from airplane_mode.permission_context import get_permission_context
+
 
 class AirportShop(Document):
 	pass
@@ -18,7 +20,7 @@ def get_permission_query_conditions(user):
 		user = frappe.session.user
 	
 	# If user is Administrator or System Manager, show all records
-	if user == "Administrator" or "System Manager" in frappe.get_roles(user):
+	if get_permission_context(user).is_system_manager:
 		return ""
 	
 	# For other users, you can add custom conditions here
@@ -40,7 +42,7 @@ def has_permission(doc, user=None, permission_type=None):
 		user = frappe.session.user
 	
 	# Administrator and System Manager have full access
-	if user == "Administrator" or "System Manager" in frappe.get_roles(user):
+	if get_permission_context(user).is_system_manager:
 		return True
 	
 	# Add custom permission logic here if needed
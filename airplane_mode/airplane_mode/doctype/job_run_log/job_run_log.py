@@ -0,0 +1,17 @@
+# Copyright (c) 2026, nandhakishore and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+
+
+class JobRunLog(Document):
+	"""One scheduled job run, written in bulk by airplane_mode.job_telemetry"""
+
+	@staticmethod
+	def clear_old_logs(days=90):
+		from frappe.query_builder import Interval
+		from frappe.query_builder.functions import Now
+
+		table = frappe.qb.DocType("Job Run Log")
+		frappe.db.delete(table, filters=(table.creation < (Now() - Interval(days=days))))
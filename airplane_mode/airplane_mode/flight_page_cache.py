@@ -0,0 +1,180 @@
+"""
+Rendered HTML cache for the public flight pages.
+
+FlightPageRenderer is registered as a page_renderer in hooks.py and runs
+before Frappe's own renderers. For guests it serves /flights and
+/flights/<flight> from cache, and renders through the standard
+TemplatePage / DocumentPage only on a miss.
+
+Flight pages are keyed by flight name, modified and language. A small
+route index (route -> name, modified) means a hit costs no database
+query. Airplane Flight doc events drop the flight's index entry and page
+after commit. warm_flight_pages() pre-renders the next day's departures.
+"""
+
+import frappe
+from frappe.utils import add_days, getdate, today
+from frappe.website.page_renderers.base_renderer import BaseRenderer
+
+from airplane_mode.job_telemetry import record_progress
+
+
+LIST_ROUTE = "flights"
+ROUTES_KEY = "airplane_mode_flight_page_routes"
+# Unknown routes are remembered in their own expiring keys, so 404 probes
+# stay off the database without growing the route index
+MISSING_ROUTE_KEY = "airplane_mode_flight_page_missing_route"
+MISSING_ROUTE_TTL = 5 * 60
+PAGE_KEY = "airplane_mode_flight_page"
+LIST_KEY = "airplane_mode_flight_list_page"
+PAGE_TTL = 24 * 60 * 60
+# The list is a time window, so it also ages out on its own
+LIST_TTL = 5 * 60
+REFRESH_FLAG = "airplane_mode_refresh_flight_pages"
+
+
+class FlightPageRenderer(BaseRenderer):
+    def can_render(self):
+        path = (self.path or "").strip("/")
+        if path != LIST_ROUTE and not path.startswith(f"{LIST_ROUTE}/"):
+            return False
+        if frappe.session.user != "Guest" or not is_cacheable_request():
+            return False
+
+        self.route = path
+        self.flight = None if path == LIST_ROUTE else get_route_entry(path)
+        return path == LIST_ROUTE or self.flight is not None
+
+    def render(self):
+        key = list_key() if self.flight is None else page_key(self.flight["name"], self.flight["modified"])
+        cache = frappe.cache()
+
+        html = None if frappe.flags.get(REFRESH_FLAG) else cache.get_value(key)
+        if html is not None:
+            return self.build_response(html, headers={"X-Page-Cache": "hit"})
+
+        response = render_uncached(self.route, self.http_status_code)
+        if response.status_code != 200:
+            return response
+
+        html = response.get_data(as_text=True)
+        cache.set_value(key, html, expires_in_sec=LIST_TTL if self.flight is None else PAGE_TTL)
+        return self.build_response(html, headers={"X-Page-Cache": "miss"})
+
+
+def is_cacheable_request():
+    request = getattr(frappe.local, "request", None)
+    return request is None or (request.method == "GET" and not request.query_string)
+
+
+def render_uncached(route, http_status_code=None):
+    from frappe.website.page_renderers.document_page import DocumentPage
+    from frappe.website.page_renderers.template_page import TemplatePage
+
+    renderer = TemplatePage(route, http_status_code) if route == LIST_ROUTE else DocumentPage(route, http_status_code)
+    if not renderer.can_render():
+        frappe.throw(f"No page found for {route}", frappe.DoesNotExistError)
+    return renderer.render()
+
+
+def page_key(name, modified):
+    return f"{PAGE_KEY}:{name}:{modified}:{frappe.local.lang}"
+
+
+def list_key():
+    return f"{LIST_KEY}:{frappe.local.lang}"
+
+
+def get_route_entry(route):
+    """(name, modified) of the published flight at a route, from the route index"""
+    cache = frappe.cache()
+    entry = cache.hget(ROUTES_KEY, route)
+    if entry is not None:
+        return entry
+    if cache.get_value(f"{MISSING_ROUTE_KEY}:{route}"):
+        return None
+
+    flight = frappe.db.get_value(
+        "Airplane Flight",
+        {"route": route, "is_published": 1, "docstatus": ["<", 2]},
+        ["name", "modified"],
+        as_dict=True
+    )
+    if not flight:
+        cache.set_value(f"{MISSING_ROUTE_KEY}:{route}", 1, expires_in_sec=MISSING_ROUTE_TTL)
+        return None
+
+    entry = {"name": flight.name, "modified": str(flight.modified)}
+    cache.hset(ROUTES_KEY, route, entry)
+    return entry
+
+
+def invalidate_flight_page(doc, method=None):
+    """Airplane Flight doc event: drop the flight's cached page and index entries after commit"""
+    routes = {doc.route}
+    before = doc.get_doc_before_save() if hasattr(doc, "get_doc_before_save") else None
+    if before:
+        routes.add(before.route)
+    routes = [route.strip("/") for route in routes if route]
+
+    frappe.db.after_commit.add(lambda: invalidate_routes(routes))
+
+
+def invalidate_routes(routes):
+    """Drop cached pages and route index entries for flight routes, and the list"""
+    cache = frappe.cache()
+    for route in routes:
+        entry = cache.hget(ROUTES_KEY, route)
+        if entry:
+            cache.delete_value(page_key(entry["name"], entry["modified"]))
+        cache.delete_value(f"{MISSING_ROUTE_KEY}:{route}")
+    if routes:
+        cache.hdel(ROUTES_KEY, routes)
+    invalidate_flight_list()
+
+
+def invalidate_flight_list():
+    frappe.cache().delete_value(list_key())
+
+
+def warm_flight_pages(days=1):
+    """
+    Pre-render guest HTML for published flights departing from today until
+    `days` ahead, plus the list. Scheduled daily via hooks.py; operations can
+    run it ahead of a disruption:
+        bench --site <site> execute airplane_mode.airplane_mode.flight_page_cache.warm_flight_pages
+    """
+    from frappe.website.serve import get_response
+    from werkzeug.test import EnvironBuilder
+    from werkzeug.wrappers import Request
+
+    flights = frappe.get_all(
+        "Airplane Flight",
+        filters={
+            "is_published": 1,
+            "docstatus": ["<", 2],
+            "date_of_departure": ["between", [getdate(today()), add_days(today(), int(days))]]
+        },
+        pluck="route"
+    )
+
+    user, request = frappe.session.user, getattr(frappe.local, "request", None)
+    warmed, failures = 0, 0
+    try:
+        frappe.set_user("Guest")
+        frappe.flags[REFRESH_FLAG] = True
+        for route in [LIST_ROUTE] + [route.strip("/") for route in flights if route]:
+            try:
+                frappe.local.request = Request(EnvironBuilder(path=f"/{route}", method="GET").get_environ())
+                if get_response(route).status_code == 200:
+                    warmed += 1
+            except Exception as e:
+                failures += 1
+                frappe.log_error(f"Flight page warm-up failed for {route}: {str(e)}", "Flight Page Cache")
+    finally:
+        frappe.flags.pop(REFRESH_FLAG, None)
+        frappe.local.request = request
+        frappe.set_user(user)
+
+    record_progress(rows=warmed, failures=failures)
+    return {"warmed": warmed, "failures": failures}
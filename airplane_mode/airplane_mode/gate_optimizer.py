@@ -0,0 +1,272 @@
+"""
+Gate assignment for a day's departures.
+
+A departure holds its gate from BOARDING_MINUTES before departure until
+TURNAROUND_MINUTES after it. Gates at one airport form an interval graph,
+so assigning them is interval graph colouring. Flights are swept in start
+order with a min-heap of (free_at, gate) for gates in use. A flight takes
+its current gate when that gate is free, which keeps gate changes (and
+the ticket gate syncs they cause) to a minimum, and otherwise the first
+free gate. While the airport has at least as many gates as the peak
+overlap, the sweep always finds a gate.
+
+Completed flights and the previous evening's departures are pinned to
+their current gates and block them for their interval.
+"""
+
+import heapq
+import time
+from bisect import bisect_left
+
+import frappe
+from frappe.utils import add_days, cint, get_datetime, getdate, now_datetime, today
+
+from airplane_mode.airplane_mode.crew_roster import to_seconds
+
+
+BOARDING_MINUTES = 45
+TURNAROUND_MINUTES = 20
+GATE_HISTORY_DAYS = 90
+UPDATE_BATCH_SIZE = 500
+
+
+def load_flights(date, airport=None):
+    """The day's flights plus the previous day's, which are only used as pins"""
+    conditions, values = ["docstatus < 2", "IFNULL(status, '') != 'Cancelled'",
+                          "date_of_departure BETWEEN %(from_date)s AND %(date)s"], {}
+    values.update(from_date=add_days(date, -1), date=date)
+    if airport:
+        conditions.append("source_airport = %(airport)s")
+        values["airport"] = airport
+
+    return frappe.db.sql(f"""
+        SELECT name, source_airport, date_of_departure, time_of_departure, status, gate_number, route
+        FROM `tabAirplane Flight`
+        WHERE {" AND ".join(conditions)} AND source_airport IS NOT NULL
+    """, values, as_dict=True)
+
+
+def get_gate_inventory(airports, gates=None):
+    """
+    Gates per airport: passed in, else the airplane_mode_gates site config
+    ({airport: [gates]}), else every gate used at the airport recently.
+    """
+    if isinstance(gates, str):
+        gates = frappe.parse_json(gates)
+    if isinstance(gates, list):
+        gates = {airport: gates for airport in airports}
+
+    configured = frappe.conf.get("airplane_mode_gates") or {}
+    inventory = {airport: list((gates or {}).get(airport) or configured.get(airport) or []) for airport in airports}
+
+    missing = [airport for airport, airport_gates in inventory.items() if not airport_gates]
+    if missing:
+        for airport, gate in frappe.db.sql("""
+            SELECT DISTINCT source_airport, gate_number
+            FROM `tabAirplane Flight`
+            WHERE source_airport IN %(airports)s AND IFNULL(gate_number, '') != ''
+            AND date_of_departure >= %(since)s
+        """, {"airports": tuple(missing), "since": add_days(today(), -GATE_HISTORY_DAYS)}):
+            inventory[airport].append(gate)
+
+    return {airport: sorted(set(airport_gates)) for airport, airport_gates in inventory.items()}
+
+
+def to_movements(flights, date, boarding_minutes, turnaround_minutes):
+    """(start, end, flight, current gate, pinned) per flight, in seconds"""
+    now = to_seconds(now_datetime())
+    movements = []
+    for flight in flights:
+        departure = to_seconds(get_datetime(f"{flight.date_of_departure} {flight.time_of_departure or '00:00:00'}"))
+        start, end = departure - boarding_minutes * 60, departure + turnaround_minutes * 60
+        pinned = getdate(flight.date_of_departure) != date or flight.status == "Completed" or start < now
+        movements.append((start, end, flight.name, flight.gate_number or None, pinned))
+    return movements
+
+
+def assign_gates(movements, gates):
+    """
+    Colour one airport's movements with its gates. Returns
+    ({flight: gate}, [unassigned flights], peak overlap).
+    """
+    # Pinned movements reserve their gate: gate -> (sorted starts, running max of ends)
+    pins = {}
+    for start, end, flight, gate, pinned in movements:
+        if pinned and gate:
+            pins.setdefault(gate, []).append((start, end))
+    reserved = {}
+    for gate, intervals in pins.items():
+        intervals.sort()
+        ends, latest = [], None
+        for _, end in intervals:
+            latest = end if latest is None else max(latest, end)
+            ends.append(latest)
+        reserved[gate] = ([start for start, _ in intervals], ends)
+
+    def is_reserved(gate, start, end):
+        if gate not in reserved:
+            return False
+        starts, ends = reserved[gate]
+        # Reservations starting before `end` overlap when the latest of their ends is past `start`
+        i = bisect_left(starts, end)
+        return i > 0 and ends[i - 1] > start
+
+    gates = sorted(set(gates) | set(reserved))
+    free = list(gates)
+    heapq.heapify(free)
+    free_set = set(gates)
+    busy = []
+
+    assignments, unassigned, peak = {}, [], 0
+    for start, end, flight, gate, pinned in sorted(movement for movement in movements if not movement[4]):
+        while busy and busy[0][0] <= start:
+            _, released = heapq.heappop(busy)
+            free_set.add(released)
+            heapq.heappush(free, released)
+
+        choice = gate if gate in free_set and not is_reserved(gate, start, end) else None
+        skipped = []
+        while choice is None and free:
+            candidate = heapq.heappop(free)
+            if candidate not in free_set:
+                continue
+            if is_reserved(candidate, start, end):
+                skipped.append(candidate)
+            else:
+                choice = candidate
+        for candidate in skipped:
+            heapq.heappush(free, candidate)
+
+        if choice is None:
+            unassigned.append(flight)
+            continue
+
+        free_set.discard(choice)
+        heapq.heappush(busy, (end, choice))
+        assignments[flight] = choice
+        peak = max(peak, len(busy))
+
+    return assignments, unassigned, peak
+
+
+@frappe.whitelist()
+def optimize_gates(date=None, airport=None, gates=None, apply=False,
+                   boarding_minutes=BOARDING_MINUTES, turnaround_minutes=TURNAROUND_MINUTES):
+    """
+    Plan gates for a day's departures, per airport. With apply=True the
+    changed gates are written in one batch and synced to tickets once.
+    """
+    frappe.only_for("System Manager")
+
+    date = getdate(date or today())
+    started = time.perf_counter()
+
+    flights = load_flights(date, airport)
+    by_airport = {}
+    for flight in flights:
+        by_airport.setdefault(flight.source_airport, []).append(flight)
+    inventory = get_gate_inventory(list(by_airport), gates)
+    loaded = time.perf_counter()
+
+    current = {flight.name: flight.gate_number or None for flight in flights}
+    plan = {"date": str(date), "airports": {}, "changes": [], "unassigned": []}
+    for airport_name, airport_flights in by_airport.items():
+        movements = to_movements(airport_flights, date, cint(boarding_minutes), cint(turnaround_minutes))
+        assignments, unassigned, peak = assign_gates(movements, inventory.get(airport_name) or [])
+
+        changes = [
+            {"flight": flight, "airport": airport_name, "from": current[flight], "to": gate}
+            for flight, gate in assignments.items() if gate != current[flight]
+        ]
+        plan["changes"] += changes
+        plan["unassigned"] += [{"flight": flight, "airport": airport_name} for flight in unassigned]
+        plan["airports"][airport_name] = {
+            "gates": len(inventory.get(airport_name) or []),
+            "flights": len(assignments) + len(unassigned),
+            "peak_overlap": peak,
+            "changes": len(changes),
+            "unassigned": len(unassigned)
+        }
+    planned = time.perf_counter()
+
+    plan["applied"] = bool(frappe.parse_json(apply)) and bool(plan["changes"])
+    if plan["applied"]:
+        changed = {change["flight"] for change in plan["changes"]}
+        apply_gate_changes(plan["changes"], {flight.name: flight.route for flight in flights if flight.name in changed})
+
+    plan["timings_ms"] = {
+        "load": round((loaded - started) * 1000, 3),
+        "assign": round((planned - loaded) * 1000, 3),
+        "apply": round((time.perf_counter() - planned) * 1000, 3)
+    }
+    return plan
+
+
+def apply_gate_changes(changes, routes=None):
+    """
+    Write new gates with one CASE UPDATE per batch and move the open tickets
+    of those flights with one joined UPDATE, instead of a gate sync job per
+    flight save. The departures board and cached flight pages are refreshed
+    after commit.
+    """
+    from airplane_mode.airplane_mode.departures_board import apply_flight_change
+    from airplane_mode.airplane_mode.flight_page_cache import invalidate_routes
+
+    now, user = now_datetime(), frappe.session.user
+    for start in range(0, len(changes), UPDATE_BATCH_SIZE):
+        batch = changes[start:start + UPDATE_BATCH_SIZE]
+        names = tuple(change["flight"] for change in batch)
+        frappe.db.sql(f"""
+            UPDATE `tabAirplane Flight`
+            SET gate_number = CASE name {" ".join(["WHEN %s THEN %s"] * len(batch))} END,
+                modified = %s, modified_by = %s
+            WHERE name IN %s
+        """, (*[value for change in batch for value in (change["flight"], change["to"])], now, user, names))
+
+        frappe.db.sql("""
+            UPDATE `tabAirplane Ticket` ticket
+            INNER JOIN `tabAirplane Flight` flight ON flight.name = ticket.flight
+            SET ticket.gate_number = flight.gate_number
+            WHERE ticket.flight IN %(names)s AND ticket.docstatus IN (0, 1) AND ticket.status != 'Boarded'
+        """, {"names": names})
+
+    flights = [change["flight"] for change in changes]
+    flight_routes = [route.strip("/") for route in (routes or {}).values() if route]
+
+    def refresh():
+        for flight in flights:
+            apply_flight_change(flight)
+        invalidate_routes(flight_routes)
+
+    frappe.db.after_commit.add(refresh)
+
+
+def measure(movements=2000, airports=10, gates_per_airport=30, seed=7):
+    """
+    Time assign_gates() on a synthetic day of `movements` departures, without
+    the database. Run with:
+        bench --site <site> execute airplane_mode.airplane_mode.gate_optimizer.measure
+    """
+    import random
+
+    rng = random.Random(seed)
+    day = to_seconds(get_datetime(today()))
+    by_airport = {}
+    for i in range(int(movements)):
+        departure = day + rng.randint(5 * 3600, 23 * 3600)
+        by_airport.setdefault(i % int(airports), []).append((
+            departure - BOARDING_MINUTES * 60, departure + TURNAROUND_MINUTES * 60,
+            f"FL-{i:05d}", f"G{rng.randint(1, gates_per_airport)}", False
+        ))
+
+    started = time.perf_counter()
+    unassigned = 0
+    for airport_movements in by_airport.values():
+        unassigned += len(assign_gates(airport_movements, [f"G{n}" for n in range(1, gates_per_airport + 1)])[1])
+    elapsed = time.perf_counter() - started
+
+    return {
+        "movements": int(movements),
+        "unassigned": unassigned,
+        "assign_ms": round(elapsed * 1000, 3)
+    }
@@ -0,0 +1,100 @@
+// airplane_mode/airplane_mode/page/endpoint_profiler/endpoint_profiler.js
+
+frappe.pages['endpoint-profiler'].on_page_load = function(wrapper) {
+    const page = frappe.ui.make_app_page({
+        parent: wrapper,
+        title: __('Endpoint Profiler'),
+        single_column: true
+    });
+
+    const profiler = new airplane_mode.EndpointProfiler(page);
+    profiler.refresh();
+};
+
+frappe.provide('airplane_mode');
+
+airplane_mode.EndpointProfiler = class EndpointProfiler {
+    constructor(page) {
+        this.page = page;
+        this.sort_by = 'queries';
+        this.$body = $('<div class="endpoint-profiler"></div>').appendTo(page.main);
+
+        this.sort_field = page.add_field({
+            fieldname: 'sort_by',
+            label: __('Sort By (p95)'),
+            fieldtype: 'Select',
+            options: ['queries', 'ms', 'db_ms', 'rows'],
+            default: 'queries',
+            change: () => {
+                this.sort_by = this.sort_field.get_value();
+                this.refresh();
+            }
+        });
+
+        page.set_primary_action(__('Refresh'), () => this.refresh(), 'refresh');
+        this.toggle_button = page.add_inner_button(__('Enable Profiling'), () => this.toggle());
+        page.add_inner_button(__('Reset Samples'), () => {
+            frappe.confirm(__('Clear all recorded samples?'), () => {
+                frappe.call('airplane_mode.endpoint_profiler.reset_endpoint_profiles').then(() => this.refresh());
+            });
+        });
+    }
+
+    refresh() {
+        frappe.call({
+            method: 'airplane_mode.endpoint_profiler.get_endpoint_profiles',
+            args: { sort_by: this.sort_by }
+        }).then(r => this.render(r.message));
+    }
+
+    toggle() {
+        frappe.call({
+            method: 'airplane_mode.endpoint_profiler.set_endpoint_profiling',
+            args: { enabled: this.enabled ? 0 : 1 }
+        }).then(() => this.refresh());
+    }
+
+    render(data) {
+        this.enabled = data.enabled;
+        this.toggle_button.text(this.enabled ? __('Disable Profiling') : __('Enable Profiling'));
+        this.page.set_indicator(this.enabled ? __('Recording') : __('Off'), this.enabled ? 'green' : 'gray');
+
+        if (!data.endpoints.length) {
+            this.$body.html(`<div class="text-muted text-center" style="padding: 40px;">
+                ${__('No samples yet. Enable profiling and use the app to collect them.')}
+            </div>`);
+            return;
+        }
+
+        const metric = (m) => `${m.p50} / ${m.p95} / ${m.p99}`;
+        const rows = data.endpoints.map(e => `
+            <tr>
+                <td><code>${frappe.utils.escape_html(e.method)}</code></td>
+                <td class="text-right">${e.calls}</td>
+                <td class="text-right">${e.failed}</td>
+                <td class="text-right">${metric(e.queries)}</td>
+                <td class="text-right">${metric(e.db_ms)}</td>
+                <td class="text-right">${metric(e.ms)}</td>
+                <td class="text-right">${metric(e.rows)}</td>
+            </tr>
+        `).join('');
+
+        this.$body.html(`
+            <p class="text-muted">${__('Last {0} calls per endpoint. Columns show p50 / p95 / p99.', [data.ring_size])}</p>
+            <table class="table table-bordered table-hover">
+                <thead>
+                    <tr>
+                        <th>${__('Endpoint')}</th>
+                        <th class="text-right">${__('Calls')}</th>
+                        <th class="text-right">${__('Failed')}</th>
+                        <th class="text-right">${__('Queries')}</th>
+                        <th class="text-right">${__('DB ms')}</th>
+                        <th class="text-right">${__('Wall ms')}</th>
+                        <th class="text-right">${__('Rows')}</th>
+                    </tr>
+                </thead>
+                <tbody>${rows}</tbody>
+            </table>
+        `);
+    }
+};
@@ -0,0 +1,105 @@
+// airplane_mode/airplane_mode/page/job_telemetry/job_telemetry.js
+
+frappe.pages['job-telemetry'].on_page_load = function(wrapper) {
+    const page = frappe.ui.make_app_page({
+        parent: wrapper,
+        title: __('Job Telemetry'),
+        single_column: true
+    });
+
+    const telemetry = new airplane_mode.JobTelemetry(page);
+    telemetry.refresh();
+};
+
+frappe.provide('airplane_mode');
+
+airplane_mode.JobTelemetry = class JobTelemetry {
+    constructor(page) {
+        this.page = page;
+        this.days = 90;
+        this.$body = $('<div class="job-telemetry"></div>').appendTo(page.main);
+
+        this.days_field = page.add_field({
+            fieldname: 'days',
+            label: __('Days'),
+            fieldtype: 'Select',
+            options: ['30', '90', '180', '365'],
+            default: '90',
+            change: () => {
+                this.days = this.days_field.get_value();
+                this.refresh();
+            }
+        });
+
+        page.set_primary_action(__('Refresh'), () => this.refresh(), 'refresh');
+        page.add_inner_button(__('Run Log'), () => frappe.set_route('List', 'Job Run Log'));
+    }
+
+    refresh() {
+        frappe.call({
+            method: 'airplane_mode.job_telemetry.get_job_summary',
+            args: { days: this.days }
+        }).then(r => this.render(r.message));
+    }
+
+    render(data) {
+        this.$body.empty();
+        if (data.buffered) {
+            this.$body.append(`<p class="text-muted">${__('{0} finished runs are waiting for the next flush.', [data.buffered])}</p>`);
+        }
+
+        const frequencies = [...new Set(data.jobs.map(job => job.frequency))];
+        frequencies.forEach(frequency => {
+            this.$body.append(`<h4 style="margin-top: 24px;">${__(frequency)}</h4>`);
+            data.jobs
+                .filter(job => job.frequency === frequency)
+                .forEach(job => this.render_job(job));
+        });
+    }
+
+    render_job(job) {
+        const s = job.summary;
+        const indicator = { Success: 'green', Partial: 'orange', Failed: 'red' }[s.last_status] || 'gray';
+        const $card = $(`
+            <div class="frappe-card" style="padding: 15px; margin-bottom: 15px;">
+                <div class="flex justify-between align-center">
+                    <div>
+                        <b>${frappe.utils.escape_html(job.job_name)}</b>
+                        <div class="text-muted small"><code>${frappe.utils.escape_html(job.method)}</code></div>
+                    </div>
+                    <span class="indicator-pill ${indicator}">${s.last_status ? __(s.last_status) : __('No runs')}</span>
+                </div>
+                <div class="text-muted small" style="margin-top: 8px;">
+                    ${__('Runs')}: ${s.runs} &middot;
+                    ${__('Failed')}: ${s.failed_runs} &middot;
+                    ${__('Row failures')}: ${s.failures} &middot;
+                    ${__('Rows')}: ${s.rows} &middot;
+                    ${__('Avg / p95')}: ${(s.avg_ms / 1000).toFixed(2)}s / ${(s.p95_ms / 1000).toFixed(2)}s &middot;
+                    ${__('Avg throughput')}: ${s.avg_throughput} ${__('rows/s')}
+                </div>
+                <div class="job-chart"></div>
+            </div>
+        `).appendTo(this.$body);
+
+        if (job.history.length < 2) {
+            $card.find('.job-chart').html(`<div class="text-muted small" style="padding: 10px 0;">
+                ${__('Trend lines appear after two runs.')}
+            </div>`);
+            return;
+        }
+
+        new frappe.Chart($card.find('.job-chart')[0], {
+            type: 'line',
+            height: 200,
+            data: {
+                labels: job.history.map(run => frappe.datetime.str_to_user(run.started_at).split(' ')[0]),
+                datasets: [
+                    { name: __('Duration (s)'), values: job.history.map(run => run.duration_s) },
+                    { name: __('Throughput (rows/s)'), values: job.history.map(run => run.throughput) }
+                ]
+            },
+            lineOptions: { dotSize: 3, regionFill: 0 },
+            axisOptions: { xIsSeries: 1, xAxisMode: 'tick' }
+        });
+    }
+};
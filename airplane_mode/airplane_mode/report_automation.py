@@ -1,208 +1,332 @@
 import frappe
 from frappe import _
-from frappe.utils import getdate, add_days, format_date
+from frappe.utils import getdate, add_days, flt, format_date
 from frappe.utils.pdf import get_pdf
 import json
+import time
+from contextlib import contextmanager
+from airplane_mode.job_telemetry import record_progress
+
+
+REPORT_TYPES = ["occupancy", "revenue", "contracts", "leads"]
+
+REPORT_RUN_LOG_KEY = "airplane_mode_report_run_log"
+REPORT_RUN_LOG_SIZE = 50
+
+
+class ReportRun:
+    """
+    Timings for one report automation run.
+    
+    Each stage is timed separately and the finished run is written as one
+    structured entry to the airplane_mode.report_runs logger and to a short
+    history kept in the cache, so regressions show up run over run.
+    """
+    
+    def __init__(self, name):
+        self.name = name
+        self.started_at = frappe.utils.now()
+        self.started = time.perf_counter()
+        self.stages = {}
+        self.counts = {}
+        self.errors = []
+    
+    @contextmanager
+    def stage(self, stage_name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[stage_name] = round((time.perf_counter() - started) * 1000, 3)
+    
+    def as_dict(self):
+        return {
+            "run": self.name,
+            "started_at": str(self.started_at),
+            "total_ms": round((time.perf_counter() - self.started) * 1000, 3),
+            "stages_ms": self.stages,
+            "counts": self.counts,
+            "errors": self.errors
+        }
+    
+    def finish(self):
+        entry = self.as_dict()
+        frappe.logger("airplane_mode.report_runs").info(entry)
+        
+        try:
+            cache = frappe.cache()
+            cache.lpush(REPORT_RUN_LOG_KEY, json.dumps(entry, default=str))
+            cache.ltrim(REPORT_RUN_LOG_KEY, 0, REPORT_RUN_LOG_SIZE - 1)
+        except Exception:
+            pass
+        
+        return entry
 
 
 def send_weekly_reports():
     """
     Send weekly reports to relevant stakeholders
     Scheduled to run weekly via hooks.py
+    
+    The run is a pipeline: one consistent snapshot read of everything the
+    four reports need, building of the report messages from that snapshot,
+    then hand-off of every message to the email queue.
     """
+    run = ReportRun("weekly_reports")
+    
     try:
-        frappe.log_error("Starting weekly report automation", "Report Automation")
+        with run.stage("snapshot"):
+            snapshot = read_report_snapshot(REPORT_TYPES)
         
-        # Send occupancy report to management
-        send_occupancy_report()
+        # Recipients for every report are resolved once for the whole run
+        with run.stage("recipients"):
+            resolver = ReportRecipientResolver()
+            resolver.load()
         
-        # Send revenue summary to finance team
-        send_revenue_summary()
+        with run.stage("build"):
+            messages = build_reports(snapshot, REPORT_TYPES)
         
-        # Send contract expiry alerts
-        send_contract_expiry_alerts()
+        with run.stage("queue"):
+            run.counts["queued"] = queue_report_emails(messages, resolver)
         
-        # Send lead summary to sales team
-        send_lead_summary()
-        
-        frappe.log_error("Weekly reports sent successfully", "Report Automation")
+        run.counts["built"] = len(messages)
         
     except Exception as e:
+        run.errors.append(str(e))
         frappe.log_error(f"Weekly report automation failed: {str(e)}", "Report Automation Error")
+    
+    finally:
+        record_progress(rows=run.counts.get("queued", 0), failures=len(run.errors), error="; ".join(run.errors))
+        run.finish()
 
 
-def send_occupancy_report():
+def read_report_snapshot(report_types):
     """
-    Send shop occupancy report to airport management
+    Read the data behind the given reports in a single transaction.
+    
+    MariaDB's repeatable-read isolation pins every read in the transaction
+    to the same snapshot, so the four reports agree with each other even if
+    shops, contracts or invoices change while the run is in progress.
     """
+    end_date = getdate()
+    start_date = add_days(end_date, -7)
+    
+    # Close whatever transaction the job started in so the snapshot
+    # begins at the first read below
+    frappe.db.commit()
+    frappe.db.begin()
+    
     try:
-        # Get occupancy data
-        occupancy_data = get_occupancy_data()
-        
-        # Get recipients
-        recipients = get_report_recipients("occupancy")
-        
-        if not recipients:
-            frappe.log_error("No recipients found for occupancy report", "Report Automation")
-            return
-        
-        # Generate report content
-        subject = f"Weekly Shop Occupancy Report - {format_date(getdate())}"
+        snapshot = frappe._dict({
+            "start_date": start_date,
+            "end_date": end_date,
+            "labels": {
+                "today": format_date(end_date),
+                "start_date": format_date(start_date),
+                "end_date": format_date(end_date)
+            }
+        })
         
-        template_data = {
+        if "occupancy" in report_types:
+            snapshot.occupancy = get_occupancy_data()
+        if "revenue" in report_types:
+            snapshot.revenue = get_revenue_data(start_date, end_date)
+        if "contracts" in report_types:
+            snapshot.contracts = get_expiring_contracts()
+        if "leads" in report_types:
+            snapshot.leads = get_lead_data(start_date, end_date)
+    
+    finally:
+        frappe.db.commit()
+    
+    return snapshot
+
+
+def build_occupancy_report(snapshot):
+    """
+    Build the shop occupancy report for airport management
+    """
+    occupancy_data = snapshot.occupancy or {}
+    
+    return {
+        "report_type": "occupancy",
+        "subject": f"Weekly Shop Occupancy Report - {snapshot.labels['today']}",
+        "template": "weekly_occupancy_report",
+        "args": {
             "total_shops": occupancy_data.get("total_shops", 0),
             "occupied_shops": occupancy_data.get("occupied_shops", 0),
             "occupancy_rate": occupancy_data.get("occupancy_rate", 0),
             "available_shops": occupancy_data.get("available_shops", 0),
             "shop_breakdown": occupancy_data.get("shop_breakdown", []),
-            "report_date": format_date(getdate())
+            "report_date": snapshot.labels["today"]
         }
-        
-        # Send email with report
-        frappe.sendmail(
-            recipients=recipients,
-            subject=subject,
-            template="weekly_occupancy_report",
-            args=template_data,
-            attachments=[]
-        )
-        
-        frappe.log_error(f"Occupancy report sent to {len(recipients)} recipients", "Report Automation")
-        
-    except Exception as e:
-        frappe.log_error(f"Occupancy report sending failed: {str(e)}", "Report Automation Error")
+    }
 
 
-def send_revenue_summary():
+def build_revenue_summary(snapshot):
     """
-    Send revenue summary to finance team
+    Build the revenue summary for the finance team
     """
-    try:
-        # Get revenue data for the past week
-        end_date = getdate()
-        start_date = add_days(end_date, -7)
-        
-        revenue_data = get_revenue_data(start_date, end_date)
-        
-        # Get recipients
-        recipients = get_report_recipients("revenue")
-        
-        if not recipients:
-            frappe.log_error("No recipients found for revenue report", "Report Automation")
-            return
-        
-        # Generate report content
-        subject = f"Weekly Revenue Summary - {format_date(start_date)} to {format_date(end_date)}"
-        
-        template_data = {
+    revenue_data = snapshot.revenue or {}
+    labels = snapshot.labels
+    
+    return {
+        "report_type": "revenue",
+        "subject": f"Weekly Revenue Summary - {labels['start_date']} to {labels['end_date']}",
+        "template": "weekly_revenue_summary",
+        "args": {
             "total_revenue": revenue_data.get("total_revenue", 0),
             "collected_amount": revenue_data.get("collected_amount", 0),
             "outstanding_amount": revenue_data.get("outstanding_amount", 0),
             "collection_efficiency": revenue_data.get("collection_efficiency", 0),
             "payment_breakdown": revenue_data.get("payment_breakdown", []),
-            "start_date": format_date(start_date),
-            "end_date": format_date(end_date)
+            "start_date": labels["start_date"],
+            "end_date": labels["end_date"]
         }
-        
-        # Send email with report
-        frappe.sendmail(
-            recipients=recipients,
-            subject=subject,
-            template="weekly_revenue_summary",
-            args=template_data
-        )
-        
-        frappe.log_error(f"Revenue summary sent to {len(recipients)} recipients", "Report Automation")
-        
-    except Exception as e:
-        frappe.log_error(f"Revenue summary sending failed: {str(e)}", "Report Automation Error")
+    }
 
 
-def send_contract_expiry_alerts():
+def build_contract_expiry_alert(snapshot):
     """
-    Send contract expiry alerts to management
+    Build the contract expiry alert, or None when nothing is expiring
     """
-    try:
-        # Get contracts expiring in next 30 days
-        expiring_contracts = get_expiring_contracts()
-        
-        if not expiring_contracts:
-            frappe.log_error("No expiring contracts found", "Report Automation")
-            return
-        
-        # Get recipients
-        recipients = get_report_recipients("contracts")
-        
-        if not recipients:
-            frappe.log_error("No recipients found for contract expiry alerts", "Report Automation")
-            return
-        
-        # Generate alert content
-        subject = f"Contract Expiry Alert - {len(expiring_contracts)} contracts expiring soon"
-        
-        template_data = {
+    expiring_contracts = snapshot.contracts or []
+    if not expiring_contracts:
+        return None
+    
+    return {
+        "report_type": "contracts",
+        "subject": f"Contract Expiry Alert - {len(expiring_contracts)} contracts expiring soon",
+        "template": "contract_expiry_alert",
+        "args": {
             "expiring_contracts": expiring_contracts,
             "total_expiring": len(expiring_contracts),
-            "alert_date": format_date(getdate())
+            "alert_date": snapshot.labels["today"]
         }
-        
-        # Send email with alert
-        frappe.sendmail(
-            recipients=recipients,
-            subject=subject,
-            template="contract_expiry_alert",
-            args=template_data
-        )
-        
-        frappe.log_error(f"Contract expiry alerts sent for {len(expiring_contracts)} contracts", "Report Automation")
-        
-    except Exception as e:
-        frappe.log_error(f"Contract expiry alert sending failed: {str(e)}", "Report Automation Error")
+    }
 
 
-def send_lead_summary():
+def build_lead_summary(snapshot):
     """
-    Send lead summary to sales team
+    Build the lead summary for the sales team
     """
-    try:
-        # Get lead data for the past week
-        end_date = getdate()
-        start_date = add_days(end_date, -7)
-        
-        lead_data = get_lead_data(start_date, end_date)
-        
-        # Get recipients
-        recipients = get_report_recipients("leads")
-        
-        if not recipients:
-            frappe.log_error("No recipients found for lead summary", "Report Automation")
-            return
-        
-        # Generate report content
-        subject = f"Weekly Lead Summary - {format_date(start_date)} to {format_date(end_date)}"
-        
-        template_data = {
+    lead_data = snapshot.leads or {}
+    labels = snapshot.labels
+    
+    return {
+        "report_type": "leads",
+        "subject": f"Weekly Lead Summary - {labels['start_date']} to {labels['end_date']}",
+        "template": "weekly_lead_summary",
+        "args": {
             "new_leads": lead_data.get("new_leads", 0),
             "converted_leads": lead_data.get("converted_leads", 0),
             "pending_leads": lead_data.get("pending_leads", 0),
             "conversion_rate": lead_data.get("conversion_rate", 0),
             "lead_details": lead_data.get("lead_details", []),
-            "start_date": format_date(start_date),
-            "end_date": format_date(end_date)
+            "start_date": labels["start_date"],
+            "end_date": labels["end_date"]
         }
-        
-        # Send email with report
-        frappe.sendmail(
-            recipients=recipients,
-            subject=subject,
-            template="weekly_lead_summary",
-            args=template_data
-        )
-        
-        frappe.log_error(f"Lead summary sent to {len(recipients)} recipients", "Report Automation")
-        
-    except Exception as e:
-        frappe.log_error(f"Lead summary sending failed: {str(e)}", "Report Automation Error")
+    }
+
+
+REPORT_BUILDERS = {
+    "occupancy": build_occupancy_report,
+    "revenue": build_revenue_summary,
+    "contracts": build_contract_expiry_alert,
+    "leads": build_lead_summary
+}
+
+
+def build_reports(snapshot, report_types):
+    """
+    Build report messages from a snapshot.
+    
+    Builders are pure functions of the snapshot, so every read happens in
+    read_report_snapshot and every write in queue_report_emails. The
+    templates are rendered when the messages are queued.
+    """
+    messages = []
+    
+    for report_type in report_types:
+        try:
+            message = REPORT_BUILDERS[report_type](snapshot)
+        except Exception as e:
+            frappe.log_error(f"Building {report_type} report failed: {str(e)}", "Report Automation Error")
+            continue
+        
+        if message:
+            messages.append(message)
+    
+    return messages
+
+
+def queue_report_emails(messages, resolver=None):
+    """
+    Hand report messages to the email queue. Returns how many were queued.
+    """
+    queued = 0
+    
+    for message in messages:
+        try:
+            recipients = get_report_recipients(message["report_type"], resolver)
+            
+            if not recipients:
+                frappe.logger("airplane_mode.report_runs").info(
+                    f"No recipients found for {message['report_type']} report"
+                )
+                continue
+            
+            frappe.sendmail(
+                recipients=recipients,
+                subject=message["subject"],
+                template=message["template"],
+                args=message["args"],
+                delayed=True
+            )
+            queued += 1
+            
+        except Exception as e:
+            frappe.log_error(
+                f"Queueing {message['report_type']} report failed: {str(e)}", "Report Automation Error"
+            )
+    
+    return queued
+
+
+def send_report(report_type, resolver=None):
+    """
+    Build and queue a single report on its own snapshot
+    """
+    snapshot = read_report_snapshot([report_type])
+    return queue_report_emails(build_reports(snapshot, [report_type]), resolver)
+
+
+def send_occupancy_report(resolver=None):
+    """
+    Send shop occupancy report to airport management
+    """
+    return send_report("occupancy", resolver)
+
+
+def send_revenue_summary(resolver=None):
+    """
+    Send revenue summary to finance team
+    """
+    return send_report("revenue", resolver)
+
+
+def send_contract_expiry_alerts(resolver=None):
+    """
+    Send contract expiry alerts to management
+    """
+    return send_report("contracts", resolver)
+
+
+def send_lead_summary(resolver=None):
+    """
+    Send lead summary to sales team
+    """
+    return send_report("leads", resolver)
 
 
 def get_occupancy_data():
@@ -260,29 +384,7 @@ def get_revenue_data(start_date, end_date):
     Get revenue data for specified period
     """
     try:
-        # Total revenue
-        total_revenue = frappe.db.sql("""
-            SELECT COALESCE(SUM(si.grand_total), 0) as amount
-            FROM `tabSales Invoice` si
-            WHERE si.posting_date BETWEEN %s AND %s
-            AND si.docstatus = 1
-        """, (start_date, end_date), as_dict=True)[0].amount or 0
-        
-        # Collected amount
-        collected_amount = frappe.db.sql("""
-            SELECT COALESCE(SUM(si.grand_total - si.outstanding_amount), 0) as amount
-            FROM `tabSales Invoice` si
-            WHERE si.posting_date BETWEEN %s AND %s
-            AND si.docstatus = 1
-        """, (start_date, end_date), as_dict=True)[0].amount or 0
-        
-        # Outstanding amount
-        outstanding_amount = total_revenue - collected_amount
-        
-        # Collection efficiency
-        collection_efficiency = (collected_amount / total_revenue * 100) if total_revenue > 0 else 0
-        
-        # Payment breakdown
+        # Payment breakdown; the period totals are summed from the same rows
         payment_breakdown = frappe.db.sql("""
             SELECT 
                 si.customer,
@@ -295,6 +397,18 @@ def get_revenue_data(start_date, end_date):
             ORDER BY si.grand_total DESC
         """, (start_date, end_date), as_dict=True)
         
+        # Total revenue
+        total_revenue = sum(flt(row.grand_total) for row in payment_breakdown)
+        
+        # Collected amount
+        collected_amount = sum(flt(row.paid_amount) for row in payment_breakdown)
+        
+        # Outstanding amount
+        outstanding_amount = total_revenue - collected_amount
+        
+        # Collection efficiency
+        collection_efficiency = (collected_amount / total_revenue * 100) if total_revenue > 0 else 0
+        
         return {
             "total_revenue": total_revenue,
             "collected_amount": collected_amount,
@@ -344,12 +458,22 @@ def get_lead_data(start_date, end_date):
     Get lead data for specified period
     """
     try:
-        # New leads
-        new_leads = frappe.db.sql("""
-            SELECT COUNT(*) as count
+        # Lead details; new and pending counts are taken from the same rows
+        lead_details = frappe.db.sql("""
+            SELECT 
+                sl.lead_name,
+                sl.email,
+                sl.phone,
+                sl.preferred_shop_type,
+                sl.status,
+                sl.creation
             FROM `tabShop Lead` sl
             WHERE sl.creation BETWEEN %s AND %s
-        """, (start_date, end_date), as_dict=True)[0].count or 0
+            ORDER BY sl.creation DESC
+        """, (start_date, end_date), as_dict=True)
+        
+        # New leads
+        new_leads = len(lead_details)
         
         # Converted leads
         converted_leads = frappe.db.sql("""
@@ -361,28 +485,11 @@ def get_lead_data(start_date, end_date):
         """, (start_date, end_date), as_dict=True)[0].count or 0
         
         # Pending leads
-        pending_leads = frappe.db.count("Shop Lead", {
-            "status": "Open",
-            "creation": ["between", [start_date, end_date]]
-        })
+        pending_leads = len([lead for lead in lead_details if lead.status == "Open"])
         
         # Conversion rate
         conversion_rate = (converted_leads / new_leads * 100) if new_leads > 0 else 0
         
-        # Lead details
-        lead_details = frappe.db.sql("""
-            SELECT 
-                sl.lead_name,
-                sl.email,
-                sl.phone,
-                sl.preferred_shop_type,
-                sl.status,
-                sl.creation
-            FROM `tabShop Lead` sl
-            WHERE sl.creation BETWEEN %s AND %s
-            ORDER BY sl.creation DESC
-        """, (start_date, end_date), as_dict=True)
-        
         return {
             "new_leads": new_leads,
             "converted_leads": converted_leads,
@@ -396,81 +503,96 @@ def get_lead_data(start_date, end_date):
         return {}
 
 
-def get_report_recipients(report_type):
+# Roles whose enabled users receive each weekly report
+REPORT_RECIPIENT_ROLES = {
+    "occupancy": ["Airport Manager", "Shop Manager"],
+    "revenue": ["Airport Manager", "Accounts Manager"],
+    "contracts": ["Airport Manager", "Shop Manager"],
+    "leads": ["Shop Manager", "Sales User"]
+}
+
+FALLBACK_RECIPIENTS = ["administrator@example.com"]
+
+
+class ReportRecipientResolver:
     """
-    Get email recipients for different report types
+    Resolves report recipients for one automation run.
+    
+    Enabled users are mapped role -> emails with a single Has Role join
+    covering every report type, so the cost does not grow with the
+    number of users or reports. Extra addresses can be subscribed per
+    report type through site config:
+    
+        "airplane_mode_report_subscribers": {"revenue": ["cfo@example.com"]}
     """
-    try:
-        recipients = []
-        
-        if report_type == "occupancy":
-            # Airport managers and shop managers
-            recipients = frappe.get_all(
-                "User",
-                filters={"enabled": 1},
-                fields=["email"]
-            )
-            # Filter users with appropriate roles
-            filtered_recipients = []
-            for user in recipients:
-                user_roles = frappe.get_roles(user.email)
-                if "Airport Manager" in user_roles or "Shop Manager" in user_roles:
-                    filtered_recipients.append(user.email)
-            recipients = filtered_recipients
-            
-        elif report_type == "revenue":
-            # Finance team and airport managers
-            recipients = frappe.get_all(
-                "User", 
-                filters={"enabled": 1},
-                fields=["email"]
-            )
-            filtered_recipients = []
-            for user in recipients:
-                user_roles = frappe.get_roles(user.email)
-                if "Airport Manager" in user_roles or "Accounts Manager" in user_roles:
-                    filtered_recipients.append(user.email)
-            recipients = filtered_recipients
-            
-        elif report_type == "contracts":
-            # Airport managers and shop managers
-            recipients = frappe.get_all(
-                "User",
-                filters={"enabled": 1}, 
-                fields=["email"]
-            )
-            filtered_recipients = []
-            for user in recipients:
-                user_roles = frappe.get_roles(user.email)
-                if "Airport Manager" in user_roles or "Shop Manager" in user_roles:
-                    filtered_recipients.append(user.email)
-            recipients = filtered_recipients
-            
-        elif report_type == "leads":
-            # Sales team and shop managers
-            recipients = frappe.get_all(
-                "User",
-                filters={"enabled": 1},
-                fields=["email"]
-            )
-            filtered_recipients = []
-            for user in recipients:
-                user_roles = frappe.get_roles(user.email)
-                if "Shop Manager" in user_roles or "Sales User" in user_roles:
-                    filtered_recipients.append(user.email)
-            recipients = filtered_recipients
+    
+    def __init__(self):
+        self._emails_by_role = None
+    
+    @property
+    def emails_by_role(self):
+        if self._emails_by_role is None:
+            self.load()
+        return self._emails_by_role
+    
+    def load(self):
+        self._emails_by_role = self.load_emails_by_role()
+    
+    def load_emails_by_role(self):
+        roles = sorted({role for roles in REPORT_RECIPIENT_ROLES.values() for role in roles})
+        
+        rows = frappe.db.sql("""
+            SELECT hr.role, usr.email
+            FROM `tabHas Role` hr
+            INNER JOIN `tabUser` usr ON usr.name = hr.parent
+            WHERE hr.parenttype = 'User'
+            AND hr.role IN %(roles)s
+            AND usr.enabled = 1
+            AND IFNULL(usr.email, '') != ''
+        """, {"roles": tuple(roles)}, as_dict=True)
+        
+        emails_by_role = {}
+        for row in rows:
+            emails_by_role.setdefault(row.role, set()).add(row.email)
+        return emails_by_role
+    
+    def get_subscribers(self, report_type):
+        subscriptions = frappe.conf.get("airplane_mode_report_subscribers") or {}
+        return subscriptions.get(report_type) or []
+    
+    def get(self, report_type):
+        recipients = set()
+        for role in REPORT_RECIPIENT_ROLES.get(report_type, []):
+            recipients.update(self.emails_by_role.get(role, ()))
+        recipients.update(self.get_subscribers(report_type))
         
         # Fallback to administrator if no specific recipients found
-        if not recipients:
-            recipients = ["administrator@example.com"]
-        
-        return recipients
+        return sorted(recipients) or list(FALLBACK_RECIPIENTS)
+
+
+def get_report_recipients(report_type, resolver=None):
+    """
+    Get email recipients for different report types
+    """
+    try:
+        return (resolver or ReportRecipientResolver()).get(report_type)
         
     except Exception as e:
         frappe.log_error(f"Recipients retrieval failed: {str(e)}", "Report Automation Error")
         return []
 
 
+@frappe.whitelist()
+def get_report_run_log():
+    """
+    Recent report automation runs with per-stage timings, newest first
+    """
+    frappe.only_for("System Manager")
+    
+    entries = frappe.cache().lrange(REPORT_RUN_LOG_KEY, 0, REPORT_RUN_LOG_SIZE - 1) or []
+    return [json.loads(entry) for entry in entries]
+
+
 @frappe.whitelist()
 def generate_manual_report(report_type, start_date=None, end_date=None):
     """
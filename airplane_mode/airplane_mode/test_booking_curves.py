@@ -0,0 +1,43 @@
+# Copyright (c) 2026, nandhakishore and Contributors
+# See license.txt
+
+import numpy as np
+from frappe.tests.utils import FrappeTestCase
+
+from airplane_mode.airplane_mode.booking_curves import CURVE_DAYS, CURVE_DTYPE, MISSING, fill_missing, pack, unpack
+
+
+class TestBookingCurves(FrappeTestCase):
+	"""Test cases for packed booking curves"""
+	
+	def test_pack_and_unpack(self):
+		"""Test that packed curves load back as one matrix"""
+		first = np.arange(CURVE_DAYS + 1)
+		second = np.full(CURVE_DAYS + 1, MISSING)
+		
+		blobs = [pack(first), pack(second)]
+		curves = unpack(blobs)
+		
+		self.assertEqual(len(blobs[0]), CURVE_DTYPE.itemsize * (CURVE_DAYS + 1))
+		self.assertEqual(curves.shape, (2, CURVE_DAYS + 1))
+		self.assertEqual(curves[0].tolist(), first.tolist())
+		self.assertTrue((curves[1] == MISSING).all())
+	
+	def test_unpack_nothing(self):
+		"""Test that no rows give an empty matrix"""
+		self.assertEqual(unpack([]).shape, (0, CURVE_DAYS + 1))
+	
+	def test_fill_missing(self):
+		"""Test forward filling from the earliest day towards departure"""
+		curve = np.full(CURVE_DAYS + 1, MISSING, dtype=CURVE_DTYPE)
+		curve[30] = 5
+		curve[10] = 8
+		
+		filled = fill_missing(unpack([pack(curve), pack(np.full(CURVE_DAYS + 1, MISSING))]))
+		
+		# Before the first snapshot nothing is booked yet
+		self.assertTrue((filled[0, 31:] == 0).all())
+		self.assertTrue((filled[0, 11:31] == 5).all())
+		self.assertTrue((filled[0, :11] == 8).all())
+		self.assertTrue((filled[1] == 0).all())
+		self.assertEqual(filled.dtype, np.int32)
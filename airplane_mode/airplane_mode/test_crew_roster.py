@@ -0,0 +1,89 @@
+# Copyright (c) 2026, nandhakishore and Contributors
+# See license.txt
+
+import random
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from airplane_mode.airplane_mode.crew_roster import ROSTER_KEY, IntervalTree, flight_interval, validate_flight_crew
+
+
+TEST_CREW = "_Test Crew Roster Member"
+TEST_FLIGHT = "_Test Crew Roster Flight"
+
+
+class TestIntervalTree(FrappeTestCase):
+	"""Test cases for the crew roster interval tree"""
+	
+	def test_overlaps_matches_brute_force(self):
+		"""Test overlaps against a scan of every interval"""
+		rng = random.Random(7)
+		intervals = []
+		for i in range(300):
+			start = rng.randint(0, 10000)
+			intervals.append((start, start + rng.randint(1, 500), f"FL-{i:03d}"))
+		tree = IntervalTree(intervals)
+		
+		for _ in range(200):
+			start = rng.randint(-100, 10500)
+			end = start + rng.randint(1, 800)
+			expected = sorted((s, key) for s, e, key in intervals if s < end and e > start)
+			self.assertEqual(tree.overlaps(start, end), [key for _, key in expected])
+	
+	def test_intervals_are_half_open(self):
+		"""Test that back-to-back intervals do not overlap"""
+		tree = IntervalTree([(10, 20, "A")])
+		
+		self.assertEqual(tree.overlaps(20, 30), [])
+		self.assertEqual(tree.overlaps(0, 10), [])
+		self.assertEqual(tree.overlaps(19, 21), ["A"])
+	
+	def test_empty_tree(self):
+		"""Test an empty roster"""
+		tree = IntervalTree([])
+		
+		self.assertEqual(len(tree), 0)
+		self.assertEqual(tree.overlaps(0, 10), [])
+
+
+class TestValidateFlightCrew(FrappeTestCase):
+	"""Test cases for crew double booking validation"""
+	
+	def setUp(self):
+		"""Cache a roster with one two-hour flight at 10:00"""
+		interval = flight_interval("2030-01-01", "10:00:00", 2 * 60 * 60)
+		frappe.cache().hset(ROSTER_KEY, TEST_CREW, IntervalTree([(*interval, TEST_FLIGHT)]))
+	
+	def get_flight(self, name, time_of_departure, crew=None):
+		return frappe._dict({
+			"name": name,
+			"docstatus": 0,
+			"status": "Scheduled",
+			"date_of_departure": "2030-01-01",
+			"time_of_departure": time_of_departure,
+			"duration": 60 * 60,
+			"flight_crew": [frappe._dict(crew_member=member) for member in (crew or [TEST_CREW])]
+		})
+	
+	def test_conflict(self):
+		"""Test that an overlapping flight is rejected"""
+		with self.assertRaises(frappe.ValidationError):
+			validate_flight_crew(self.get_flight("_Test Other Flight", "11:00:00"))
+	
+	def test_resave_excludes_itself(self):
+		"""Test that a flight does not conflict with its own cached interval"""
+		validate_flight_crew(self.get_flight(TEST_FLIGHT, "10:30:00"))
+	
+	def test_back_to_back_flights(self):
+		"""Test that a flight departing when the last one lands is allowed"""
+		validate_flight_crew(self.get_flight("_Test Other Flight", "12:00:00"))
+	
+	def test_duplicate_crew_member(self):
+		"""Test that a crew member cannot be listed twice"""
+		with self.assertRaises(frappe.ValidationError):
+			validate_flight_crew(self.get_flight("_Test Other Flight", "20:00:00", [TEST_CREW, TEST_CREW]))
+	
+	def tearDown(self):
+		"""Clean up after tests"""
+		frappe.cache().hdel(ROSTER_KEY, [TEST_CREW])
@@ -0,0 +1,91 @@
+# Copyright (c) 2026, nandhakishore and Contributors
+# See license.txt
+
+import random
+
+from frappe.tests.utils import FrappeTestCase
+
+from airplane_mode.airplane_mode.gate_optimizer import assign_gates
+
+
+class TestAssignGates(FrappeTestCase):
+	"""Test cases for gate assignment"""
+	
+	def assertNoOverlaps(self, movements, assignments):
+		"""Every gate, pinned flights included, holds one flight at a time"""
+		by_gate = {}
+		for start, end, flight, gate, pinned in movements:
+			assigned = gate if pinned else assignments.get(flight)
+			if assigned:
+				by_gate.setdefault(assigned, []).append((start, end, flight))
+		
+		for gate, intervals in by_gate.items():
+			intervals.sort()
+			for previous, current in zip(intervals, intervals[1:]):
+				self.assertLessEqual(previous[1], current[0], f"{previous[2]} and {current[2]} share gate {gate}")
+	
+	def get_day(self, flights, gates, pin_every=None):
+		rng = random.Random(7)
+		movements = []
+		for i in range(flights):
+			start = rng.randint(0, 18 * 3600)
+			pinned = bool(pin_every) and i % pin_every == 0
+			movements.append((start, start + 65 * 60, f"FL-{i:03d}", rng.choice(gates), pinned))
+		return movements
+	
+	def test_no_overlaps(self):
+		"""Test that every flight is placed when there are enough gates for the peak"""
+		gates = [f"G{n}" for n in range(1, 41)]
+		movements = self.get_day(200, gates)
+		
+		assignments, unassigned, peak = assign_gates(movements, gates)
+		
+		self.assertEqual(unassigned, [])
+		self.assertEqual(len(assignments), len(movements))
+		self.assertLessEqual(peak, len(gates))
+		self.assertNoOverlaps(movements, assignments)
+	
+	def test_no_overlaps_with_pins(self):
+		"""Test that open flights never share a gate with a pinned flight"""
+		gates = [f"G{n}" for n in range(1, 21)]
+		movements = self.get_day(400, gates, pin_every=25)
+		
+		assignments, unassigned, peak = assign_gates(movements, gates)
+		
+		self.assertNoOverlaps(movements, assignments)
+		self.assertFalse(any(movement[2] in assignments for movement in movements if movement[4]))
+		self.assertEqual(len(assignments) + len(unassigned), sum(1 for movement in movements if not movement[4]))
+	
+	def test_pins_respected(self):
+		"""Test that a pinned flight keeps its gate against a later flight"""
+		movements = [
+			(0, 100, "PINNED", "G1", True),
+			(50, 150, "OPEN", "G1", False)
+		]
+		
+		assignments, unassigned, peak = assign_gates(movements, ["G1", "G2"])
+		
+		self.assertEqual(assignments, {"OPEN": "G2"})
+		self.assertEqual(unassigned, [])
+	
+	def test_current_gate_kept(self):
+		"""Test that a flight stays at its current gate when it is free"""
+		movements = [
+			(0, 100, "A", "G3", False),
+			(0, 100, "B", None, False)
+		]
+		
+		assignments, unassigned, peak = assign_gates(movements, ["G1", "G2", "G3"])
+		
+		self.assertEqual(assignments, {"A": "G3", "B": "G1"})
+		self.assertEqual(peak, 2)
+	
+	def test_unassigned_when_short_of_gates(self):
+		"""Test that flights beyond the gate count are reported unassigned"""
+		movements = [(0, 100, f"FL-{i}", None, False) for i in range(3)]
+		
+		assignments, unassigned, peak = assign_gates(movements, ["G1", "G2"])
+		
+		self.assertEqual(len(assignments), 2)
+		self.assertEqual(unassigned, ["FL-2"])
+		self.assertEqual(peak, 2)
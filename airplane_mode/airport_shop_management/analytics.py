@@ -1,7 +1,14 @@
+import time
+
 import frappe
 from frappe import _
-from frappe.utils import getdate, add_months
-import calendar
+from frappe.utils import getdate, add_days, add_months, get_first_day, get_last_day, flt
+
+from airplane_mode.job_telemetry import record_progress
+
+
+METRICS_DOCTYPE = "Monthly Shop Metrics"
+EXPIRY_WINDOW_DAYS = 30
 
 
 def update_monthly_metrics():
@@ -10,204 +17,215 @@ def update_monthly_metrics():
     Scheduled to run monthly via hooks.py
     """
     try:
-        frappe.log_error("Starting monthly metrics update", "Analytics")
-        
         current_date = getdate()
-        current_month = current_date.month
-        current_year = current_date.year
-        
-        # Update shop occupancy metrics
-        update_shop_occupancy_metrics(current_year, current_month)
-        
-        # Update revenue metrics
-        update_revenue_metrics(current_year, current_month)
-        
-        # Update contract metrics
-        update_contract_metrics(current_year, current_month)
-        
-        # Update lead conversion metrics
-        update_lead_metrics(current_year, current_month)
-        
-        frappe.log_error("Monthly metrics update completed successfully", "Analytics")
-        
+        compute_monthly_metrics(current_date.year, current_date.month)
+        record_progress(rows=1)
+
     except Exception as e:
+        record_progress(failures=1, error=str(e))
         frappe.log_error(f"Monthly metrics update failed: {str(e)}", "Analytics Error")
 
 
-def update_shop_occupancy_metrics(year, month):
+def compute_monthly_metrics(year, month):
     """
-    Update shop occupancy statistics
+    Build every metric group for one month and write them with a single upsert.
+    Safe to re-run: the same month always lands on the same record.
     """
-    try:
-        # Get total shops
+    builder = MonthlyMetricsBuilder(year, month)
+    values = builder.build()
+    upsert_monthly_metrics(builder.year, builder.month, values)
+
+    frappe.logger("airplane_mode.analytics").info({
+        "event": "monthly_metrics",
+        "metrics": get_metrics_name(builder.year, builder.month),
+        "as_of": str(builder.as_of),
+        "timings_ms": builder.timings,
+        "total_ms": round(sum(builder.timings.values()), 3)
+    })
+
+    return values
+
+
+class MonthlyMetricsBuilder:
+    """
+    Computes occupancy, revenue, contract and lead metrics for one month
+    into a single dict. Point-in-time figures (occupancy, expiring and
+    active contracts) are taken as of today for the current month and
+    as of the month end for past months, so backfills reflect that month.
+    """
+
+    def __init__(self, year, month, as_of=None):
+        self.year = int(year)
+        self.month = int(month)
+        self.start_date = getdate(f"{self.year}-{self.month:02d}-01")
+        self.end_date = get_last_day(self.start_date)
+        self.as_of = getdate(as_of) if as_of else min(getdate(), self.end_date)
+        self.is_current = self.as_of >= getdate()
+        self.timings = {}
+
+    def build(self):
+        values = {}
+        for group, method in (
+            ("occupancy", self.get_occupancy_metrics),
+            ("revenue", self.get_revenue_metrics),
+            ("contracts", self.get_contract_metrics),
+            ("leads", self.get_lead_metrics)
+        ):
+            started = time.perf_counter()
+            try:
+                values.update(method())
+            except Exception as e:
+                frappe.log_error(f"{group.title()} metrics failed for {self.year}-{self.month:02d}: {str(e)}", "Analytics Error")
+            self.timings[group] = round((time.perf_counter() - started) * 1000, 3)
+        return values
+
+    def get_contract_statuses(self):
+        # Contracts that have since run out were still live in a past month
+        return ("Active",) if self.is_current else ("Active", "Expired")
+
+    def get_occupancy_metrics(self):
         total_shops = frappe.db.count("Airport Shop")
-        
-        # Get occupied shops (with active contracts)
+
         occupied_shops = frappe.db.sql("""
             SELECT COUNT(DISTINCT cs.shop) as occupied_count
-            FROM `tabContract Shop` cs 
-            WHERE cs.status = 'Active'
-            AND cs.contract_start_date <= CURDATE()
-            AND cs.contract_end_date >= CURDATE()
-        """, as_dict=True)[0].occupied_count or 0
-        
-        # Calculate occupancy rate
-        occupancy_rate = (occupied_shops / total_shops * 100) if total_shops > 0 else 0
-        
-        # Create or update metrics record
-        metrics_doc = get_or_create_monthly_metrics(year, month)
-        metrics_doc.total_shops = total_shops
-        metrics_doc.occupied_shops = occupied_shops
-        metrics_doc.occupancy_rate = occupancy_rate
-        metrics_doc.available_shops = total_shops - occupied_shops
-        metrics_doc.save()
-        
-        frappe.log_error(f"Shop occupancy metrics updated: {occupancy_rate}% occupancy", "Analytics")
-        
-    except Exception as e:
-        frappe.log_error(f"Shop occupancy metrics update failed: {str(e)}", "Analytics Error")
+            FROM `tabContract Shop` cs
+            WHERE cs.status IN %(statuses)s
+            AND cs.contract_start_date <= %(as_of)s
+            AND cs.contract_end_date >= %(as_of)s
+        """, {"statuses": self.get_contract_statuses(), "as_of": self.as_of}, as_dict=True)[0].occupied_count or 0
 
+        return {
+            "total_shops": total_shops,
+            "occupied_shops": occupied_shops,
+            "occupancy_rate": (occupied_shops / total_shops * 100) if total_shops > 0 else 0,
+            "available_shops": total_shops - occupied_shops
+        }
 
-def update_revenue_metrics(year, month):
-    """
-    Update revenue analytics
-    """
-    try:
-        # Get start and end dates for the month
-        start_date = getdate(f"{year}-{month:02d}-01")
-        last_day = calendar.monthrange(year, month)[1]
-        end_date = getdate(f"{year}-{month:02d}-{last_day}")
-        
-        # Calculate monthly revenue from invoices
-        monthly_revenue = frappe.db.sql("""
-            SELECT COALESCE(SUM(si.grand_total), 0) as total_revenue
-            FROM `tabSales Invoice` si
-            WHERE si.posting_date BETWEEN %s AND %s
-            AND si.docstatus = 1
-            AND si.customer_group = 'Airport Tenant'
-        """, (start_date, end_date), as_dict=True)[0].total_revenue or 0
-        
-        # Calculate pending revenue (unpaid invoices)
-        pending_revenue = frappe.db.sql("""
-            SELECT COALESCE(SUM(si.outstanding_amount), 0) as pending_amount
+    def get_revenue_metrics(self):
+        revenue = frappe.db.sql("""
+            SELECT
+                COALESCE(SUM(CASE WHEN si.posting_date >= %(start_date)s THEN si.grand_total END), 0) as monthly_revenue,
+                COALESCE(SUM(CASE WHEN si.outstanding_amount > 0 THEN si.outstanding_amount END), 0) as pending_revenue
             FROM `tabSales Invoice` si
-            WHERE si.outstanding_amount > 0
+            WHERE si.posting_date <= %(end_date)s
             AND si.docstatus = 1
             AND si.customer_group = 'Airport Tenant'
-        """, as_dict=True)[0].pending_amount or 0
-        
-        # Update metrics
-        metrics_doc = get_or_create_monthly_metrics(year, month)
-        metrics_doc.monthly_revenue = monthly_revenue
-        metrics_doc.pending_revenue = pending_revenue
-        metrics_doc.collection_efficiency = ((monthly_revenue - pending_revenue) / monthly_revenue * 100) if monthly_revenue > 0 else 0
-        metrics_doc.save()
-        
-        frappe.log_error(f"Revenue metrics updated: {monthly_revenue} monthly revenue", "Analytics")
-        
-    except Exception as e:
-        frappe.log_error(f"Revenue metrics update failed: {str(e)}", "Analytics Error")
+        """, {"start_date": self.start_date, "end_date": self.end_date}, as_dict=True)[0]
 
+        monthly_revenue = flt(revenue.monthly_revenue)
+        pending_revenue = flt(revenue.pending_revenue)
 
-def update_contract_metrics(year, month):
-    """
-    Update contract-related metrics
-    """
-    try:
-        # Get contracts expiring in next 30 days
-        expiring_contracts = frappe.db.sql("""
-            SELECT COUNT(*) as expiring_count
-            FROM `tabContract Shop` cs
-            WHERE cs.status = 'Active'
-            AND cs.contract_end_date BETWEEN CURDATE() AND DATE_ADD(CURDATE(), INTERVAL 30 DAY)
-        """, as_dict=True)[0].expiring_count or 0
-        
-        # Get new contracts signed this month
-        start_date = getdate(f"{year}-{month:02d}-01")
-        last_day = calendar.monthrange(year, month)[1]
-        end_date = getdate(f"{year}-{month:02d}-{last_day}")
-        
-        new_contracts = frappe.db.sql("""
-            SELECT COUNT(*) as new_count
+        return {
+            "monthly_revenue": monthly_revenue,
+            "pending_revenue": pending_revenue,
+            "collection_efficiency": ((monthly_revenue - pending_revenue) / monthly_revenue * 100) if monthly_revenue > 0 else 0
+        }
+
+    def get_contract_metrics(self):
+        contracts = frappe.db.sql("""
+            SELECT
+                SUM(CASE WHEN cs.status IN %(statuses)s
+                    AND cs.contract_end_date BETWEEN %(as_of)s AND %(expiry_until)s THEN 1 ELSE 0 END) as expiring_contracts,
+                SUM(CASE WHEN cs.creation BETWEEN %(start_date)s AND %(end_of_month)s
+                    AND cs.docstatus = 1 THEN 1 ELSE 0 END) as new_contracts,
+                SUM(CASE WHEN cs.status IN %(statuses)s
+                    AND (%(is_current)s OR (cs.contract_start_date <= %(as_of)s AND cs.contract_end_date >= %(as_of)s))
+                    THEN 1 ELSE 0 END) as active_contracts
             FROM `tabContract Shop` cs
-            WHERE cs.creation BETWEEN %s AND %s
-            AND cs.docstatus = 1
-        """, (start_date, end_date), as_dict=True)[0].new_count or 0
-        
-        # Get total active contracts
-        active_contracts = frappe.db.count("Contract Shop", {"status": "Active"})
-        
-        # Update metrics
-        metrics_doc = get_or_create_monthly_metrics(year, month)
-        metrics_doc.expiring_contracts = expiring_contracts
-        metrics_doc.new_contracts = new_contracts
-        metrics_doc.active_contracts = active_contracts
-        metrics_doc.save()
-        
-        frappe.log_error(f"Contract metrics updated: {new_contracts} new contracts", "Analytics")
-        
-    except Exception as e:
-        frappe.log_error(f"Contract metrics update failed: {str(e)}", "Analytics Error")
+        """, {
+            "statuses": self.get_contract_statuses(),
+            "as_of": self.as_of,
+            "expiry_until": add_days(self.as_of, EXPIRY_WINDOW_DAYS),
+            "start_date": self.start_date,
+            "end_of_month": f"{self.end_date} 23:59:59.999999",
+            "is_current": 1 if self.is_current else 0
+        }, as_dict=True)[0]
 
+        return {
+            "expiring_contracts": int(contracts.expiring_contracts or 0),
+            "new_contracts": int(contracts.new_contracts or 0),
+            "active_contracts": int(contracts.active_contracts or 0)
+        }
 
-def update_lead_metrics(year, month):
-    """
-    Update lead conversion metrics
-    """
-    try:
-        # Get start and end dates for the month
-        start_date = getdate(f"{year}-{month:02d}-01")
-        last_day = calendar.monthrange(year, month)[1]
-        end_date = getdate(f"{year}-{month:02d}-{last_day}")
-        
-        # Get new leads this month
-        new_leads = frappe.db.sql("""
-            SELECT COUNT(*) as new_leads_count
+    def get_lead_metrics(self):
+        leads = frappe.db.sql("""
+            SELECT
+                COUNT(*) as new_leads,
+                COUNT(DISTINCT CASE WHEN EXISTS (
+                    SELECT 1 FROM `tabContract Shop` cs
+                    WHERE cs.tenant_email = sl.email AND cs.docstatus = 1
+                ) THEN sl.name END) as converted_leads
             FROM `tabShop Lead` sl
-            WHERE sl.creation BETWEEN %s AND %s
-        """, (start_date, end_date), as_dict=True)[0].new_leads_count or 0
-        
-        # Get converted leads (leads that resulted in contracts)
-        converted_leads = frappe.db.sql("""
-            SELECT COUNT(DISTINCT sl.name) as converted_count
-            FROM `tabShop Lead` sl
-            INNER JOIN `tabContract Shop` cs ON sl.email = cs.tenant_email
-            WHERE sl.creation BETWEEN %s AND %s
-            AND cs.docstatus = 1
-        """, (start_date, end_date), as_dict=True)[0].converted_count or 0
-        
-        # Calculate conversion rate
-        conversion_rate = (converted_leads / new_leads * 100) if new_leads > 0 else 0
-        
-        # Update metrics
-        metrics_doc = get_or_create_monthly_metrics(year, month)
-        metrics_doc.new_leads = new_leads
-        metrics_doc.converted_leads = converted_leads
-        metrics_doc.conversion_rate = conversion_rate
-        metrics_doc.save()
-        
-        frappe.log_error(f"Lead metrics updated: {conversion_rate}% conversion rate", "Analytics")
-        
-    except Exception as e:
-        frappe.log_error(f"Lead metrics update failed: {str(e)}", "Analytics Error")
+            WHERE sl.creation BETWEEN %(start_date)s AND %(end_of_month)s
+        """, {"start_date": self.start_date, "end_of_month": f"{self.end_date} 23:59:59.999999"}, as_dict=True)[0]
+
+        new_leads = leads.new_leads or 0
+        converted_leads = leads.converted_leads or 0
+
+        return {
+            "new_leads": new_leads,
+            "converted_leads": converted_leads,
+            "conversion_rate": (converted_leads / new_leads * 100) if new_leads > 0 else 0
+        }
+
+
+def get_metrics_name(year, month):
+    return f"METRICS-{int(year)}-{int(month):02d}"
 
 
-def get_or_create_monthly_metrics(year, month):
+def upsert_monthly_metrics(year, month, values):
     """
-    Get existing monthly metrics document or create new one
+    Write a month's metrics in one statement: update the record if it
+    exists, otherwise insert it. A concurrent insert of the same month
+    falls back to the update path.
     """
-    metrics_name = f"METRICS-{year}-{month:02d}"
-    
-    if frappe.db.exists("Monthly Shop Metrics", metrics_name):
-        return frappe.get_doc("Monthly Shop Metrics", metrics_name)
-    else:
-        # Create new metrics document
-        metrics_doc = frappe.new_doc("Monthly Shop Metrics")
+    metrics_name = get_metrics_name(year, month)
+
+    if not frappe.db.exists(METRICS_DOCTYPE, metrics_name):
+        metrics_doc = frappe.new_doc(METRICS_DOCTYPE)
         metrics_doc.name = metrics_name
         metrics_doc.year = year
         metrics_doc.month = month
-        metrics_doc.insert()
-        return metrics_doc
+        metrics_doc.update(values)
+        try:
+            metrics_doc.insert(ignore_permissions=True)
+            return metrics_name
+        except frappe.DuplicateEntryError:
+            pass
+
+    frappe.db.set_value(METRICS_DOCTYPE, metrics_name, values)
+    return metrics_name
+
+
+@frappe.whitelist()
+def backfill_monthly_metrics(from_date, to_date=None):
+    """
+    Recompute metrics for every month from from_date to to_date (default: this month).
+    Each month runs as its own background job so months are processed in parallel.
+    """
+    frappe.only_for("System Manager")
+
+    month = get_first_day(getdate(from_date))
+    last_month = get_first_day(getdate(to_date) if to_date else getdate())
+
+    if month > last_month:
+        frappe.throw(_("From Date must be before To Date"))
+
+    queued = []
+    while month <= last_month:
+        metrics_name = get_metrics_name(month.year, month.month)
+        frappe.enqueue(
+            "airplane_mode.airport_shop_management.analytics.compute_monthly_metrics",
+            queue="long",
+            job_id=f"monthly_metrics::{metrics_name}",
+            deduplicate=True,
+            year=month.year,
+            month=month.month
+        )
+        queued.append(metrics_name)
+        month = add_months(month, 1)
+
+    return queued
 
 
 @frappe.whitelist()
@@ -0,0 +1,171 @@
+import frappe
+from frappe.utils import format_date, getdate, today
+
+from airplane_mode.airport_shop_management.shop_state_sync import release_shops
+from airplane_mode.job_telemetry import record_progress
+
+
+def sweep_contracts(as_of=None, notify=True):
+    """
+    Nightly contract lifecycle sweep, scheduled daily via hooks.py.
+
+    In a handful of set-based statements:
+      - Contract Shops past their end date become Expired
+      - Shop Lease Contracts past their end date become Completed
+      - lease_duration and remaining_months are refreshed on every lease
+      - shops left without an active lease are marked Available
+
+    Returns the status transitions. With notify=True they are handed to a
+    background job for notification once the sweep commits.
+    """
+    as_of = getdate(as_of or today())
+
+    transitions = expire_contract_shops(as_of) + complete_leases(as_of)
+    refreshed = refresh_lease_months(as_of)
+    vacated = release_vacated_shops([t["shop"] for t in transitions if t["doctype"] == "Shop Lease Contract"])
+
+    summary = {
+        "as_of": str(as_of),
+        "transitions": len(transitions),
+        "leases_refreshed": refreshed,
+        "shops_vacated": vacated
+    }
+    frappe.logger("airplane_mode.jobs").info(dict(summary, event="contract_sweep"))
+    record_progress(rows=len(transitions) + refreshed)
+
+    if notify and transitions:
+        frappe.enqueue(
+            "airplane_mode.airport_shop_management.contract_sweeper.notify_transitions",
+            transitions=transitions,
+            queue="short",
+            job_id=f"contract_transitions::{as_of}",
+            deduplicate=True,
+            enqueue_after_commit=True
+        )
+
+    return dict(summary, changes=transitions)
+
+
+def expire_contract_shops(as_of):
+    rows = frappe.db.sql("""
+        SELECT name, shop_name, tenant_name, tenant_email, end_date
+        FROM `tabContract Shop`
+        WHERE status = 'Active' AND end_date < %(as_of)s
+        FOR UPDATE
+    """, {"as_of": as_of}, as_dict=True)
+
+    if rows:
+        frappe.db.sql("""
+            UPDATE `tabContract Shop`
+            SET status = 'Expired'
+            WHERE status = 'Active' AND end_date < %(as_of)s
+        """, {"as_of": as_of})
+
+    return [
+        {
+            "doctype": "Contract Shop",
+            "name": row.name,
+            "from_status": "Active",
+            "to_status": "Expired",
+            "shop": row.shop_name,
+            "tenant": row.tenant_name,
+            "email": row.tenant_email,
+            "end_date": str(row.end_date)
+        }
+        for row in rows
+    ]
+
+
+def complete_leases(as_of):
+    rows = frappe.db.sql("""
+        SELECT lease.name, lease.contract_shop, lease.tenant, lease.end_date, tenant.email
+        FROM `tabShop Lease Contract` lease
+        LEFT JOIN `tabTenant` tenant ON tenant.name = lease.tenant
+        WHERE lease.status = 'Active' AND lease.docstatus < 2 AND lease.end_date < %(as_of)s
+        FOR UPDATE
+    """, {"as_of": as_of}, as_dict=True)
+
+    if rows:
+        frappe.db.sql("""
+            UPDATE `tabShop Lease Contract`
+            SET status = 'Completed', remaining_months = 0
+            WHERE status = 'Active' AND docstatus < 2 AND end_date < %(as_of)s
+        """, {"as_of": as_of})
+
+    return [
+        {
+            "doctype": "Shop Lease Contract",
+            "name": row.name,
+            "from_status": "Active",
+            "to_status": "Completed",
+            "shop": row.contract_shop,
+            "tenant": row.tenant,
+            "email": row.email,
+            "end_date": str(row.end_date)
+        }
+        for row in rows
+    ]
+
+
+def refresh_lease_months(as_of):
+    """Same arithmetic as ShopLeaseContract.calculate_*, for every lease whose values drifted"""
+    frappe.db.sql("""
+        UPDATE `tabShop Lease Contract`
+        SET lease_duration = DATEDIFF(end_date, start_date) DIV 30,
+            remaining_months = CASE
+                WHEN end_date > %(as_of)s THEN GREATEST(0, DATEDIFF(end_date, %(as_of)s) DIV 30)
+                ELSE 0
+            END
+        WHERE docstatus < 2 AND start_date IS NOT NULL AND end_date IS NOT NULL
+        AND (
+            IFNULL(lease_duration, -1) != DATEDIFF(end_date, start_date) DIV 30
+            OR IFNULL(remaining_months, -1) != CASE
+                WHEN end_date > %(as_of)s THEN GREATEST(0, DATEDIFF(end_date, %(as_of)s) DIV 30)
+                ELSE 0
+            END
+        )
+    """, {"as_of": as_of})
+
+    return frappe.db._cursor.rowcount if frappe.db._cursor else 0
+
+
+def release_vacated_shops(shops):
+    """Occupied shops from the given list that no longer have an active lease"""
+    shops = list({shop for shop in shops if shop})
+    if not shops:
+        return 0
+
+    vacated = frappe.db.sql_list("""
+        SELECT shop.name
+        FROM `tabAirport Shop` shop
+        WHERE shop.name IN %(shops)s AND shop.status = 'Occupied'
+        AND NOT EXISTS (
+            SELECT 1 FROM `tabShop Lease Contract` lease
+            WHERE lease.contract_shop = shop.name AND lease.status = 'Active' AND lease.docstatus < 2
+        )
+    """, {"shops": tuple(shops)})
+
+    return release_shops(vacated)
+
+
+def notify_transitions(transitions):
+    """Email tenants about contracts that ended in the nightly sweep"""
+    for transition in transitions:
+        if not transition.get("email"):
+            continue
+
+        try:
+            frappe.sendmail(
+                recipients=[transition["email"]],
+                subject=f"Your airport shop contract {transition['name']} has ended",
+                message=f"""
+                    <p>Dear {transition.get('tenant') or 'Tenant'},</p>
+                    <p>Your contract <strong>{transition['name']}</strong> for shop
+                    <strong>{transition.get('shop') or ''}</strong> ended on
+                    {format_date(transition['end_date'])} and is now marked {transition['to_status']}.</p>
+                    <p>Please contact the airport shop office if you would like to renew.</p>
+                """,
+                delayed=True
+            )
+        except Exception as e:
+            frappe.log_error(f"Contract transition email failed for {transition['name']}: {str(e)}", "Contract Sweeper")
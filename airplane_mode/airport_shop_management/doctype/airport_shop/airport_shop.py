@@ -4,6 +4,9 @@
 import frappe
 from frappe.model.document import Document
 
+from airplane_mode.airport_shop_management.shop_state_sync import sync_contract_rent
+from airplane_mode.reference_cache import get_reference_value
+
 class AirportShop(Document):
     def validate(self):
         """Validate shop data and auto-populate fields"""
@@ -33,13 +36,11 @@ class AirportShop(Document):
         try:
             # Populate airport name
             if self.airport and not self.airport_name:
-                airport_doc = frappe.get_doc("Airport", self.airport)
-                self.airport_name = airport_doc.airport_name
+                self.airport_name = get_reference_value("Airport", self.airport, "airport_name")
             
             # Populate shop type name
             if self.shop_type and not self.shop_type_name:
-                shop_type_doc = frappe.get_doc("Shop Type", self.shop_type)
-                self.shop_type_name = shop_type_doc.shop_type_name
+                self.shop_type_name = get_reference_value("Shop Type", self.shop_type, "shop_type_name")
                 
         except Exception as e:
             frappe.log_error(f"Error populating linked field names: {str(e)}", "Airport Shop Validation")
@@ -65,22 +66,10 @@ class AirportShop(Document):
         self.update_lease_contracts()
     
     def update_lease_contracts(self):
-        """Update related lease contracts when shop details change"""
+        """Copy a changed rent onto active lease contracts, in this transaction"""
         try:
-            # Find active lease contracts for this shop
-            contracts = frappe.get_all("Shop Lease Contract",
-                filters={"contract_shop": self.name, "status": "Active"},
-                fields=["name"]
-            )
-            
-            for contract in contracts:
-                # Update contract rent amount if shop rent changed
-                if self.rent_per_month:
-                    frappe.db.set_value("Shop Lease Contract", contract.name, 
-                                      "rent_amount", self.rent_per_month)
-            
-            if contracts:
-                frappe.db.commit()
+            if self.has_value_changed("rent_per_month"):
+                sync_contract_rent(self.name, self.rent_per_month)
                 
         except Exception as e:
             frappe.log_error(f"Error updating lease contracts: {str(e)}", "Airport Shop Update")
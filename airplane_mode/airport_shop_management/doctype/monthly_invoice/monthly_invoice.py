@@ -4,6 +4,8 @@
 import frappe
 from frappe.model.document import Document
 
+from airplane_mode.permission_context import get_permission_context
+
 class MonthlyInvoice(Document):
     def validate(self):
         """Validate and set default values"""
@@ -108,11 +110,11 @@ def get_permission_query_conditions(user):
         user = frappe.session.user
     
     # Allow System Manager and Airport Shop Manager to see all records
-    if "System Manager" in frappe.get_roles(user) or "Airport Shop Manager" in frappe.get_roles(user):
+    if get_permission_context(user).has_role("System Manager", "Airport Shop Manager"):
         return None
     
     # For other users, show only their own records or records they have access to
-    return """`tabMonthly Invoice`.owner = '{user}'""".format(user=frappe.db.escape(user))
+    return """`tabMonthly Invoice`.owner = {user}""".format(user=frappe.db.escape(user))
 
 def has_permission(doc, user):
     """Check if user has permission to access a specific Monthly Invoice"""
@@ -120,7 +122,7 @@ def has_permission(doc, user):
         user = frappe.session.user
     
     # Allow System Manager and Airport Shop Manager full access
-    if "System Manager" in frappe.get_roles(user) or "Airport Shop Manager" in frappe.get_roles(user):
+    if get_permission_context(user).has_role("System Manager", "Airport Shop Manager"):
         return True
     
     # Check if user is the owner
@@ -5,6 +5,8 @@ import frappe
 from frappe.model.document import Document
 from frappe.utils import today, add_days, getdate
 
+from airplane_mode.job_telemetry import record_progress
+
 
 class RentRemainderAlerts(Document):
 	"""Rent Remainder Alerts DocType Controller"""
@@ -99,6 +101,7 @@ def create_rent_alerts():
 			alert.insert()
 			alerts_created += 1
 	
+	record_progress(rows=alerts_created)
 	return f"Created {alerts_created} rent reminder alerts"
 
 @frappe.whitelist()
@@ -117,6 +120,7 @@ def send_pending_alerts():
 		alert_doc.send_alert()
 		sent_count += 1
 	
+	record_progress(rows=sent_count)
 	return f"Sent {sent_count} rent reminder alerts"
 
 @frappe.whitelist()
@@ -129,11 +133,7 @@ def check_rent_due_alerts():
 		# Step 2: Send pending alerts
 		send_result = send_pending_alerts()
 		
-		# Log results
-		frappe.log_error(
-			title="Rent Due Alerts Check",
-			message=f"Daily rent alerts check completed successfully.\n{create_result}\n{send_result}"
-		)
+		frappe.logger("airplane_mode.jobs").info(f"Rent due alerts check: {create_result}; {send_result}")
 		
 		return {
 			"success": True,
@@ -142,6 +142,7 @@ def check_rent_due_alerts():
 		}
 		
 	except Exception as e:
+		record_progress(failures=1, error=str(e))
 		frappe.log_error(
 			title="Rent Due Alerts Error",
 			message=f"Error during rent due alerts check: {str(e)}"
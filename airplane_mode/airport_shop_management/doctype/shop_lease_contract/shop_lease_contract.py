@@ -5,6 +5,8 @@ import frappe
 from frappe.model.document import Document
 from frappe.utils import getdate, date_diff, add_months, today
 
+from airplane_mode.airport_shop_management.shop_state_sync import occupy_shops, release_shops
+
 
 class ShopLeaseContract(Document):
 	"""Shop Lease Contract DocType Controller"""
@@ -46,27 +48,18 @@ class ShopLeaseContract(Document):
 		"""Actions after updating the document"""
 		# Update shop occupancy status
 		if self.contract_shop and self.status == "Active":
-			shop_doc = frappe.get_doc("Airport Shop", self.contract_shop)
-			shop_doc.status = "Occupied"
-			if self.tenant:
-				tenant_doc = frappe.get_doc("Tenant", self.tenant)
-				shop_doc.tenant = tenant_doc.customer
-			shop_doc.save()
+			occupy_shops({self.contract_shop: self.tenant})
 		
 	def on_submit(self):
 		"""Actions on document submission"""
-		self.status = "Active"
-		self.on_update()
+		self.db_set("status", "Active")
+		occupy_shops({self.contract_shop: self.tenant})
 		
 	def on_cancel(self):
 		"""Actions on document cancellation"""
-		self.status = "Cancelled"
+		self.db_set("status", "Cancelled")
 		# Free up the shop
-		if self.contract_shop:
-			shop_doc = frappe.get_doc("Airport Shop", self.contract_shop)
-			shop_doc.status = "Available"
-			shop_doc.tenant = ""
-			shop_doc.save()
+		release_shops([self.contract_shop])
 
 @frappe.whitelist()
 def get_active_contracts():
@@ -0,0 +1,257 @@
+"""
+Occupancy, rent roll and revenue-at-risk forecasting.
+
+All active leases are loaded once into NumPy arrays of month indexes
+(year * 12 + month - 1) and rents. Projections are computed for all
+contracts and all months at once as N x H matrices, and summed into groups
+with a few bincounts per dimension.
+
+Renewal scenarios: when a lease term ends it renews for another term of
+the same length with probability p, so a contract is still occupied j
+terms after its current end date with probability p ** j.
+"""
+
+import time
+
+import frappe
+import numpy as np
+from frappe.utils import get_first_day, getdate, today
+
+
+HORIZON_MONTHS = 24
+RENEWAL_SCENARIOS = {"low": 0.5, "expected": 0.75, "high": 0.9}
+DIMENSIONS = ("airport", "terminal", "shop_type")
+UNASSIGNED = "Unassigned"
+CACHE_KEY = "airplane_mode_occupancy_forecast"
+CACHE_TTL = 24 * 60 * 60
+
+
+class ContractArrays:
+    """Columns of the active lease book, plus the shop inventory per group"""
+
+    def __init__(self, start, end, rent, contract_groups, shop_groups):
+        self.start = np.asarray(start, dtype=np.int32)
+        self.end = np.asarray(end, dtype=np.int32)
+        self.rent = np.asarray(rent, dtype=np.float64)
+        # Renewals repeat the original term, at least one month
+        self.term = np.maximum(self.end - self.start + 1, 1)
+
+        # Per dimension: sorted labels, a group code per contract and shop totals per group
+        self.labels, self.codes, self.shop_totals = {}, {}, {}
+        for dimension in contract_groups:
+            contract_labels = np.asarray(contract_groups[dimension], dtype=object)
+            shop_labels = np.asarray(shop_groups[dimension], dtype=object)
+            labels, inverse = np.unique(np.concatenate([contract_labels, shop_labels]).astype(str), return_inverse=True)
+            self.labels[dimension] = labels.tolist()
+            self.codes[dimension] = inverse[:len(contract_labels)]
+            self.shop_totals[dimension] = np.bincount(inverse[len(contract_labels):], minlength=len(labels))
+
+    def __len__(self):
+        return len(self.start)
+
+
+def month_index(value):
+    value = getdate(value)
+    return value.year * 12 + value.month - 1
+
+
+def month_label(index):
+    return f"{index // 12}-{index % 12 + 1:02d}"
+
+
+def get_dimension_fields():
+    """Airport Shop fields behind each dimension; terminal is optional on some sites"""
+    meta = frappe.get_meta("Airport Shop")
+    return {dimension: dimension if meta.has_field(dimension) else None for dimension in DIMENSIONS}
+
+
+def load_contract_arrays(as_of):
+    fields = get_dimension_fields()
+    columns = ", ".join(
+        f"IFNULL(NULLIF(shop.`{field}`, ''), '{UNASSIGNED}')" if field else f"'{UNASSIGNED}'"
+        for field in fields.values()
+    )
+
+    contracts = frappe.db.sql(f"""
+        SELECT lease.start_date, lease.end_date, IFNULL(lease.rent_amount, 0), {columns}
+        FROM `tabShop Lease Contract` lease
+        INNER JOIN `tabAirport Shop` shop ON shop.name = lease.contract_shop
+        WHERE lease.docstatus = 1 AND lease.status = 'Active'
+        AND lease.start_date IS NOT NULL AND lease.end_date >= %(month_start)s
+    """, {"month_start": get_first_day(as_of)})
+    shops = frappe.db.sql(f"SELECT {columns} FROM `tabAirport Shop` shop")
+
+    contract_columns = list(zip(*contracts)) if contracts else [()] * (3 + len(DIMENSIONS))
+    shop_columns = list(zip(*shops)) if shops else [()] * len(DIMENSIONS)
+
+    return ContractArrays(
+        start=[month_index(value) for value in contract_columns[0]],
+        end=[month_index(value) for value in contract_columns[1]],
+        rent=contract_columns[2],
+        contract_groups={dimension: contract_columns[3 + i] for i, dimension in enumerate(DIMENSIONS)},
+        shop_groups={dimension: shop_columns[i] for i, dimension in enumerate(DIMENSIONS)}
+    )
+
+
+def project(arrays, first_month, horizon=HORIZON_MONTHS, scenarios=None):
+    """
+    Project every contract over `horizon` months from `first_month` and sum
+    per group. Returns {dimension: {scenario: {measure: G x H array}}}.
+
+    Contracts are first counted per (group, month, renewals needed), so each
+    scenario is only a weighted sum over that small histogram.
+    """
+    scenarios = scenarios or RENEWAL_SCENARIOS
+    months = first_month + np.arange(horizon, dtype=np.int32)
+
+    started = months[None, :] >= arrays.start[:, None]
+    since_end = months[None, :] - arrays.end[:, None]
+    term = arrays.term[:, None]
+
+    # Renewals needed to still be occupied in a month; 0 inside the current term
+    renewals = np.where(since_end > 0, -(-since_end // term), 0)
+    # A term ends in this month: the current one (j = 0) or the j-th renewal
+    term_ends = (since_end >= 0) & (since_end % term == 0)
+    ended_terms = np.where(term_ends, since_end // term, 0)
+
+    depth = int(renewals.max(initial=0)) + 1
+    month_offsets = np.arange(horizon)[None, :] * depth
+    occupied_slots = (month_offsets + renewals)[started]
+    risk_slots = (month_offsets + ended_terms)[term_ends]
+    rent = np.broadcast_to(arrays.rent[:, None], started.shape)
+    occupied_rent, risk_rent = rent[started], rent[term_ends]
+
+    powers = {scenario: np.power(probability, np.arange(depth)) for scenario, probability in scenarios.items()}
+
+    results = {}
+    for dimension, codes in arrays.codes.items():
+        groups = len(arrays.labels[dimension])
+        shape, size = (groups, horizon, depth), groups * horizon * depth
+        group_offsets = np.broadcast_to((codes * horizon * depth)[:, None], started.shape)
+
+        occupied_bins = group_offsets[started] + occupied_slots
+        risk_bins = group_offsets[term_ends] + risk_slots
+        occupied = np.bincount(occupied_bins, minlength=size).reshape(shape)
+        rent_roll = np.bincount(occupied_bins, weights=occupied_rent, minlength=size).reshape(shape)
+        at_risk = np.bincount(risk_bins, weights=risk_rent, minlength=size).reshape(shape)
+        # Current terms ending in each month, before any renewal
+        expiring = np.bincount(risk_bins, minlength=size).reshape(shape)[:, :, 0]
+        expiring_rent = at_risk[:, :, 0]
+
+        results[dimension] = {}
+        for scenario, probability in scenarios.items():
+            weights = powers[scenario]
+            scenario_at_risk = at_risk @ weights
+            results[dimension][scenario] = {
+                "occupied": occupied @ weights,
+                "rent_roll": rent_roll @ weights,
+                "revenue_at_risk": scenario_at_risk,
+                "expected_loss": scenario_at_risk * (1 - probability),
+                "expiring_contracts": expiring,
+                "expiring_rent": expiring_rent
+            }
+
+    return results
+
+
+def build_forecast(as_of=None, horizon=HORIZON_MONTHS, scenarios=None):
+    as_of = getdate(as_of or today())
+    scenarios = scenarios or RENEWAL_SCENARIOS
+    first_month = month_index(as_of)
+
+    started = time.perf_counter()
+    arrays = load_contract_arrays(as_of)
+    loaded = time.perf_counter()
+    projection = project(arrays, first_month, horizon, scenarios)
+    projected = time.perf_counter()
+
+    forecast = {
+        "as_of": str(as_of),
+        "months": [month_label(first_month + i) for i in range(horizon)],
+        "scenarios": scenarios,
+        "contracts": len(arrays),
+        "dimensions": {},
+        "totals": {},
+        "timings_ms": {
+            "load": round((loaded - started) * 1000, 3),
+            "project": round((projected - loaded) * 1000, 3)
+        }
+    }
+
+    for dimension, by_scenario in projection.items():
+        totals = arrays.shop_totals[dimension]
+        forecast["dimensions"][dimension] = {
+            "groups": arrays.labels[dimension],
+            "shops": totals.tolist(),
+            "scenarios": {
+                scenario: serialize_measures(measures, totals)
+                for scenario, measures in by_scenario.items()
+            }
+        }
+
+    # Every dimension partitions the same contracts; totals come from the first
+    first = projection[DIMENSIONS[0]]
+    shop_count = np.array([arrays.shop_totals[DIMENSIONS[0]].sum()])
+    forecast["totals"] = {
+        scenario: {
+            key: values[0]
+            for key, values in serialize_measures(
+                {measure: values.sum(axis=0, keepdims=True) for measure, values in measures.items()},
+                shop_count
+            ).items()
+        }
+        for scenario, measures in first.items()
+    }
+
+    return forecast
+
+
+def serialize_measures(measures, shop_totals):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        occupancy = np.where(shop_totals[:, None] > 0, measures["occupied"] / shop_totals[:, None] * 100, 0.0)
+
+    serialized = {measure: np.round(values, 2).tolist() for measure, values in measures.items()}
+    serialized["occupancy_pct"] = np.round(occupancy, 2).tolist()
+    return serialized
+
+
+def get_forecast(as_of=None, refresh=False):
+    """The day's forecast with the default scenarios, computed at most once per day"""
+    as_of = getdate(as_of or today())
+    key = f"{CACHE_KEY}:{as_of}"
+    cache = frappe.cache()
+
+    forecast = None if refresh else cache.get_value(key)
+    if forecast is None:
+        forecast = build_forecast(as_of)
+        forecast["computed_on"] = frappe.utils.now()
+        cache.set_value(key, forecast, expires_in_sec=CACHE_TTL)
+
+    return forecast
+
+
+def measure(contracts=100_000, groups=(40, 4, 8), horizon=HORIZON_MONTHS, seed=7):
+    """
+    Time project() on a synthetic lease book of `contracts` rows, without
+    the database. Run with:
+        bench --site <site> execute airplane_mode.airport_shop_management.forecasting.measure
+    """
+    rng = np.random.default_rng(seed)
+    first_month = month_index(today())
+    start = first_month - rng.integers(0, 48, contracts)
+    end = start + rng.choice([12, 24, 36, 60], contracts) - 1
+    end = np.maximum(end, first_month)
+
+    arrays = ContractArrays(
+        start=start,
+        end=end,
+        rent=rng.uniform(20_000, 400_000, contracts).round(),
+        contract_groups={dimension: rng.integers(0, count, contracts) for dimension, count in zip(DIMENSIONS, groups)},
+        shop_groups={dimension: rng.integers(0, count, contracts) for dimension, count in zip(DIMENSIONS, groups)}
+    )
+
+    started = time.perf_counter()
+    project(arrays, first_month, horizon)
+    elapsed = time.perf_counter() - started
+
+    return {"contracts": contracts, "horizon": horizon, "project_ms": round(elapsed * 1000, 3)}
@@ -0,0 +1,176 @@
+import json
+import time
+
+import frappe
+from frappe import _
+
+
+# Token buckets: capacity is the burst size, rate the refill in tokens per second.
+# Override per site with "airplane_mode_lead_rate_limits" in site_config.json.
+DEFAULT_RATE_LIMITS = {
+    "ip": {"capacity": 10, "rate": 1 / 30},
+    "email": {"capacity": 3, "rate": 1 / 600}
+}
+
+IDEMPOTENCY_TTL = 24 * 60 * 60
+IDEMPOTENCY_PENDING = "pending"
+OPEN_LEAD_STATUSES = ["Open", "Contacted", "Interested"]
+
+# Refill and take in one step so concurrent workers cannot overspend a bucket
+TOKEN_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(now - ts, 0) * rate)
+local allowed = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+return {allowed, tostring(tokens)}
+"""
+
+
+def get_rate_limits():
+    limits = {scope: dict(limit) for scope, limit in DEFAULT_RATE_LIMITS.items()}
+    for scope, limit in (frappe.conf.get("airplane_mode_lead_rate_limits") or {}).items():
+        limits.setdefault(scope, {}).update(limit)
+    return limits
+
+
+def get_bucket_key(scope, identity):
+    return frappe.cache().make_key(f"lead_intake_bucket:{scope}:{identity}")
+
+
+def take_token(scope, identity, capacity, rate):
+    """Take one token from the bucket; returns (allowed, seconds until the next token)"""
+    allowed, tokens = frappe.cache().eval(
+        TOKEN_BUCKET_SCRIPT, 1, get_bucket_key(scope, identity), capacity, rate, time.time()
+    )
+    retry_after = 0 if allowed else max((1 - float(tokens)) / rate, 0)
+    return bool(allowed), retry_after
+
+
+def check_rate_limit(ip=None, email=None):
+    """Throttle guest submissions per client IP and per applicant email"""
+    limits = get_rate_limits()
+    for scope, identity in (("ip", ip), ("email", email)):
+        if not identity:
+            continue
+
+        allowed, retry_after = take_token(scope, identity, **limits[scope])
+        if not allowed:
+            raise frappe.TooManyRequestsError(
+                _("Too many applications. Please try again in {0} seconds.").format(int(retry_after) + 1)
+            )
+
+
+def clear_rate_limits(ip=None, email=None):
+    cache = frappe.cache()
+    for scope, identity in (("ip", ip), ("email", email)):
+        if identity:
+            cache.delete(get_bucket_key(scope, identity))
+
+
+def get_idempotency_key(key):
+    return frappe.cache().make_key(f"lead_intake_idempotency:{key}")
+
+
+def claim_idempotency_key(key):
+    """
+    Reserve key for this submission. Returns None if it is new, otherwise
+    the stored response of the earlier submission (or the pending marker).
+    """
+    cache = frappe.cache()
+    cache_key = get_idempotency_key(key)
+    if cache.set(cache_key, IDEMPOTENCY_PENDING, nx=True, ex=IDEMPOTENCY_TTL):
+        return None
+
+    stored = cache.get(cache_key)
+    if stored is None:
+        # Expired between the two calls; take it again
+        return claim_idempotency_key(key)
+
+    stored = frappe.safe_decode(stored)
+    return stored if stored == IDEMPOTENCY_PENDING else json.loads(stored)
+
+
+def store_idempotent_response(key, response):
+    frappe.cache().set(get_idempotency_key(key), json.dumps(response, default=str), ex=IDEMPOTENCY_TTL)
+
+
+def release_idempotency_key(key):
+    frappe.cache().delete(get_idempotency_key(key))
+
+
+def find_duplicate_lead(shop, email):
+    """Open lead for the same shop and email; served by the Shop Lead dedupe index"""
+    if not frappe.db.exists("DocType", "Shop Lead"):
+        return None
+
+    return frappe.db.get_value("Shop Lead", {
+        "email": email,
+        "preferred_shop": shop,
+        "status": ["in", OPEN_LEAD_STATUSES]
+    })
+
+
+def get_request_idempotency_key(value=None):
+    """Idempotency key from the explicit argument or the Idempotency-Key header"""
+    if value:
+        return str(value)[:140]
+
+    request = getattr(frappe.local, "request", None)
+    header = request.headers.get("Idempotency-Key") if request else None
+    return header[:140] if header else None
+
+
+def submit_lead(shop, email, create_lead, idempotency_key=None, ip=None):
+    """
+    Run a guest application through the intake checks and create the lead.
+
+    Order matters: a retried submission with a known idempotency key gets
+    the original response without spending tokens, rate limits are applied
+    before any database work, and the duplicate check runs last.
+    create_lead is called with no arguments and returns the response dict.
+    """
+    email = (email or "").strip().lower()
+    ip = ip or getattr(frappe.local, "request_ip", None)
+    idempotency_key = get_request_idempotency_key(idempotency_key)
+    if idempotency_key:
+        # Scope keys to the applicant so one client cannot replay another's response
+        idempotency_key = f"{email}:{idempotency_key}"
+
+    if idempotency_key:
+        stored = claim_idempotency_key(idempotency_key)
+        if stored == IDEMPOTENCY_PENDING:
+            frappe.throw(_("This application is already being processed."), frappe.DuplicateEntryError)
+        if stored is not None:
+            return dict(stored, replayed=True)
+
+    try:
+        check_rate_limit(ip=ip, email=email)
+
+        if shop and find_duplicate_lead(shop, email):
+            frappe.throw(
+                _("You have already submitted an application for this shop. We will contact you soon."),
+                frappe.DuplicateEntryError
+            )
+
+        response = create_lead()
+    except Exception:
+        if idempotency_key:
+            release_idempotency_key(idempotency_key)
+        raise
+
+    if idempotency_key:
+        # Only replay responses for leads that were actually committed
+        frappe.db.after_commit.add(lambda: store_idempotent_response(idempotency_key, response))
+        frappe.db.after_rollback.add(lambda: release_idempotency_key(idempotency_key))
+
+    return response
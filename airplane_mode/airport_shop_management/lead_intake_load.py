@@ -0,0 +1,129 @@
+import time
+
+import frappe
+
+from airplane_mode.airport_shop_management.lead_intake import (
+    clear_rate_limits,
+    get_rate_limits,
+    release_idempotency_key,
+    submit_lead
+)
+
+
+LOAD_TEST_SOURCE = "Load Test"
+
+
+def run(applicants=200, ips=20, flood=100, retries=20, create_leads=False):
+    """
+    Drive the lead intake layer with synthetic guest submissions.
+
+        bench --site <site> execute airplane_mode.airport_shop_management.lead_intake_load.run
+
+    Phases:
+      sustained  distinct applicants spread over a pool of client IPs
+      flood      one client IP submitting as fast as it can
+      retries    one applicant retrying with the same idempotency key;
+                 the first is accepted, the rest are replayed
+
+    With create_leads=False the lead creation step is stubbed, so only the
+    intake overhead (token buckets, idempotency keys, indexed duplicate
+    lookup) is measured. With create_leads=True real Shop Leads are inserted
+    and deleted again at the end. Each submission commits, like a web request.
+    """
+    run_id = frappe.generate_hash(length=6)
+    shop = frappe.db.get_value("Airport Shop", {"status": "Available"}, "name")
+    touched_ips, touched_emails, keys = set(), set(), []
+
+    def submit(ip, email, idempotency_key=None):
+        touched_ips.add(ip)
+        touched_emails.add(email)
+        if idempotency_key:
+            keys.append(f"{email}:{idempotency_key}")
+
+        started = time.perf_counter()
+        try:
+            result = submit_lead(shop, email, lambda: create_lead(shop, email, create_leads), idempotency_key=idempotency_key, ip=ip)
+            outcome = "replayed" if result.get("replayed") else "accepted"
+        except frappe.TooManyRequestsError:
+            outcome = "rate_limited"
+        except frappe.DuplicateEntryError:
+            outcome = "duplicate"
+        frappe.db.commit()
+        return outcome, time.perf_counter() - started
+
+    def phase(submissions):
+        outcomes, latencies = {}, []
+        started = time.perf_counter()
+        for args in submissions:
+            outcome, latency = submit(*args)
+            outcomes[outcome] = outcomes.get(outcome, 0) + 1
+            latencies.append(latency)
+        elapsed = time.perf_counter() - started
+        return summarize(outcomes, latencies, elapsed)
+
+    try:
+        results = {
+            "rate_limits": get_rate_limits(),
+            "sustained": phase(
+                (f"198.51.100.{i % int(ips) + 1}", f"loadtest-{run_id}-{i}@example.com")
+                for i in range(int(applicants))
+            ),
+            "flood": phase(
+                ("203.0.113.7", f"loadtest-{run_id}-flood-{i}@example.com")
+                for i in range(int(flood))
+            ),
+            "retries": phase(
+                ("192.0.2.10", f"loadtest-{run_id}-retry@example.com", f"retry-{run_id}")
+                for i in range(int(retries))
+            )
+        }
+    finally:
+        for ip in touched_ips:
+            clear_rate_limits(ip=ip)
+        for email in touched_emails:
+            clear_rate_limits(email=email)
+        for key in keys:
+            release_idempotency_key(key)
+        if create_leads:
+            frappe.db.delete("Shop Lead", {"source": LOAD_TEST_SOURCE})
+            frappe.db.commit()
+
+    frappe.logger("airplane_mode.lead_intake").info(results)
+    return results
+
+
+def create_lead(shop, email, create_leads):
+    if not create_leads:
+        return {"status": "success", "lead_id": None}
+
+    lead = frappe.get_doc({
+        "doctype": "Shop Lead",
+        "preferred_shop": shop,
+        "lead_name": "Load Test",
+        "email": email,
+        "status": "Open",
+        "source": LOAD_TEST_SOURCE
+    })
+    # Synthetic leads must not trigger intake emails
+    lead.flags.skip_lead_intake = True
+    lead.insert(ignore_permissions=True)
+    return {"status": "success", "lead_id": lead.name}
+
+
+def summarize(outcomes, latencies, elapsed):
+    latencies = sorted(latencies)
+    total = len(latencies)
+
+    def percentile(p):
+        return round(latencies[min(int(total * p), total - 1)] * 1000, 3) if total else 0
+
+    return {
+        "submissions": total,
+        "outcomes": outcomes,
+        "elapsed_s": round(elapsed, 3),
+        "submissions_per_s": round(total / elapsed, 1) if elapsed else 0,
+        "accepted_per_s": round(outcomes.get("accepted", 0) / elapsed, 1) if elapsed else 0,
+        "p50_ms": percentile(0.50),
+        "p95_ms": percentile(0.95),
+        "max_ms": percentile(1.0)
+    }
@@ -1,22 +1,63 @@
+import json
+
 import frappe
 from frappe import _
-from frappe.utils import nowdate
+from frappe.utils import flt, nowdate
+
+
+LEAD_SHOP_FIELDS = ["name", "shop_name", "airport_name", "area", "rent_per_month"]
+
 
 def send_lead_notifications(doc, method):
-    """Send notifications when a new lead is created"""
-    
-    send_admin_notification(doc)
-    send_lead_confirmation(doc)
+    """
+    Queue the lead intake job once the new lead is committed.
+    The form submission itself never waits on mail or notification writes.
+    """
+    if doc.flags.skip_lead_intake:
+        return
+
+    frappe.enqueue(
+        "airplane_mode.airport_shop_management.lead_notifications.process_lead_intake",
+        queue="short",
+        job_id=f"lead_intake::{doc.name}",
+        deduplicate=True,
+        enqueue_after_commit=True,
+        lead_name=doc.name
+    )
+
+def process_lead_intake(lead_name):
+    """Load the lead and its shop once, then send the admin and lead emails through the mail queue"""
+    lead = frappe.get_doc("Shop Lead", lead_name)
+    shop = get_lead_shop(lead)
 
-def send_admin_notification(lead):
+    contact_email = frappe.db.get_single_value("System Settings", "auto_email_id") or "admin@airport.com"
+    company_name = frappe.db.get_single_value("Global Defaults", "default_company") or "Airport Management"
+
+    send_admin_notification(lead, shop, contact_email)
+    send_lead_confirmation(lead, shop, contact_email, company_name)
+
+def get_lead_shop(lead):
+    """Shop the lead applied for, with the fields the intake emails need"""
+    shop_name = lead.get("preferred_shop") or lead.get("shop")
+    shop = None
+    if shop_name:
+        shop = frappe.db.get_value("Airport Shop", shop_name, LEAD_SHOP_FIELDS, as_dict=True)
+
+    if not shop:
+        # Applications for "any shop" only carry a preferred shop type
+        shop = frappe._dict({
+            "name": shop_name,
+            "shop_name": lead.get("preferred_shop_type") or _("Airport Shop"),
+            "airport_name": None,
+            "area": None,
+            "rent_per_month": None
+        })
+
+    return shop
+
+def send_admin_notification(lead, shop, admin_emails):
     """Send notification to admin about new lead"""
     try:
-        shop = frappe.get_doc("Airport Shop", lead.shop)
-        
-        admin_emails = frappe.db.get_single_value("System Settings", "auto_email_id")
-        if not admin_emails:
-            admin_emails = "admin@airport.com"
-        
         frappe.sendmail(
             recipients=[admin_emails],
             subject=f"New Shop Lead: {shop.shop_name}",
@@ -29,23 +70,23 @@ def send_admin_notification(lead):
                 <div style="background-color: #f8f9fa; padding: 20px; border-radius: 5px; margin: 20px 0;">
                     <h3 style="color: #2980b9; margin-top: 0;">Shop Details</h3>
                     <p><strong>Shop Name:</strong> {shop.shop_name}</p>
-                    <p><strong>Shop ID:</strong> {lead.shop}</p>
-                    <p><strong>Location:</strong> {shop.location}</p>
-                    <p><strong>Area:</strong> {shop.area_sqft} sq ft</p>
-                    <p><strong>Monthly Rent:</strong> ₹{shop.total_monthly_rent:,.2f}</p>
+                    <p><strong>Shop ID:</strong> {shop.name or '-'}</p>
+                    <p><strong>Location:</strong> {shop.airport_name or '-'}</p>
+                    <p><strong>Area:</strong> {flt(shop.area)} sq ft</p>
+                    <p><strong>Monthly Rent:</strong> ₹{flt(shop.rent_per_month):,.2f}</p>
                 </div>
                 
                 <div style="background-color: #e8f5e8; padding: 20px; border-radius: 5px; margin: 20px 0;">
                     <h3 style="color: #27ae60; margin-top: 0;">Lead Information</h3>
                     <p><strong>Name:</strong> {lead.lead_name}</p>
                     <p><strong>Email:</strong> {lead.email}</p>
-                    <p><strong>Phone:</strong> {lead.phone}</p>
-                    <p><strong>Business Type:</strong> {lead.business_type}</p>
-                    <p><strong>Date:</strong> {lead.lead_date}</p>
-                    <p><strong>Source:</strong> {lead.source or 'Direct'}</p>
+                    <p><strong>Phone:</strong> {lead.get('phone') or '-'}</p>
+                    <p><strong>Business Type:</strong> {lead.get('business_type') or '-'}</p>
+                    <p><strong>Date:</strong> {lead.get('lead_date') or nowdate()}</p>
+                    <p><strong>Source:</strong> {lead.get('source') or 'Direct'}</p>
                 </div>
                 
-                {f'<div style="background-color: #fff3cd; padding: 15px; border-radius: 5px; margin: 20px 0;"><h4 style="color: #856404; margin-top: 0;">Message from Lead:</h4><p style="font-style: italic;">{lead.message}</p></div>' if lead.message else ''}
+                {f'<div style="background-color: #fff3cd; padding: 15px; border-radius: 5px; margin: 20px 0;"><h4 style="color: #856404; margin-top: 0;">Message from Lead:</h4><p style="font-style: italic;">{lead.get("notes")}</p></div>' if lead.get("notes") else ''}
                 
                 <div style="text-align: center; margin: 30px 0;">
                     <a href="{frappe.utils.get_url()}/app/shop-lead/{lead.name}" 
@@ -56,7 +97,7 @@ def send_admin_notification(lead):
                 </div>
             </div>
             """,
-            delayed=False
+            delayed=True
         )
         
         # Also create a notification in the system
@@ -72,14 +113,9 @@ def send_admin_notification(lead):
     except Exception as e:
         frappe.log_error(f"Failed to send admin notification for lead {lead.name}: {str(e)}")
 
-def send_lead_confirmation(lead):
+def send_lead_confirmation(lead, shop, contact_email, company_name):
     """Send confirmation email to the lead"""
     try:
-        shop = frappe.get_doc("Airport Shop", lead.shop)
-        
-        company_name = frappe.db.get_single_value("Global Defaults", "default_company") or "Airport Management"
-        contact_email = frappe.db.get_single_value("System Settings", "auto_email_id") or "admin@airport.com"
-        
         frappe.sendmail(
             recipients=[lead.email],
             subject=f"Thank you for your interest in {shop.shop_name}",
@@ -112,15 +148,15 @@ def send_lead_confirmation(lead):
                             </tr>
                             <tr>
                                 <td style="padding: 8px 0; color: #7f8c8d;">Location:</td>
-                                <td style="padding: 8px 0; color: #2c3e50;">{shop.location}</td>
+                                <td style="padding: 8px 0; color: #2c3e50;">{shop.airport_name or '-'}</td>
                             </tr>
                             <tr>
                                 <td style="padding: 8px 0; color: #7f8c8d;">Area:</td>
-                                <td style="padding: 8px 0; color: #2c3e50;">{shop.area_sqft} sq ft</td>
+                                <td style="padding: 8px 0; color: #2c3e50;">{flt(shop.area)} sq ft</td>
                             </tr>
                             <tr>
                                 <td style="padding: 8px 0; color: #7f8c8d;">Monthly Rent:</td>
-                                <td style="padding: 8px 0; color: #27ae60; font-weight: bold; font-size: 18px;">₹{shop.total_monthly_rent:,.2f}</td>
+                                <td style="padding: 8px 0; color: #27ae60; font-weight: bold; font-size: 18px;">₹{flt(shop.rent_per_month):,.2f}</td>
                             </tr>
                         </table>
                     </div>
@@ -155,7 +191,7 @@ def send_lead_confirmation(lead):
                 </div>
             </div>
             """,
-            delayed=False
+            delayed=True
         )
         
     except Exception as e:
@@ -2,6 +2,7 @@ import frappe
 from frappe import _
 from frappe.utils import nowdate, add_months, getdate, today, cint
 import json
+from airplane_mode.job_telemetry import record_progress
 
 def process_monthly_invoices():
     """Process monthly rent invoices for all active contracts"""
@@ -30,6 +31,7 @@ def process_monthly_invoices():
     
     # Log summary
     frappe.logger().info(f"Monthly invoice processing completed. Processed: {processed_count}, Failed: {failed_count}")
+    record_progress(rows=processed_count, failures=failed_count)
     
     return {
         "processed": processed_count,
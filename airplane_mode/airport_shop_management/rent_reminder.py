@@ -1,8 +1,11 @@
 import frappe
-from frappe.utils import today
+from frappe.utils import cint, today
+
+from airplane_mode.job_telemetry import record_progress
+from airplane_mode.reference_cache import get_settings
 
 def send_rent_reminders():
-    reminders_enabled = frappe.get_single("Airport Shop Settings").enable_rent_reminders
+    reminders_enabled = cint(get_settings("Airport Shop Settings").enable_rent_reminders)
     if not reminders_enabled:
         return
 
@@ -12,6 +15,7 @@ def send_rent_reminders():
         fields=["name", "tenant", "amount"]
     )
 
+    sent = 0
     for row in due:
         tenant_doc = frappe.get_doc("Tenant", row.tenant)
         if tenant_doc.email:
@@ -20,3 +24,6 @@ def send_rent_reminders():
                 subject="Airport Shop Rent Due Today",
                 message=f"Dear {tenant_doc.tenant_name}, your rent ({row.amount}) is due today."
             )
+            sent += 1
+
+    record_progress(rows=sent)
@@ -0,0 +1,506 @@
+import json
+import math
+import os
+import re
+from bisect import bisect_left
+
+import frappe
+from frappe.utils import cint, flt, strip_html
+from frappe.utils.synchronization import filelock
+
+from airplane_mode.job_telemetry import record_progress
+
+
+# Text fields that feed the inverted index, with their ranking weight
+SEARCH_FIELDS = {
+    "shop_name": 3.0,
+    "shop_type": 2.0,
+    "shop_type_name": 2.0,
+    "terminal": 1.5,
+    "location": 1.5,
+    "airport_name": 1.0,
+    "description": 1.0
+}
+
+# Fields kept on each indexed record for display and faceting
+STORED_FIELDS = [
+    "name", "shop_name", "shop_number", "shop_type", "shop_type_name", "airport",
+    "airport_name", "terminal", "location", "area", "rent_per_month", "description",
+    "image", "status"
+]
+
+FACET_FIELDS = ["airport", "terminal", "shop_type", "rent_band"]
+SORT_FIELDS = ["rent_per_month", "area", "shop_name"]
+NUMERIC_SORT_FIELDS = ["rent_per_month", "area"]
+
+# (label, lower bound inclusive, upper bound exclusive)
+RENT_BANDS = [
+    ("Under 50K", 0, 50000),
+    ("50K - 1L", 50000, 100000),
+    ("1L - 2.5L", 100000, 250000),
+    ("2.5L+", 250000, None)
+]
+
+MAX_PAGE_SIZE = 200
+INDEX_FORMAT = 1
+VERSION_CACHE_KEY = "airport_shop_search_index_version"
+# Incremental changes since the index file was written, oldest first. The
+# file is rewritten by the daily rebuild, or once the journal reaches
+# JOURNAL_LIMIT entries, instead of on every shop save.
+JOURNAL_CACHE_KEY = "airport_shop_search_index_journal"
+JOURNAL_LIMIT = 200
+TOKEN_PATTERN = re.compile(r"\w+")
+
+_index = None
+
+
+def tokenize(text):
+    """Split text into lower-cased alphanumeric tokens"""
+    if not text:
+        return []
+    return TOKEN_PATTERN.findall(strip_html(str(text)).lower())
+
+
+def get_rent_band(rent):
+    """Return the rent band label for a monthly rent amount"""
+    rent = flt(rent)
+    for label, lower, upper in RENT_BANDS:
+        if rent >= lower and (upper is None or rent < upper):
+            return label
+    return RENT_BANDS[0][0]
+
+
+class ShopSearchIndex:
+    """
+    In-memory inverted index over Airport Shop records.
+    Postings map each term to {shop name: weighted term frequency}.
+    """
+
+    def __init__(self, version=None):
+        self.version = version
+        self.records = {}
+        self.postings = {}
+        self.doc_terms = {}
+        self._sorted_terms = None
+
+    def upsert(self, record):
+        """Add or replace a shop record"""
+        name = record["name"]
+        self.remove(name)
+
+        weights = {}
+        for field, weight in SEARCH_FIELDS.items():
+            for term in tokenize(record.get(field)):
+                weights[term] = weights.get(term, 0) + weight
+
+        for term, weight in weights.items():
+            if term not in self.postings:
+                self.postings[term] = {}
+                self._sorted_terms = None
+            self.postings[term][name] = weight
+
+        record["rent_band"] = get_rent_band(record.get("rent_per_month"))
+        self.records[name] = record
+        self.doc_terms[name] = list(weights)
+
+    def remove(self, name):
+        """Drop a shop record and its postings"""
+        if name not in self.records:
+            return
+
+        for term in self.doc_terms.pop(name, []):
+            postings = self.postings.get(term)
+            if postings is None:
+                continue
+            postings.pop(name, None)
+            if not postings:
+                del self.postings[term]
+                self._sorted_terms = None
+
+        del self.records[name]
+
+    def expand_prefix(self, prefix):
+        """Return all indexed terms starting with prefix"""
+        if self._sorted_terms is None:
+            self._sorted_terms = sorted(self.postings)
+
+        terms = []
+        position = bisect_left(self._sorted_terms, prefix)
+        while position < len(self._sorted_terms) and self._sorted_terms[position].startswith(prefix):
+            terms.append(self._sorted_terms[position])
+            position += 1
+        return terms
+
+    def score(self, query):
+        """
+        Score records against a free-text query.
+        Every query term must match; the last term also matches as a prefix
+        so partially typed words still return results.
+        """
+        terms = tokenize(query)
+        if not terms:
+            return None
+
+        total = len(self.records) or 1
+        scores = None
+
+        for position, term in enumerate(terms):
+            candidates = [term]
+            if position == len(terms) - 1:
+                candidates = self.expand_prefix(term) or candidates
+
+            term_scores = {}
+            for candidate in candidates:
+                postings = self.postings.get(candidate)
+                if not postings:
+                    continue
+                idf = math.log(1 + total / len(postings))
+                for name, weight in postings.items():
+                    term_scores[name] = term_scores.get(name, 0) + weight * idf
+
+            if scores is None:
+                scores = term_scores
+            else:
+                scores = {name: score + term_scores[name] for name, score in scores.items() if name in term_scores}
+
+            if not scores:
+                return {}
+
+        return scores
+
+    def search(self, query=None, filters=None, ranges=None, status="Available", limit=20, start=0,
+               order_by=None):
+        """
+        Run a ranked search with facet filters and numeric (low, high) ranges.
+        Returns the requested page of records, the total match count and facet counts.
+        """
+        filters = {key: value for key, value in (filters or {}).items() if value}
+        scores = self.score(query)
+
+        matched = []
+        for name, record in self.records.items():
+            if scores is not None and name not in scores:
+                continue
+            if status and record.get("status") != status:
+                continue
+            if ranges and not in_ranges(record, ranges):
+                continue
+            matched.append(record)
+
+        facets = self.get_facets(matched, filters)
+        results = [record for record in matched if matches_filters(record, filters)]
+
+        if scores is not None and not order_by:
+            results.sort(key=lambda record: (-scores[record["name"]], record["name"]))
+        else:
+            results.sort(key=lambda record: (get_sort_value(record, order_by or "rent_per_month"), record["name"]))
+
+        page = []
+        for record in results[start:start + limit]:
+            row = frappe._dict(record)
+            row.score = round(scores[record["name"]], 4) if scores is not None else None
+            page.append(row)
+
+        return {
+            "results": page,
+            "total": len(results),
+            "facets": facets
+        }
+
+    def apply(self, upserts=None, removals=None):
+        for name in removals or []:
+            self.remove(name)
+        for record in upserts or []:
+            self.upsert(record)
+
+    def get_facets(self, records, filters):
+        """
+        Count facet values. Each facet applies every active filter except
+        its own, so users can see what switching a value would return.
+        """
+        facets = {}
+        for facet in FACET_FIELDS:
+            other_filters = {key: value for key, value in filters.items() if key != facet}
+            counts = {}
+            for record in records:
+                if not matches_filters(record, other_filters):
+                    continue
+                value = record.get(facet)
+                if value:
+                    counts[value] = counts.get(value, 0) + 1
+            facets[facet] = sorted(counts.items(), key=lambda item: (-item[1], item[0]))
+        return facets
+
+    def as_dict(self):
+        return {
+            "format": INDEX_FORMAT,
+            "version": self.version,
+            "records": list(self.records.values())
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        index = cls(version=data.get("version"))
+        for record in data.get("records", []):
+            index.upsert(record)
+        return index
+
+
+def matches_filters(record, filters):
+    for key, value in filters.items():
+        if isinstance(value, (list, tuple, set)):
+            if record.get(key) not in value:
+                return False
+        elif record.get(key) != value:
+            return False
+    return True
+
+
+def get_sort_value(record, field):
+    if field in NUMERIC_SORT_FIELDS:
+        return flt(record.get(field))
+    return str(record.get(field) or "").lower()
+
+
+def in_ranges(record, ranges):
+    for field, (low, high) in ranges.items():
+        value = flt(record.get(field))
+        if low is not None and value < flt(low):
+            return False
+        if high is not None and value > flt(high):
+            return False
+    return True
+
+
+def get_index_path():
+    return frappe.get_site_path("private", "shop_search", "airport_shop_index.json")
+
+
+def get_shared_version():
+    return frappe.cache().get_value(VERSION_CACHE_KEY)
+
+
+def load_index_from_disk():
+    """Load the persisted index, or return None if missing or unreadable"""
+    path = get_index_path()
+    if not os.path.exists(path):
+        return None
+
+    try:
+        with open(path) as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        frappe.logger().warning(f"[ShopSearch] Could not read index file {path}, rebuilding")
+        return None
+
+    if data.get("format") != INDEX_FORMAT:
+        return None
+
+    return ShopSearchIndex.from_dict(data)
+
+
+def save_index(index):
+    """Persist the index atomically so readers never see a partial file"""
+    path = get_index_path()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(index.as_dict(), f, default=str, separators=(",", ":"))
+    os.replace(tmp_path, path)
+
+
+def get_shop_fields():
+    """Stored fields that actually exist on this site's Airport Shop"""
+    meta = frappe.get_meta("Airport Shop")
+    return [field for field in STORED_FIELDS if field == "name" or meta.has_field(field)]
+
+
+def get_shop_record(doc):
+    """Build an index record from an Airport Shop document or dict"""
+    record = {field: doc.get(field) for field in STORED_FIELDS}
+    record["name"] = doc.get("name")
+    return record
+
+
+def build_index():
+    """Rebuild the whole index from the database"""
+    index = ShopSearchIndex()
+    for shop in frappe.get_all("Airport Shop", fields=get_shop_fields()):
+        index.upsert(get_shop_record(shop))
+    return index
+
+
+def get_index():
+    """
+    Return this worker's index, catching up when another worker has
+    published a newer version. Cold workers warm-start from disk.
+    """
+    global _index
+
+    if is_current(_index, get_shared_version()):
+        return _index
+
+    with filelock("airport_shop_search_index"):
+        _index = load_current_index(_index)
+
+    return _index
+
+
+def is_current(index, shared_version):
+    return index is not None and (shared_version is None or index.version == shared_version)
+
+
+def read_journal():
+    return [json.loads(frappe.safe_decode(entry)) for entry in frappe.cache().lrange(JOURNAL_CACHE_KEY, 0, -1) or []]
+
+
+def catch_up(index, shared_version):
+    """Replay the journal entries the index is missing. Returns whether it is now current."""
+    if index.version == shared_version:
+        return True
+
+    entries = read_journal()
+    previous = [entry["previous"] for entry in entries]
+    if index.version not in previous:
+        return False
+
+    for entry in entries[previous.index(index.version):]:
+        index.apply(upserts=entry["upserts"], removals=entry["removals"])
+        index.version = entry["version"]
+    return index.version == shared_version
+
+
+def load_current_index(index=None):
+    """
+    Bring the given index, else the file on disk, up to the published
+    version, rebuilding from the database when neither can catch up.
+    Caller holds the lock.
+    """
+    shared_version = get_shared_version()
+    if shared_version:
+        if index is not None and catch_up(index, shared_version):
+            return index
+        index = load_index_from_disk()
+        if index is not None and catch_up(index, shared_version):
+            return index
+
+    index = build_index()
+    publish_snapshot(index)
+    return index
+
+
+def publish_snapshot(index):
+    """Write the whole index to disk as a new version and start an empty journal"""
+    index.version = frappe.generate_hash(length=12)
+    save_index(index)
+    frappe.cache().delete_value(JOURNAL_CACHE_KEY)
+    frappe.cache().set_value(VERSION_CACHE_KEY, index.version)
+
+
+def apply_changes(upserts=None, removals=None):
+    """Apply incremental changes, journal them and publish the new version"""
+    global _index
+
+    with filelock("airport_shop_search_index"):
+        index = load_current_index(_index)
+        index.apply(upserts=upserts, removals=removals)
+
+        cache = frappe.cache()
+        if (cache.llen(JOURNAL_CACHE_KEY) or 0) >= JOURNAL_LIMIT:
+            publish_snapshot(index)
+        else:
+            entry = {
+                "previous": index.version,
+                "version": frappe.generate_hash(length=12),
+                "upserts": upserts or [],
+                "removals": removals or []
+            }
+            cache.rpush(JOURNAL_CACHE_KEY, json.dumps(entry, default=str, separators=(",", ":")))
+            index.version = entry["version"]
+            cache.set_value(VERSION_CACHE_KEY, index.version)
+        _index = index
+
+
+def refresh_shops(shop_names):
+    """Re-read the given shops from the database into the index"""
+    if not shop_names:
+        return
+
+    shops = frappe.get_all(
+        "Airport Shop",
+        filters={"name": ["in", list(shop_names)]},
+        fields=get_shop_fields()
+    )
+    found = {shop.name for shop in shops}
+    apply_changes(
+        upserts=[get_shop_record(shop) for shop in shops],
+        removals=[name for name in shop_names if name not in found]
+    )
+
+
+# Doc event handlers. Index changes are applied after commit so a rolled
+# back save never leaks into search results.
+
+def on_shop_update(doc, method=None):
+    """Keep the index current when an Airport Shop is saved"""
+    record = get_shop_record(doc)
+    frappe.db.after_commit.add(lambda: safe_apply_changes(doc.name, upserts=[record]))
+
+
+def on_shop_trash(doc, method=None):
+    name = doc.name
+    frappe.db.after_commit.add(lambda: safe_apply_changes(name, removals=[name]))
+
+
+def on_shop_rename(doc, method=None, old=None, new=None, merge=False):
+    record = get_shop_record(doc)
+    record["name"] = new
+    frappe.db.after_commit.add(lambda: safe_apply_changes(old, upserts=[record], removals=[old]))
+
+
+def safe_apply_changes(shop_name, upserts=None, removals=None):
+    try:
+        apply_changes(upserts=upserts, removals=removals)
+    except Exception as e:
+        frappe.log_error(f"Shop search index update failed for {shop_name}: {str(e)}", "Shop Search")
+
+
+def rebuild_search_index():
+    """Full rebuild, scheduled daily to heal any missed incremental update"""
+    global _index
+
+    with filelock("airport_shop_search_index"):
+        index = build_index()
+        publish_snapshot(index)
+        _index = index
+
+    record_progress(rows=len(index.records))
+    return len(index.records)
+
+
+def search(query=None, airport=None, terminal=None, shop_type=None, rent_band=None, min_area=None,
+           max_rent=None, status="Available", limit=20, start=0, order_by=None):
+    """Search the shop inventory; see ShopSearchIndex.search"""
+    filters = {
+        "airport": airport,
+        "terminal": terminal,
+        "shop_type": shop_type,
+        "rent_band": rent_band
+    }
+    ranges = {}
+    if min_area:
+        ranges["area"] = (min_area, None)
+    if max_rent:
+        ranges["rent_per_month"] = (None, max_rent)
+
+    return get_index().search(
+        query=query,
+        filters=filters,
+        ranges=ranges,
+        status=status,
+        limit=min(cint(limit) or 20, MAX_PAGE_SIZE),
+        start=max(cint(start), 0),
+        order_by=order_by if order_by in SORT_FIELDS else None
+    )
+
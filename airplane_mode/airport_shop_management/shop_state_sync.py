@@ -0,0 +1,181 @@
+from contextlib import contextmanager
+
+import frappe
+from frappe.utils import flt, now_datetime
+
+from airplane_mode.airport_stats import bump_stats_version
+
+
+ACTIVE_SYNCS_FLAG = "airplane_mode_shop_state_syncs"
+PENDING_SHOPS_FLAG = "airplane_mode_shop_state_pending"
+
+
+@contextmanager
+def sync_scope(key):
+    """
+    Mark a sync as running for the rest of the block. Yields False when the
+    same sync is already running further up the stack, i.e. a hook fired by
+    the sync is trying to start it again; the caller should then do nothing.
+    """
+    active = frappe.flags.get(ACTIVE_SYNCS_FLAG)
+    if active is None:
+        active = frappe.flags[ACTIVE_SYNCS_FLAG] = set()
+
+    if key in active:
+        frappe.logger("airplane_mode.shop_state_sync").warning({"event": "loop_detected", "sync": key})
+        yield False
+        return
+
+    active.add(key)
+    try:
+        yield True
+    finally:
+        active.discard(key)
+
+
+def is_syncing(key):
+    return key in (frappe.flags.get(ACTIVE_SYNCS_FLAG) or ())
+
+
+def get_tenant_labels(tenants):
+    """
+    The value written to Airport Shop.tenant for each Tenant: its customer,
+    else its full name, else the Tenant name itself.
+    """
+    tenants = {tenant for tenant in tenants if tenant}
+    if not tenants:
+        return {}
+    labels = {tenant: tenant for tenant in tenants}
+    for name, customer, full_name in frappe.get_all(
+        "Tenant",
+        filters={"name": ["in", list(tenants)]},
+        fields=["name", "customer", "full_name"],
+        as_list=True
+    ):
+        labels[name] = customer or full_name or name
+    return labels
+
+
+def occupy_shops(assignments):
+    """
+    Mark shops Occupied by their lease tenants with one UPDATE in the
+    caller's transaction. assignments maps shop -> Tenant; a shop without a
+    tenant is left as it is, since Occupied requires one.
+    """
+    skipped = [shop for shop, tenant in assignments.items() if shop and not tenant]
+    if skipped:
+        frappe.logger("airplane_mode.shop_state_sync").warning({"event": "occupy_without_tenant", "shops": skipped})
+
+    assignments = {shop: tenant for shop, tenant in assignments.items() if shop and tenant}
+    if not assignments:
+        return 0
+
+    with sync_scope(("occupy", tuple(sorted(assignments)))) as entered:
+        if not entered:
+            return 0
+
+        labels = get_tenant_labels(assignments.values())
+        tenant_case = f"CASE name {' '.join(['WHEN %s THEN %s'] * len(assignments))} END"
+        params = [value for shop, tenant in assignments.items() for value in (shop, labels[tenant])]
+
+        frappe.db.sql(f"""
+            UPDATE `tabAirport Shop`
+            SET status = 'Occupied', tenant = {tenant_case}, modified = %s, modified_by = %s
+            WHERE name IN %s
+        """, (*params, now_datetime(), frappe.session.user, tuple(assignments)))
+
+        notify_shops(assignments)
+        return len(assignments)
+
+
+def release_shops(shops):
+    """Mark shops Available and clear their tenant, in the caller's transaction"""
+    shops = [shop for shop in shops if shop]
+    if not shops:
+        return 0
+
+    with sync_scope(("release", tuple(sorted(shops)))) as entered:
+        if not entered:
+            return 0
+
+        frappe.db.sql("""
+            UPDATE `tabAirport Shop`
+            SET status = 'Available', tenant = '', contact_number = '', modified = %s, modified_by = %s
+            WHERE name IN %s
+        """, (now_datetime(), frappe.session.user, tuple(shops)))
+
+        notify_shops(shops)
+        return len(shops)
+
+
+def sync_contract_rent(shop, rent):
+    """Copy a shop's rent onto its active lease contracts with one UPDATE"""
+    if not shop or not rent:
+        return
+
+    with sync_scope(("rent", shop)) as entered:
+        if not entered:
+            return
+
+        frappe.db.set_value(
+            "Shop Lease Contract",
+            {"contract_shop": shop, "status": "Active", "docstatus": ["<", 2]},
+            "rent_amount",
+            flt(rent)
+        )
+
+
+def activate_contracts(contract_names):
+    """
+    Activate many submitted lease contracts at once: one UPDATE for the
+    contracts and one for their shops, then a single index refresh and
+    stats bump after commit.
+    """
+    contracts = frappe.get_all(
+        "Shop Lease Contract",
+        filters={"name": ["in", list(contract_names)], "docstatus": 1},
+        fields=["name", "contract_shop", "tenant"]
+    )
+    if not contracts:
+        return 0
+
+    frappe.db.sql("""
+        UPDATE `tabShop Lease Contract`
+        SET status = 'Active', modified = %s, modified_by = %s
+        WHERE name IN %s
+    """, (now_datetime(), frappe.session.user, tuple(contract.name for contract in contracts)))
+
+    occupy_shops({contract.contract_shop: contract.tenant for contract in contracts})
+    return len(contracts)
+
+
+def notify_shops(shops):
+    """
+    The column writes above skip Airport Shop doc events, so refresh the
+    shop search index and the cached stats here, once per transaction.
+    """
+    pending = frappe.flags.get(PENDING_SHOPS_FLAG)
+    if pending is None:
+        pending = frappe.flags[PENDING_SHOPS_FLAG] = set()
+        frappe.db.after_commit.add(flush_pending_shops)
+        frappe.db.after_rollback.add(discard_pending_shops)
+
+    pending.update(shops)
+
+
+def flush_pending_shops():
+    from airplane_mode.airport_shop_management.shop_search import refresh_shops
+
+    shops = frappe.flags.pop(PENDING_SHOPS_FLAG, None)
+    if not shops:
+        return
+
+    bump_stats_version()
+    try:
+        refresh_shops(list(shops))
+    except Exception as e:
+        frappe.log_error(f"Shop search refresh failed for {len(shops)} shops: {str(e)}", "Shop State Sync")
+
+
+def discard_pending_shops():
+    frappe.flags.pop(PENDING_SHOPS_FLAG, None)
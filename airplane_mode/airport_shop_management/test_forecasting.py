@@ -0,0 +1,63 @@
+# Copyright (c) 2026, nandhakishore and Contributors
+# See license.txt
+
+import numpy as np
+from frappe.tests.utils import FrappeTestCase
+
+from airplane_mode.airport_shop_management.forecasting import ContractArrays, month_index, project
+
+
+class TestProject(FrappeTestCase):
+	"""Test cases for the occupancy and revenue-at-risk projection"""
+	
+	def setUp(self):
+		"""One three-month lease of 1000 a month at airport A, which has two shops"""
+		self.first_month = month_index("2030-01-15")
+		self.arrays = ContractArrays(
+			start=[self.first_month],
+			end=[self.first_month + 2],
+			rent=[1000.0],
+			contract_groups={"airport": ["A"]},
+			shop_groups={"airport": ["A", "B"]}
+		)
+	
+	def get_projection(self, probability=0.5, horizon=9):
+		results = project(self.arrays, self.first_month, horizon=horizon, scenarios={"test": probability})
+		return {measure: values[0] for measure, values in results["airport"]["test"].items()}
+	
+	def test_renewal_decay(self):
+		"""Test that occupancy falls by p for every renewal needed"""
+		projection = self.get_projection(probability=0.5)
+		
+		np.testing.assert_allclose(projection["occupied"], [1, 1, 1, 0.5, 0.5, 0.5, 0.25, 0.25, 0.25])
+		np.testing.assert_allclose(projection["rent_roll"], 1000 * projection["occupied"])
+	
+	def test_expiry_month(self):
+		"""Test that revenue is at risk in the month each term ends"""
+		projection = self.get_projection(probability=0.5)
+		
+		np.testing.assert_allclose(projection["expiring_contracts"], [0, 0, 1, 0, 0, 0, 0, 0, 0])
+		np.testing.assert_allclose(projection["expiring_rent"], [0, 0, 1000, 0, 0, 0, 0, 0, 0])
+		np.testing.assert_allclose(projection["revenue_at_risk"], [0, 0, 1000, 0, 0, 500, 0, 0, 250])
+		np.testing.assert_allclose(projection["expected_loss"], 0.5 * projection["revenue_at_risk"])
+	
+	def test_groups_without_contracts(self):
+		"""Test that shops without a lease still get a group and shop total"""
+		results = project(self.arrays, self.first_month, horizon=3, scenarios={"test": 0.5})
+		
+		self.assertEqual(self.arrays.labels["airport"], ["A", "B"])
+		self.assertEqual(self.arrays.shop_totals["airport"].tolist(), [1, 1])
+		np.testing.assert_allclose(results["airport"]["test"]["occupied"][1], [0, 0, 0])
+	
+	def test_contract_starting_later(self):
+		"""Test that a lease is not counted before its start month"""
+		self.arrays = ContractArrays(
+			start=[self.first_month + 2],
+			end=[self.first_month + 3],
+			rent=[1000.0],
+			contract_groups={"airport": ["A"]},
+			shop_groups={"airport": ["A"]}
+		)
+		projection = self.get_projection(probability=1.0, horizon=5)
+		
+		np.testing.assert_allclose(projection["occupied"], [0, 0, 1, 1, 1])
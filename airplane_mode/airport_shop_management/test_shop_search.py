@@ -0,0 +1,80 @@
+# Copyright (c) 2026, nandhakishore and Contributors
+# See license.txt
+
+from frappe.tests.utils import FrappeTestCase
+
+from airplane_mode.airport_shop_management.shop_search import ShopSearchIndex
+
+
+SHOPS = [
+	{"name": "SHOP-1", "shop_name": "Cafe Nero", "shop_type": "Food", "airport": "BLR", "terminal": "T1",
+		"rent_per_month": 120000, "area": 40, "status": "Available"},
+	{"name": "SHOP-2", "shop_name": "book nook", "shop_type": "Retail", "airport": "BLR", "terminal": "T2",
+		"rent_per_month": 45000, "area": 25, "status": "Available"},
+	{"name": "SHOP-3", "shop_name": "Cafe Coffee Day", "shop_type": "Food", "airport": "DEL", "terminal": "T1",
+		"rent_per_month": 80000, "area": 30, "status": "Available"},
+	{"name": "SHOP-4", "shop_name": "Duty Free", "shop_type": "Retail", "airport": "DEL", "terminal": "T3",
+		"rent_per_month": 300000, "area": 200, "status": "Occupied"}
+]
+
+
+class TestShopSearchIndex(FrappeTestCase):
+	"""Test cases for the in-memory shop search index"""
+	
+	def setUp(self):
+		"""Index the test shops"""
+		self.index = ShopSearchIndex()
+		for shop in SHOPS:
+			self.index.upsert(dict(shop))
+	
+	def get_names(self, **kwargs):
+		return [row.name for row in self.index.search(**kwargs)["results"]]
+	
+	def test_prefix_match(self):
+		"""Test that the last query term also matches as a prefix"""
+		self.assertEqual(sorted(self.get_names(query="caf")), ["SHOP-1", "SHOP-3"])
+		self.assertEqual(self.get_names(query="cafe ner"), ["SHOP-1"])
+		self.assertEqual(self.get_names(query="nero cafe"), ["SHOP-1"])
+		self.assertEqual(self.get_names(query="caf nero"), [])
+	
+	def test_status_filter(self):
+		"""Test that only available shops are returned by default"""
+		self.assertEqual(self.get_names(query="duty"), [])
+		self.assertEqual(self.get_names(query="duty", status="Occupied"), ["SHOP-4"])
+	
+	def test_facets(self):
+		"""Test that each facet ignores its own filter but applies the others"""
+		result = self.index.search(filters={"airport": "BLR", "shop_type": "Food"})
+		
+		self.assertEqual([row.name for row in result["results"]], ["SHOP-1"])
+		self.assertEqual(result["total"], 1)
+		self.assertEqual(result["facets"]["airport"], [("BLR", 1), ("DEL", 1)])
+		self.assertEqual(result["facets"]["shop_type"], [("Food", 1), ("Retail", 1)])
+		self.assertEqual(result["facets"]["rent_band"], [("1L - 2.5L", 1)])
+	
+	def test_sort_order(self):
+		"""Test sorting text fields as text and rent and area as numbers"""
+		self.assertEqual(self.get_names(order_by="shop_name"), ["SHOP-2", "SHOP-3", "SHOP-1"])
+		self.assertEqual(self.get_names(order_by="rent_per_month"), ["SHOP-2", "SHOP-3", "SHOP-1"])
+		self.assertEqual(self.get_names(order_by="area"), ["SHOP-2", "SHOP-3", "SHOP-1"])
+		self.assertEqual(self.get_names(), ["SHOP-2", "SHOP-3", "SHOP-1"])
+	
+	def test_ranges(self):
+		"""Test numeric range filters"""
+		self.assertEqual(self.get_names(ranges={"area": (30, None)}, order_by="area"), ["SHOP-3", "SHOP-1"])
+		self.assertEqual(self.get_names(ranges={"rent_per_month": (None, 50000)}), ["SHOP-2"])
+	
+	def test_remove_and_replace(self):
+		"""Test that removed and renamed shops drop their old terms"""
+		self.index.apply(upserts=[dict(SHOPS[0], shop_name="Tea Point")], removals=["SHOP-3"])
+		
+		self.assertEqual(self.get_names(query="cafe"), [])
+		self.assertEqual(self.get_names(query="tea"), ["SHOP-1"])
+		self.assertNotIn("nero", self.index.postings)
+	
+	def test_round_trip(self):
+		"""Test that an index reloads from its persisted form"""
+		loaded = ShopSearchIndex.from_dict(self.index.as_dict())
+		
+		self.assertEqual(sorted(loaded.records), sorted(self.index.records))
+		self.assertEqual([row.name for row in loaded.search(query="caf")["results"]], self.get_names(query="caf"))
@@ -0,0 +1,135 @@
+import frappe
+from frappe import _
+
+from airplane_mode.instrumentation import QueryCounter
+
+
+STATS_CACHE_KEY = "airplane_mode_airport_stats"
+STATS_VERSION_KEY = "airplane_mode_airport_stats_version"
+
+# Backstop for status changes written with frappe.db.set_value, which
+# do not fire doc events
+STATS_TTL = 300
+
+
+def get_stats_version():
+    version = frappe.cache().get_value(STATS_VERSION_KEY)
+    if not version:
+        version = bump_stats_version()
+    return version
+
+
+def bump_stats_version():
+    version = frappe.generate_hash(length=10)
+    frappe.cache().set_value(STATS_VERSION_KEY, version)
+    return version
+
+
+def get_cached_stats():
+    """Cached stats for the current version, or None. Never touches the database."""
+    cached = frappe.cache().get_value(STATS_CACHE_KEY)
+    if cached and cached.get("version") == get_stats_version():
+        return cached
+    return None
+
+
+def compute_stats():
+    """Count shops, active contracts and open leads, and publish them to the site cache"""
+    version = get_stats_version()
+
+    shops = frappe.db.sql("""
+        SELECT COUNT(*) as total_shops,
+            COALESCE(SUM(status = 'Available'), 0) as available_shops
+        FROM `tabAirport Shop`
+    """, as_dict=True)[0]
+
+    cached = {
+        "version": version,
+        "stats": {
+            "total_shops": shops.total_shops,
+            "available_shops": int(shops.available_shops),
+            "active_contracts": frappe.db.count("Contract Shop", {"status": "Active"}),
+            "pending_leads": frappe.db.count("Shop Lead", {"status": "Open"})
+        },
+        "computed_on": frappe.utils.now()
+    }
+    frappe.cache().set_value(STATS_CACHE_KEY, cached, expires_in_sec=STATS_TTL)
+    return cached
+
+
+def get_stats_token():
+    """
+    Boot payload: the current stats version plus the cached numbers if
+    they are already warm. Clients call get_airport_stats when stats is
+    missing or the version they hold has changed.
+    """
+    cached = get_cached_stats()
+    return {
+        "version": cached["version"] if cached else get_stats_version(),
+        "stats": cached["stats"] if cached else None
+    }
+
+
+@frappe.whitelist()
+def get_airport_stats(version=None):
+    """
+    Lazy stats endpoint. Returns the cached numbers, recomputing them
+    once per version. Pass the version held by the client to skip the
+    payload when nothing has changed.
+    """
+    from airplane_mode.permission_context import get_permission_context
+
+    if not get_permission_context().has_airport_access:
+        frappe.throw(_("Not permitted"), frappe.PermissionError)
+
+    cached = get_cached_stats() or compute_stats()
+    if version and version == cached["version"]:
+        return {"version": version, "unchanged": True}
+
+    return cached
+
+
+def invalidate_stats(doc=None, method=None):
+    """Doc event: publish a new stats version once the change is committed"""
+    frappe.db.after_commit.add(bump_stats_version)
+
+
+def measure_boot(user=None, runs=5):
+    """
+    Measure query count and latency of the boot hook, cold and warm.
+    Run with: bench --site <site> execute airplane_mode.airport_stats.measure_boot
+    """
+    from airplane_mode.permission_context import clear_permission_context
+    from airplane_mode.utils import boot_session
+
+    user = user or frappe.session.user
+    original_user = frappe.session.user
+    frappe.set_user(user)
+
+    def run(fn):
+        clear_permission_context()
+        with QueryCounter() as counter:
+            fn(frappe._dict())
+        return counter.as_dict()
+
+    try:
+        frappe.cache().delete_value(STATS_CACHE_KEY)
+        results = {
+            "user": user,
+            "cold": run(boot_session),
+            "warm": [run(boot_session) for i in range(max(int(runs), 1))],
+            # Blocking stats computation the boot path used to do every time
+            "inline_stats": run(lambda bootinfo: compute_stats())
+        }
+    finally:
+        clear_permission_context()
+        frappe.set_user(original_user)
+
+    warm = results["warm"]
+    results["warm_avg"] = {
+        "queries": sum(r["queries"] for r in warm) / len(warm),
+        "wall_time_ms": round(sum(r["wall_time_ms"] for r in warm) / len(warm), 3)
+    }
+
+    frappe.logger("airplane_mode.boot").info(results)
+    return results
@@ -2,7 +2,10 @@ import frappe
 from frappe import _
 from frappe.utils import nowdate, add_months, getdate
 
+from airplane_mode.endpoint_profiler import profile_endpoint
+
 @frappe.whitelist()
+@profile_endpoint
 def get_shop_analytics(shop_id=None, date_range=None):
     """Get analytics data for shops"""
     
@@ -55,6 +58,7 @@ def get_shop_analytics(shop_id=None, date_range=None):
     }
 
 @frappe.whitelist()
+@profile_endpoint
 def get_revenue_trends():
     """Get monthly revenue trends"""
     
@@ -81,27 +85,34 @@ def get_revenue_trends():
     }
 
 @frappe.whitelist()
-def get_occupancy_forecast():
-    """Get occupancy forecast based on contract end dates"""
-    
-    ending_contracts = frappe.db.sql("""
-        SELECT 
-            DATE_FORMAT(end_date, '%Y-%m') as month,
-            COUNT(*) as ending_contracts,
-            SUM(monthly_rent) as revenue_at_risk
-        FROM `tabContract Shop`
-        WHERE docstatus = 1
-        AND end_date BETWEEN CURDATE() AND DATE_ADD(CURDATE(), INTERVAL 12 MONTH)
-        GROUP BY month
-        ORDER BY month ASC
-    """, as_dict=True)
+@profile_endpoint
+def get_occupancy_forecast(refresh=False):
+    """
+    Occupancy, rent roll and revenue at risk for the next 24 months per airport,
+    terminal and shop type, under each renewal scenario. Computed once per day.
+    """
+    from airplane_mode.airport_shop_management.forecasting import get_forecast
+    
+    forecast = get_forecast(refresh=frappe.utils.cint(refresh) and "System Manager" in frappe.get_roles())
+    
+    # Current contract terms ending in the next 12 months, as this endpoint used to return
+    totals = next(iter(forecast["totals"].values()), {})
+    ending_contracts = [
+        {"month": month, "ending_contracts": int(count), "revenue_at_risk": rent}
+        for month, count, rent in zip(
+            forecast["months"][:12], totals.get("expiring_contracts", []), totals.get("expiring_rent", [])
+        )
+        if count
+    ]
     
     return {
         "status": "success",
-        "ending_contracts": ending_contracts
+        "ending_contracts": ending_contracts,
+        "forecast": forecast
     }
 
 @frappe.whitelist()
+@profile_endpoint
 def get_lead_conversion_metrics():
     """Get lead conversion analytics"""
     
@@ -136,6 +147,7 @@ def get_lead_conversion_metrics():
     }
 
 @frappe.whitelist()
+@profile_endpoint
 def get_financial_summary():
     """Get financial summary for airport shop management"""
     
@@ -0,0 +1,419 @@
+# airplane_mode/api/boarding.py
+
+import json
+import random
+import time
+
+import frappe
+from frappe import _
+from frappe.utils import add_to_date, get_datetime, now_datetime
+
+from airplane_mode.endpoint_profiler import profile_endpoint
+
+# Ticket statuses in boarding order; a transition may only move forward
+STATUS_ORDER = ("Booked", "Checked-In", "Boarded")
+MAX_TICKETS = 1000
+MAX_SCANS = 5000
+
+
+@frappe.whitelist()
+@profile_endpoint
+def transition_tickets(flight, ticket_names, new_status):
+    """
+    Move many tickets of one flight to Checked-In or Boarded in a single
+    transaction, e.g. a gate scanner's batch. Boarded tickets are submitted.
+
+    Tickets that cannot move are skipped with a reason rather than failing
+    the batch. Occupancy is recalculated once for the flight. The flight's
+    gate is written onto the moved tickets directly, so no per-ticket
+    gate sync job is queued.
+    """
+    ticket_names = frappe.parse_json(ticket_names) if isinstance(ticket_names, str) else ticket_names
+    ticket_names = list(dict.fromkeys(name for name in (ticket_names or []) if name))
+
+    if new_status not in STATUS_ORDER[1:]:
+        frappe.throw(_("Tickets can only be moved to {0}").format(" or ".join(STATUS_ORDER[1:])))
+    if len(ticket_names) > MAX_TICKETS:
+        frappe.throw(_("At most {0} tickets can be moved at once").format(MAX_TICKETS))
+
+    frappe.has_permission("Airplane Ticket", "submit" if new_status == "Boarded" else "write", throw=True)
+    frappe.has_permission("Airplane Flight", "read", flight, throw=True)
+    gate_number = frappe.db.get_value("Airplane Flight", flight, "gate_number")
+
+    return apply_transitions(flight, ticket_names, new_status, gate_number)
+
+
+def apply_transitions(flight, ticket_names, new_status, gate_number=None, ignore_permissions=False):
+    """
+    Validate and apply the transitions with one locked read and one UPDATE.
+    Tickets the user cannot see (user permissions, permission query
+    conditions) are skipped unless ignore_permissions is set. Boarded
+    tickets are submitted without AirplaneTicket.validate, so the flight's
+    capacity is checked here and tickets beyond it are skipped.
+    """
+    result = {"flight": flight, "new_status": new_status, "updated": [], "skipped": []}
+    if not ticket_names:
+        return result
+
+    tickets = {
+        row.name: row
+        for row in frappe.db.sql("""
+            SELECT name, flight, status, docstatus
+            FROM `tabAirplane Ticket`
+            WHERE name IN %(names)s
+            FOR UPDATE
+        """, {"names": tuple(ticket_names)}, as_dict=True)
+    }
+
+    permitted = None if ignore_permissions else get_permitted_tickets(list(tickets))
+
+    target = STATUS_ORDER.index(new_status)
+    for name in ticket_names:
+        reason = get_skip_reason(tickets.get(name), flight, new_status, target)
+        if not reason and permitted is not None and name not in permitted:
+            reason = "not permitted"
+        if reason:
+            result["skipped"].append({"ticket": name, "reason": reason})
+        else:
+            result["updated"].append(name)
+
+    submit = new_status == "Boarded"
+    if submit and result["updated"]:
+        free = get_free_capacity(flight)
+        if free is not None and len(result["updated"]) > free:
+            overflow = result["updated"][max(free, 0):]
+            result["updated"] = result["updated"][:max(free, 0)]
+            result["skipped"] += [{"ticket": name, "reason": "flight full"} for name in overflow]
+
+    if not result["updated"]:
+        return result
+
+    now, user = now_datetime(), frappe.session.user
+    frappe.db.sql(f"""
+        UPDATE `tabAirplane Ticket`
+        SET status = %(status)s, modified = %(now)s, modified_by = %(user)s
+            {", gate_number = %(gate)s" if gate_number else ""}
+            {", docstatus = 1" if submit else ""}
+        WHERE name IN %(names)s
+    """, {"status": new_status, "now": now, "user": user, "gate": gate_number, "names": tuple(result["updated"])})
+
+    if submit:
+        frappe.db.sql("""
+            UPDATE `tabAirplane Ticket Add-on Item`
+            SET docstatus = 1
+            WHERE parenttype = 'Airplane Ticket' AND parent IN %(names)s
+        """, {"names": tuple(result["updated"])})
+
+    record_versions(result["updated"], tickets, new_status, now, user)
+    update_occupancy(flight)
+    return result
+
+
+def get_free_capacity(flight):
+    """
+    Seats left for submitted tickets, or None when capacity is 0 (unlimited).
+    The flight row stays locked until commit, so concurrent batches for the
+    same flight are counted one after the other.
+    """
+    capacity = frappe.db.sql(
+        "SELECT capacity FROM `tabAirplane Flight` WHERE name = %s FOR UPDATE", flight
+    )
+    capacity = capacity[0][0] if capacity else 0
+    if not capacity:
+        return None
+
+    submitted = frappe.db.count("Airplane Ticket", {"flight": flight, "docstatus": 1})
+    return capacity - submitted
+
+
+def get_permitted_tickets(ticket_names):
+    if not ticket_names:
+        return set()
+    return set(frappe.get_list(
+        "Airplane Ticket",
+        filters={"name": ["in", ticket_names]},
+        pluck="name",
+        limit_page_length=0
+    ))
+
+
+def get_skip_reason(ticket, flight, new_status, target):
+    if not ticket:
+        return "not found"
+    if ticket.flight != flight:
+        return "different flight"
+    if ticket.docstatus == 2:
+        return "cancelled"
+    if ticket.status == new_status:
+        return "already " + new_status
+    if ticket.docstatus == 1 or ticket.status not in STATUS_ORDER or STATUS_ORDER.index(ticket.status) > target:
+        return f"cannot move from {ticket.status} to {new_status}"
+    return None
+
+
+def record_versions(names, tickets, new_status, now, user):
+    """Airplane Ticket tracks changes; keep the same audit trail a save would leave"""
+    fields = ["name", "creation", "modified", "modified_by", "owner", "docstatus", "ref_doctype", "docname", "data"]
+    values = []
+    for name in names:
+        changed = [["status", tickets[name].status, new_status]]
+        if new_status == "Boarded":
+            changed.append(["docstatus", tickets[name].docstatus, 1])
+        values.append((
+            frappe.generate_hash(length=10), now, now, user, user, 0, "Airplane Ticket", name,
+            json.dumps({"changed": changed, "added": [], "removed": [], "row_changed": []})
+        ))
+
+    frappe.db.bulk_insert("Version", fields=fields, values=values)
+
+
+def update_occupancy(flight):
+    from airplane_mode.airplane_mode.doctype.airplane_flight.airplane_flight import update_flight_occupancy
+
+    update_flight_occupancy(frappe._dict(flight=flight))
+
+
+@frappe.whitelist()
+@profile_endpoint
+def upload_scans(device, scans):
+    """
+    Batch upload from a gate scanner that may have been offline. Each scan is
+    {"scan_id", "ticket", "gate", "scanned_at", "status"}, status defaulting
+    to Boarded. Returns the outcome per scan and a summary per flight.
+    """
+    scans = frappe.parse_json(scans) if isinstance(scans, str) else scans
+    if len(scans or []) > MAX_SCANS:
+        frappe.throw(_("At most {0} scans can be uploaded at once").format(MAX_SCANS))
+
+    frappe.has_permission("Airplane Ticket", "submit", throw=True)
+    return ingest_scans(device, scans or [])
+
+
+def ingest_scans(device, scans):
+    """
+    Dedupe scans by scan id (within the batch and against earlier uploads),
+    resolve them per ticket and apply them with one transition per
+    (flight, status, gate):
+      - a ticket moves to the furthest status any of its scans asks for
+      - the gate is taken from its latest scan
+      - scans for tickets already at or past that status are Superseded
+      - unknown, cancelled or malformed tickets are Rejected
+    """
+    received_at = now_datetime()
+    outcomes, batch = {}, {}
+    resent, missing_ids = 0, 0
+    for scan in scans:
+        scan = normalize_scan(scan, received_at)
+        if not scan.scan_id:
+            missing_ids += 1
+        elif scan.scan_id in batch:
+            # Same id twice in one upload: the first copy's outcome stands for both
+            resent += 1
+        else:
+            batch[scan.scan_id] = scan
+
+    for scan_id in get_known_scans(list(batch)):
+        outcomes[scan_id] = {"result": "Duplicate"}
+        batch.pop(scan_id)
+
+    tickets = get_ticket_states({scan.ticket for scan in batch.values() if scan.ticket})
+    by_ticket = {}
+    for scan in batch.values():
+        reason = get_scan_reject_reason(scan, tickets.get(scan.ticket))
+        if reason:
+            outcomes[scan.scan_id] = {"result": "Rejected", "detail": reason}
+        else:
+            by_ticket.setdefault(scan.ticket, []).append(scan)
+
+    groups = {}
+    for ticket, ticket_scans in by_ticket.items():
+        state = tickets[ticket]
+        target = max((scan.status for scan in ticket_scans), key=STATUS_ORDER.index)
+        gate = max(ticket_scans, key=lambda scan: scan.scanned_at).gate or state.gate_number
+
+        if STATUS_ORDER.index(state.status) >= STATUS_ORDER.index(target):
+            detail = f"already {state.status}"
+            if gate and state.gate_number and gate != state.gate_number:
+                detail += f" at gate {state.gate_number}"
+            for scan in ticket_scans:
+                outcomes[scan.scan_id] = {"result": "Superseded", "detail": detail}
+            continue
+
+        groups.setdefault((state.flight, target, gate), []).append(ticket)
+
+    skipped = {}
+    for (flight, target, gate), names in groups.items():
+        result = apply_transitions(flight, names, target, gate)
+        skipped.update({row["ticket"]: row["reason"] for row in result["skipped"]})
+
+    for ticket, ticket_scans in by_ticket.items():
+        for scan in ticket_scans:
+            if scan.scan_id in outcomes:
+                continue
+            reason = skipped.get(ticket)
+            outcomes[scan.scan_id] = {"result": "Rejected", "detail": reason} if reason else {"result": "Applied"}
+
+    log_scans(device, batch.values(), tickets, outcomes, received_at)
+    return {
+        "device": device,
+        "received": len(scans),
+        "resent_in_batch": resent,
+        "missing_scan_id": missing_ids,
+        "scans": outcomes,
+        "flights": summarize_flights(batch.values(), tickets, outcomes)
+    }
+
+
+def normalize_scan(scan, received_at):
+    scan = frappe._dict(scan or {})
+    scan.scan_id = str(scan.get("scan_id") or "").strip()
+    scan.status = scan.get("status") or "Boarded"
+    scan.gate = (scan.get("gate") or "").strip() or None
+    try:
+        scan.scanned_at = get_datetime(scan.get("scanned_at")) if scan.get("scanned_at") else received_at
+    except Exception:
+        scan.scanned_at = None
+    return scan
+
+
+def get_known_scans(scan_ids):
+    if not scan_ids:
+        return []
+    return frappe.db.sql_list(
+        "SELECT name FROM `tabBoarding Scan` WHERE name IN %(names)s",
+        {"names": tuple(scan_ids)}
+    )
+
+
+def get_ticket_states(ticket_names):
+    if not ticket_names:
+        return {}
+    return {
+        row.name: row
+        for row in frappe.db.sql("""
+            SELECT name, flight, status, docstatus, gate_number
+            FROM `tabAirplane Ticket`
+            WHERE name IN %(names)s
+        """, {"names": tuple(ticket_names)}, as_dict=True)
+    }
+
+
+def get_scan_reject_reason(scan, ticket):
+    if not scan.ticket:
+        return "no ticket"
+    if not ticket:
+        return "ticket not found"
+    if ticket.docstatus == 2:
+        return "cancelled"
+    if scan.status not in STATUS_ORDER[1:]:
+        return f"invalid status {scan.status}"
+    if ticket.status not in STATUS_ORDER:
+        return f"cannot move from {ticket.status}"
+    if scan.scanned_at is None:
+        return "invalid scanned_at"
+    return None
+
+
+def log_scans(device, scans, tickets, outcomes, received_at):
+    """Keep every accepted scan id so a re-upload is recognised as a duplicate"""
+    fields = ["name", "creation", "modified", "modified_by", "owner", "docstatus", "ticket", "flight",
+              "status", "gate", "device", "scanned_at", "received_at", "result", "detail"]
+    user = frappe.session.user
+    values = [
+        (
+            scan.scan_id, received_at, received_at, user, user, 0, scan.ticket if scan.ticket in tickets else None,
+            tickets[scan.ticket].flight if scan.ticket in tickets else None, scan.status if scan.status in STATUS_ORDER[1:] else None,
+            scan.gate, device, scan.scanned_at, received_at, outcomes[scan.scan_id]["result"],
+            (outcomes[scan.scan_id].get("detail") or "")[:140]
+        )
+        for scan in scans
+    ]
+    # A concurrent upload of the same scan ids keeps whichever row landed first
+    frappe.db.bulk_insert("Boarding Scan", fields=fields, values=values, ignore_duplicates=True)
+
+
+def summarize_flights(scans, tickets, outcomes):
+    """Scan outcomes per flight, with the flight's ticket counts after the batch"""
+    summary = {}
+    for scan in scans:
+        ticket = tickets.get(scan.ticket)
+        flight = ticket.flight if ticket else "Unknown"
+        counts = summary.setdefault(flight, {"scans": 0, "Applied": 0, "Superseded": 0, "Rejected": 0, "gate_mismatches": 0})
+        counts["scans"] += 1
+        counts[outcomes[scan.scan_id]["result"]] += 1
+        if ticket and scan.gate and ticket.gate_number and scan.gate != ticket.gate_number:
+            counts["gate_mismatches"] += 1
+
+    flights = [flight for flight in summary if flight != "Unknown"]
+    if flights:
+        for flight, status, count in frappe.db.sql("""
+            SELECT flight, status, COUNT(*)
+            FROM `tabAirplane Ticket`
+            WHERE flight IN %(flights)s AND docstatus < 2
+            GROUP BY flight, status
+        """, {"flights": tuple(flights)}):
+            summary[flight][status] = count
+
+    return summary
+
+
+def simulate_scans(scans=5000, batch_size=250, devices=4, duplicate_rate=0.05, flights=20, seed=7, commit=False):
+    """
+    Replay synthetic scanner uploads against open tickets and report
+    throughput. Devices resend part of their scans and scan some passengers
+    at more than one gate, as offline scanners do. Rolled back unless
+    commit=True. Run with:
+        bench --site <site> execute airplane_mode.api.boarding.simulate_scans --kwargs "{'scans': 10000}"
+    """
+    rng = random.Random(seed)
+    tickets = frappe.db.sql("""
+        SELECT ticket.name, flight.gate_number
+        FROM `tabAirplane Ticket` ticket
+        INNER JOIN `tabAirplane Flight` flight ON flight.name = ticket.flight
+        WHERE ticket.docstatus = 0 AND ticket.flight IN (
+            SELECT name FROM (
+                SELECT flight AS name FROM `tabAirplane Ticket`
+                WHERE docstatus = 0 GROUP BY flight ORDER BY COUNT(*) DESC LIMIT %(flights)s
+            ) busiest
+        )
+    """, {"flights": int(flights)}, as_dict=True)
+    if not tickets:
+        return {"scans": 0}
+
+    now = now_datetime()
+    generated = []
+    for i in range(int(scans)):
+        ticket = rng.choice(tickets)
+        gate = ticket.gate_number if rng.random() > 0.02 else f"G{rng.randint(1, 40)}"
+        generated.append({
+            "scan_id": f"SIM-{seed}-{i:08d}",
+            "ticket": ticket.name,
+            "gate": gate,
+            "status": "Boarded" if rng.random() > 0.2 else "Checked-In",
+            "scanned_at": str(add_to_date(now, seconds=-rng.randint(0, 3600)))
+        })
+    # Resends after a dropped connection
+    generated += [dict(scan) for scan in rng.sample(generated, int(len(generated) * duplicate_rate))]
+    rng.shuffle(generated)
+
+    totals = {"Applied": 0, "Superseded": 0, "Rejected": 0, "Duplicate": 0}
+    started = time.perf_counter()
+    for start in range(0, len(generated), int(batch_size)):
+        result = ingest_scans(f"SIM-DEVICE-{(start // int(batch_size)) % int(devices)}", generated[start:start + int(batch_size)])
+        for outcome in result["scans"].values():
+            totals[outcome["result"]] += 1
+        totals["Duplicate"] += result["resent_in_batch"]
+    elapsed = time.perf_counter() - started
+
+    if commit:
+        frappe.db.commit()
+    else:
+        frappe.db.rollback()
+
+    return {
+        "scans": len(generated),
+        "batches": -(-len(generated) // int(batch_size)),
+        "elapsed_ms": round(elapsed * 1000, 3),
+        "scans_per_second": round(len(generated) / elapsed, 1) if elapsed else None,
+        "outcomes": totals
+    }
@@ -3,7 +3,10 @@
 import frappe
 from frappe import _
 
+from airplane_mode.endpoint_profiler import profile_endpoint
+
 @frappe.whitelist()
+@profile_endpoint
 def get_airplane_dashboard_data():
     """
     Get comprehensive dashboard data for Airplane Mode
@@ -140,6 +143,7 @@ def get_airplane_dashboard_data():
         }
 
 @frappe.whitelist()
+@profile_endpoint
 def get_ticket_statistics():
     """Get detailed ticket statistics"""
     try:
@@ -166,6 +170,7 @@ def get_ticket_statistics():
         }
 
 @frappe.whitelist()
+@profile_endpoint
 def get_flight_statistics():
     """Get detailed flight statistics"""
     try:
@@ -1,6 +1,8 @@
 import frappe
 from frappe import _
 
+from airplane_mode.permission_context import get_permission_context
+
 
 @frappe.whitelist()
 def has_app_permission(user=None):
@@ -16,7 +18,7 @@ def has_app_permission(user=None):
         return True
     
     # Check if user has any of the airport management roles
-    user_roles = frappe.get_roles(user)
+    context = get_permission_context(user)
     airport_roles = [
         "Airport Manager", 
         "Shop Manager", 
@@ -26,16 +28,14 @@ def has_app_permission(user=None):
     ]
     
     # Check if user has any airport-related role
-    has_role = any(role in user_roles for role in airport_roles)
-    
-    if has_role:
+    if context.has_role(*airport_roles):
         return True
     
     # Check if user has any airport-related documents
     has_documents = (
-        frappe.db.exists("Shop Lead", {"owner": user}) or
-        frappe.db.exists("Contract Shop", {"tenant_email": user}) or
-        frappe.db.exists("Airport Shop", {"owner": user})
+        context.owns("Shop Lead") or
+        context.owns("Contract Shop", "tenant_email") or
+        context.owns("Airport Shop")
     )
     
     return has_documents
@@ -52,7 +52,7 @@ def get_user_permissions(doctype=None, user=None):
     if user == "Administrator":
         return {"read": True, "write": True, "create": True, "delete": True}
     
-    user_roles = frappe.get_roles(user)
+    user_roles = get_permission_context(user).roles
     
     # Default permissions
     permissions = {"read": False, "write": False, "create": False, "delete": False}
@@ -113,24 +113,15 @@ def validate_shop_access(shop_name, user=None):
     if user == "Administrator":
         return True
     
-    user_roles = frappe.get_roles(user)
+    context = get_permission_context(user)
     
     # Airport Manager and Shop Manager have access to all shops
-    if "Airport Manager" in user_roles or "Shop Manager" in user_roles:
+    if context.is_shop_manager:
         return True
     
     # Tenant can only access their contracted shops
-    if "Tenant" in user_roles:
-        # Check if user has active contract for this shop
-        contract_exists = frappe.db.exists(
-            "Contract Shop", 
-            {
-                "shop": shop_name,
-                "tenant_email": user,
-                "status": "Active"
-            }
-        )
-        return bool(contract_exists)
+    if context.has_role("Tenant"):
+        return shop_name in context.contracted_shops
     
     return False
 
@@ -146,22 +137,16 @@ def get_accessible_shops(user=None):
     if user == "Administrator":
         return frappe.get_all("Airport Shop", fields=["name", "shop_name"])
     
-    user_roles = frappe.get_roles(user)
+    context = get_permission_context(user)
     
     # Airport Manager and Shop Manager can see all shops
-    if "Airport Manager" in user_roles or "Shop Manager" in user_roles:
+    if context.is_shop_manager:
         return frappe.get_all("Airport Shop", fields=["name", "shop_name", "status"])
     
     # Tenant can only see their contracted shops and available shops
-    if "Tenant" in user_roles:
+    if context.has_role("Tenant"):
         # Get shops with active contracts
-        contracted_shops = frappe.get_all(
-            "Contract Shop",
-            filters={"tenant_email": user, "status": "Active"},
-            fields=["shop"]
-        )
-        
-        shop_names = [shop.shop for shop in contracted_shops]
+        shop_names = list(context.contracted_shops)
         
         # Add available shops for potential contracting
         available_shops = frappe.get_all(
@@ -195,20 +180,15 @@ def check_contract_permissions(contract_name, user=None):
     if user == "Administrator":
         return True
     
-    user_roles = frappe.get_roles(user)
+    context = get_permission_context(user)
     
-    # Airport Manager has full access
-    if "Airport Manager" in user_roles:
-        return True
-    
-    # Shop Manager can manage contracts
-    if "Shop Manager" in user_roles:
+    # Airport Manager and Shop Manager can manage contracts
+    if context.is_shop_manager:
         return True
     
     # Tenant can only access their own contracts
-    if "Tenant" in user_roles:
-        contract = frappe.get_doc("Contract Shop", contract_name)
-        return contract.tenant_email == user
+    if context.has_role("Tenant"):
+        return frappe.db.get_value("Contract Shop", contract_name, "tenant_email") == user
     
     return False
 
@@ -221,7 +201,7 @@ def get_dashboard_permissions(user=None):
     if not user:
         user = frappe.session.user
     
-    user_roles = frappe.get_roles(user)
+    user_roles = get_permission_context(user).roles
     
     permissions = {
         "can_view_analytics": False,
@@ -265,13 +245,11 @@ def get_permission_query_conditions_for_shop_lead(user=None):
     if user == "Administrator":
         return ""
     
-    user_roles = frappe.get_roles(user)
-    
-    if "Airport Manager" in user_roles or "Shop Manager" in user_roles:
+    if get_permission_context(user).is_shop_manager:
         return ""  # Can see all leads
     
     # Users can only see their own leads
-    return f"`tabShop Lead`.owner = '{user}'"
+    return f"`tabShop Lead`.owner = {frappe.db.escape(user)}"
 
 
 def get_permission_query_conditions_for_contract_shop(user=None):
@@ -284,14 +262,14 @@ def get_permission_query_conditions_for_contract_shop(user=None):
     if user == "Administrator":
         return ""
     
-    user_roles = frappe.get_roles(user)
+    context = get_permission_context(user)
     
-    if "Airport Manager" in user_roles or "Shop Manager" in user_roles:
+    if context.is_shop_manager:
         return ""  # Can see all contracts
     
     # Tenants can only see their own contracts
-    if "Tenant" in user_roles:
-        return f"`tabContract Shop`.tenant_email = '{user}'"
+    if context.has_role("Tenant"):
+        return f"`tabContract Shop`.tenant_email = {frappe.db.escape(user)}"
     
     # Default: no access
     return "1=0"
@@ -307,22 +285,18 @@ def get_permission_query_conditions_for_airport_shop(user=None):
     if user == "Administrator":
         return ""
     
-    user_roles = frappe.get_roles(user)
+    context = get_permission_context(user)
     
-    if "Airport Manager" in user_roles or "Shop Manager" in user_roles:
+    if context.is_shop_manager:
         return ""  # Can see all shops
     
-    if "Tenant" in user_roles:
+    if context.has_role("Tenant"):
         # Tenants can see available shops and their contracted shops
-        contracted_shops = frappe.get_all(
-            "Contract Shop",
-            filters={"tenant_email": user, "status": "Active"},
-            pluck="shop"
-        )
+        contracted_shops = context.contracted_shops
         
         if contracted_shops:
-            shop_list = "', '".join(contracted_shops)
-            return f"(`tabAirport Shop`.status = 'Available' OR `tabAirport Shop`.name IN ('{shop_list}'))"
+            shop_list = ", ".join(frappe.db.escape(shop) for shop in sorted(contracted_shops))
+            return f"(`tabAirport Shop`.status = 'Available' OR `tabAirport Shop`.name IN ({shop_list}))"
         else:
             return "`tabAirport Shop`.status = 'Available'"
     
@@ -6,7 +6,11 @@ This file contains all the API endpoints and their configurations
 import frappe
 from frappe import _
 
+from airplane_mode.endpoint_profiler import profile_endpoint
+from airplane_mode.reference_cache import get_reference_list
+
 @frappe.whitelist(allow_guest=False, methods=["GET"])
+@profile_endpoint
 def get_shops_list():
     """
     Get list of all shops with detailed information
@@ -46,6 +50,7 @@ def get_shops_list():
         }
 
 @frappe.whitelist(allow_guest=False, methods=["POST"])
+@profile_endpoint
 def create_shop(**kwargs):
     """
     Create a new shop via API
@@ -111,6 +116,7 @@ def create_shop(**kwargs):
         }
 
 @frappe.whitelist(allow_guest=False, methods=["GET"])
+@profile_endpoint
 def get_shop_details(shop_id):
     """
     Get detailed information for a specific shop
@@ -153,13 +159,14 @@ def get_shop_details(shop_id):
         }
 
 @frappe.whitelist(allow_guest=False, methods=["GET"])
+@profile_endpoint
 def get_shop_types():
     """
     Get all enabled shop types
     Endpoint: /api/method/airplane_mode.api.shop_api.get_shop_types
     """
     try:
-        shop_types = frappe.db.get_list(
+        shop_types = get_reference_list(
             "Shop Type",
             filters={"enabled": 1},
             fields=["name", "shop_type_name", "description"],
@@ -178,6 +185,7 @@ def get_shop_types():
         }
 
 @frappe.whitelist(allow_guest=False, methods=["GET"]) 
+@profile_endpoint
 def get_airport_analytics(airport=None):
     """
     Get analytics for airport shops
@@ -3,7 +3,10 @@ from frappe import _
 from frappe.utils import nowdate, add_months, cint, flt
 import json
 
+from airplane_mode.endpoint_profiler import profile_endpoint
+
 @frappe.whitelist(allow_guest=True)
+@profile_endpoint
 def get_available_shops():
     """Get list of available shops for the public portal"""
     
@@ -124,6 +127,45 @@ def get_available_shops():
         }
 
 @frappe.whitelist(allow_guest=True)
+@profile_endpoint
+def search_shops(query=None, airport=None, terminal=None, shop_type=None, rent_band=None,
+                 min_area=None, max_rent=None, limit=20, start=0, order_by=None):
+    """Ranked full-text search with facet counts over available shops"""
+    
+    from airplane_mode.airport_shop_management.shop_search import search
+    
+    try:
+        result = search(
+            query=query,
+            airport=airport,
+            terminal=terminal,
+            shop_type=shop_type,
+            rent_band=rent_band,
+            min_area=flt(min_area) if min_area else None,
+            max_rent=flt(max_rent) if max_rent else None,
+            limit=limit,
+            start=start,
+            order_by=order_by
+        )
+        return {
+            "status": "success",
+            "shops": result["results"],
+            "facets": result["facets"],
+            "total_available": result["total"]
+        }
+        
+    except Exception as e:
+        frappe.log_error(f"Shop search error: {str(e)}")
+        return {
+            "status": "error",
+            "message": "Unable to search shops at this time",
+            "shops": [],
+            "facets": {},
+            "total_available": 0
+        }
+
+@frappe.whitelist(allow_guest=True)
+@profile_endpoint
 def get_shop_details(shop_id):
     """Get detailed information about a specific shop"""
     
@@ -165,9 +207,12 @@ def get_shop_details(shop_id):
         frappe.throw(_("Unable to load shop details"))
 
 @frappe.whitelist(allow_guest=True)
-def submit_shop_application(shop_id, lead_data):
+@profile_endpoint
+def submit_shop_application(shop_id, lead_data, idempotency_key=None):
     """Submit application for a shop"""
     
+    from airplane_mode.airport_shop_management.lead_intake import submit_lead
+    
     try:
         if isinstance(lead_data, str):
             lead_data = json.loads(lead_data)
@@ -181,59 +226,25 @@ def submit_shop_application(shop_id, lead_data):
         if not frappe.utils.validate_email_address(lead_data.get('email')):
             frappe.throw(_("Please provide a valid email address"))
         
-        # Check if Shop Lead doctype exists, if not create a simple log
-        if frappe.db.exists("DocType", "Shop Lead"):
-            # Check for duplicate applications
-            existing_lead = frappe.db.exists("Shop Lead", {
-                "preferred_shop": shop_id,
-                "email": lead_data.get('email'),
-                "status": ["in", ["Open", "Contacted", "Interested"]]
-            })
-            
-            if existing_lead:
-                frappe.throw(_("You have already submitted an application for this shop. We will contact you soon."))
-            
-            # Create lead
-            lead = frappe.get_doc({
-                "doctype": "Shop Lead",
-                "preferred_shop": shop_id,
-                "lead_name": lead_data.get('lead_name'),
-                "email": lead_data.get('email'),
-                "phone": lead_data.get('phone'),
-                "business_type": lead_data.get('business_type'),
-                "notes": lead_data.get('message', ''),
-                "status": "Open",
-                "source": "Website"
-            })
-            
-            lead.insert(ignore_permissions=True)
-            lead_id = lead.name
-        else:
-            # If Shop Lead doesn't exist, create a simple log entry
-            lead_log = frappe.get_doc({
-                "doctype": "Communication",
-                "communication_type": "Comment",
-                "content": f"""
-                Shop Application Received:
-                
-                Name: {lead_data.get('lead_name')}
-                Email: {lead_data.get('email')}
-                Phone: {lead_data.get('phone')}
-                Business Type: {lead_data.get('business_type')}
-                Shop: {shop_id}
-                Message: {lead_data.get('message', '')}
-                """,
-                "subject": f"Shop Application - {lead_data.get('lead_name')} - {shop_id}"
-            })
-            lead_log.insert(ignore_permissions=True)
-            lead_id = lead_log.name
+        # Rate limits, retries and duplicate checks are handled by the intake layer
+        return submit_lead(
+            shop_id,
+            lead_data.get('email'),
+            lambda: create_application_lead(shop_id, lead_data),
+            idempotency_key=idempotency_key or lead_data.get('idempotency_key')
+        )
         
+    except frappe.TooManyRequestsError as e:
+        frappe.local.response["http_status_code"] = 429
+        return {
+            "status": "error",
+            "message": str(e)
+        }
+    except frappe.DuplicateEntryError as e:
         return {
-            "status": "success", 
-            "lead_id": lead_id, 
-            "message": _("Thank you for your interest! We will contact you within 24 hours.")
+            "status": "error",
+            "message": str(e)
         }
-        
     except Exception as e:
         frappe.log_error(f"Submit shop application error: {str(e)}")
         return {
@@ -241,7 +252,53 @@ def submit_shop_application(shop_id, lead_data):
             "message": str(e) if "Field" in str(e) or "email" in str(e) or "duplicate" in str(e) else "Unable to submit application. Please try again."
         }
 
+def create_application_lead(shop_id, lead_data):
+    """Create the Shop Lead (or a fallback log entry) for an accepted application"""
+    
+    # Check if Shop Lead doctype exists, if not create a simple log
+    if frappe.db.exists("DocType", "Shop Lead"):
+        lead = frappe.get_doc({
+            "doctype": "Shop Lead",
+            "preferred_shop": shop_id,
+            "lead_name": lead_data.get('lead_name'),
+            "email": lead_data.get('email'),
+            "phone": lead_data.get('phone'),
+            "business_type": lead_data.get('business_type'),
+            "notes": lead_data.get('message', ''),
+            "status": "Open",
+            "source": "Website"
+        })
+        
+        lead.insert(ignore_permissions=True)
+        lead_id = lead.name
+    else:
+        # If Shop Lead doesn't exist, create a simple log entry
+        lead_log = frappe.get_doc({
+            "doctype": "Communication",
+            "communication_type": "Comment",
+            "content": f"""
+            Shop Application Received:
+            
+            Name: {lead_data.get('lead_name')}
+            Email: {lead_data.get('email')}
+            Phone: {lead_data.get('phone')}
+            Business Type: {lead_data.get('business_type')}
+            Shop: {shop_id}
+            Message: {lead_data.get('message', '')}
+            """,
+            "subject": f"Shop Application - {lead_data.get('lead_name')} - {shop_id}"
+        })
+        lead_log.insert(ignore_permissions=True)
+        lead_id = lead_log.name
+    
+    return {
+        "status": "success", 
+        "lead_id": lead_id, 
+        "message": _("Thank you for your interest! We will contact you within 24 hours.")
+    }
+
 @frappe.whitelist()
+@profile_endpoint
 def get_dashboard_data():
     """Get dashboard data for airport shop management"""
     
@@ -296,6 +353,7 @@ def get_dashboard_data():
         }
 
 @frappe.whitelist()
+@profile_endpoint
 def send_follow_up_email(lead_name, message_type="follow_up"):
     """Send follow-up emails to leads"""
     
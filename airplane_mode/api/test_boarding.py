@@ -0,0 +1,146 @@
+# Copyright (c) 2026, nandhakishore and Contributors
+# See license.txt
+
+from unittest.mock import MagicMock, patch
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from airplane_mode.api.boarding import STATUS_ORDER, apply_transitions, get_skip_reason, ingest_scans
+
+
+class TestGetSkipReason(FrappeTestCase):
+	"""Test cases for batch ticket transitions"""
+	
+	def get_reason(self, ticket, new_status="Boarded", flight="FL-1"):
+		return get_skip_reason(ticket and frappe._dict(ticket), flight, new_status, STATUS_ORDER.index(new_status))
+	
+	def test_open_ticket_moves(self):
+		"""Test that draft tickets move forward"""
+		self.assertIsNone(self.get_reason({"flight": "FL-1", "status": "Booked", "docstatus": 0}))
+		self.assertIsNone(self.get_reason({"flight": "FL-1", "status": "Checked-In", "docstatus": 0}))
+		self.assertIsNone(self.get_reason({"flight": "FL-1", "status": "Booked", "docstatus": 0}, "Checked-In"))
+	
+	def test_skip_reasons(self):
+		"""Test every reason a ticket is skipped"""
+		self.assertEqual(self.get_reason(None), "not found")
+		self.assertEqual(self.get_reason({"flight": "FL-2", "status": "Booked", "docstatus": 0}), "different flight")
+		self.assertEqual(self.get_reason({"flight": "FL-1", "status": "Booked", "docstatus": 2}), "cancelled")
+		self.assertEqual(self.get_reason({"flight": "FL-1", "status": "Boarded", "docstatus": 1}), "already Boarded")
+		self.assertEqual(
+			self.get_reason({"flight": "FL-1", "status": "Boarded", "docstatus": 1}, "Checked-In"),
+			"cannot move from Boarded to Checked-In"
+		)
+		self.assertEqual(
+			self.get_reason({"flight": "FL-1", "status": "Cancelled", "docstatus": 0}),
+			"cannot move from Cancelled to Boarded"
+		)
+
+
+class TestApplyTransitions(FrappeTestCase):
+	"""Test cases for the capacity check on batch boarding; database access is patched out"""
+	
+	def apply(self, new_status, free_capacity):
+		db = MagicMock()
+		db.sql.return_value = [
+			frappe._dict(name=f"TKT-{i}", flight="FL-1", status="Checked-In", docstatus=0) for i in range(1, 4)
+		]
+		with patch.object(frappe, "db", db), \
+			patch("airplane_mode.api.boarding.get_permitted_tickets", return_value={"TKT-1", "TKT-2", "TKT-3"}), \
+			patch("airplane_mode.api.boarding.get_free_capacity", return_value=free_capacity), \
+			patch("airplane_mode.api.boarding.record_versions"), \
+			patch("airplane_mode.api.boarding.update_occupancy"):
+			return apply_transitions("FL-1", ["TKT-1", "TKT-2", "TKT-3"], new_status)
+	
+	def test_boarding_stops_at_capacity(self):
+		"""Test that tickets beyond the flight's free seats are not submitted"""
+		result = self.apply("Boarded", 1)
+		
+		self.assertEqual(result["updated"], ["TKT-1"])
+		self.assertEqual(result["skipped"], [
+			{"ticket": "TKT-2", "reason": "flight full"},
+			{"ticket": "TKT-3", "reason": "flight full"}
+		])
+	
+	def test_unlimited_capacity(self):
+		"""Test that a flight with capacity 0 boards every ticket"""
+		result = self.apply("Boarded", None)
+		
+		self.assertEqual(result["updated"], ["TKT-1", "TKT-2", "TKT-3"])
+		self.assertEqual(result["skipped"], [])
+
+
+TICKETS = {
+	"TKT-1": frappe._dict(name="TKT-1", flight="FL-1", status="Booked", docstatus=0, gate_number="G1"),
+	"TKT-2": frappe._dict(name="TKT-2", flight="FL-1", status="Boarded", docstatus=1, gate_number="G1"),
+	"TKT-3": frappe._dict(name="TKT-3", flight="FL-1", status="Booked", docstatus=2, gate_number="G1"),
+	"TKT-4": frappe._dict(name="TKT-4", flight="FL-1", status="Booked", docstatus=0, gate_number="G1")
+}
+
+
+class TestIngestScans(FrappeTestCase):
+	"""Test cases for resolving a scanner upload; database access is patched out"""
+	
+	def ingest(self, scans, skipped=None):
+		def get_ticket_states(names):
+			return {name: TICKETS[name] for name in names if name in TICKETS}
+		
+		def apply_transitions(flight, names, target, gate):
+			self.transitions.append((flight, sorted(names), target, gate))
+			return {"skipped": [{"ticket": name, "reason": (skipped or {})[name]} for name in names if name in (skipped or {})]}
+		
+		self.transitions = []
+		with patch("airplane_mode.api.boarding.get_known_scans", side_effect=lambda ids: [i for i in ids if i == "SCAN-OLD"]), \
+			patch("airplane_mode.api.boarding.get_ticket_states", side_effect=get_ticket_states), \
+			patch("airplane_mode.api.boarding.apply_transitions", side_effect=apply_transitions), \
+			patch("airplane_mode.api.boarding.log_scans"), \
+			patch("airplane_mode.api.boarding.summarize_flights", return_value={}):
+			return ingest_scans("DEVICE-1", scans)
+	
+	def test_outcomes(self):
+		"""Test the outcome of each kind of scan in one upload"""
+		result = self.ingest([
+			{"scan_id": "SCAN-1", "ticket": "TKT-1", "status": "Checked-In", "gate": "G1", "scanned_at": "2030-01-01 10:00:00"},
+			{"scan_id": "SCAN-2", "ticket": "TKT-1", "gate": "G2", "scanned_at": "2030-01-01 10:05:00"},
+			{"scan_id": "SCAN-1", "ticket": "TKT-1", "status": "Checked-In", "gate": "G1", "scanned_at": "2030-01-01 10:00:00"},
+			{"scan_id": "SCAN-3", "ticket": "TKT-2", "gate": "G3"},
+			{"scan_id": "SCAN-4", "ticket": "TKT-3"},
+			{"scan_id": "SCAN-5", "ticket": "TKT-9"},
+			{"scan_id": "SCAN-OLD", "ticket": "TKT-1"},
+			{"ticket": "TKT-1"}
+		])
+		scans = result["scans"]
+		
+		# Both scans of TKT-1 resolve to one move to Boarded at the latest gate
+		self.assertEqual(self.transitions, [("FL-1", ["TKT-1"], "Boarded", "G2")])
+		self.assertEqual(scans["SCAN-1"], {"result": "Applied"})
+		self.assertEqual(scans["SCAN-2"], {"result": "Applied"})
+		self.assertEqual(scans["SCAN-3"], {"result": "Superseded", "detail": "already Boarded at gate G1"})
+		self.assertEqual(scans["SCAN-4"], {"result": "Rejected", "detail": "cancelled"})
+		self.assertEqual(scans["SCAN-5"], {"result": "Rejected", "detail": "ticket not found"})
+		self.assertEqual(scans["SCAN-OLD"], {"result": "Duplicate"})
+		self.assertEqual(result["received"], 8)
+		self.assertEqual(result["resent_in_batch"], 1)
+		self.assertEqual(result["missing_scan_id"], 1)
+	
+	def test_skipped_transition_is_rejected(self):
+		"""Test that a ticket skipped by the transition rejects its scans"""
+		result = self.ingest(
+			[{"scan_id": "SCAN-6", "ticket": "TKT-4", "gate": "G1"}],
+			skipped={"TKT-4": "not permitted"}
+		)
+		
+		self.assertEqual(result["scans"]["SCAN-6"], {"result": "Rejected", "detail": "not permitted"})
+	
+	def test_invalid_scans(self):
+		"""Test that malformed scans are rejected without a transition"""
+		result = self.ingest([
+			{"scan_id": "SCAN-7", "ticket": "TKT-4", "status": "Booked"},
+			{"scan_id": "SCAN-8", "ticket": "TKT-4", "scanned_at": "not a date"},
+			{"scan_id": "SCAN-9"}
+		])
+		
+		self.assertEqual(self.transitions, [])
+		self.assertEqual(result["scans"]["SCAN-7"], {"result": "Rejected", "detail": "invalid status Booked"})
+		self.assertEqual(result["scans"]["SCAN-8"], {"result": "Rejected", "detail": "invalid scanned_at"})
+		self.assertEqual(result["scans"]["SCAN-9"], {"result": "Rejected", "detail": "no ticket"})
@@ -0,0 +1 @@
+from airplane_mode.benchmarks.runner import run
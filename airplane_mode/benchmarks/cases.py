@@ -0,0 +1,279 @@
+"""
+Hot-path benchmark cases. Each case runs its operation exactly once;
+the runner handles warm-up, repetition, query counting and isolation.
+"""
+
+import frappe
+from frappe.utils import getdate
+
+from airplane_mode.benchmarks.runner import benchmark
+
+
+# Tickets and flights
+
+@benchmark("ticket.insert", writes=True)
+def ticket_insert(context):
+    """Book a draft ticket: validation, capacity check and the occupancy hook"""
+    template = frappe.get_doc("Airplane Ticket", context.open_ticket)
+    ticket = frappe.copy_doc(template)
+    ticket.seat = None
+    ticket.status = "Booked"
+    ticket.insert(ignore_permissions=True)
+
+
+@benchmark("ticket.submit", writes=True)
+def ticket_submit(context):
+    """Board and submit a ticket, including the gate sync enqueue"""
+    template = frappe.get_doc("Airplane Ticket", context.open_ticket)
+    ticket = frappe.copy_doc(template)
+    ticket.seat = None
+    ticket.status = "Boarded"
+    ticket.insert(ignore_permissions=True)
+    ticket.submit()
+
+
+@benchmark("ticket.board_batch", writes=True)
+def ticket_board_batch(context):
+    """Board up to 400 open tickets of the busiest flight in one transition"""
+    from airplane_mode.api.boarding import apply_transitions
+
+    tickets = frappe.get_all(
+        "Airplane Ticket",
+        filters={"flight": context.busiest_flight, "docstatus": 0},
+        pluck="name",
+        limit=400
+    )
+    apply_transitions(context.busiest_flight, tickets, "Boarded", "Z97")
+
+
+@benchmark("flight.gate_sync", writes=True)
+def flight_gate_sync(context):
+    """Move every non-boarded ticket of the busiest flight to a new gate"""
+    from airplane_mode.airplane_mode.doctype.airplane_flight.airplane_flight import update_gate_number_for_flight
+
+    update_gate_number_for_flight(context.busiest_flight, "Z99", update_drafts=True)
+
+
+@benchmark("flight.save", writes=True)
+def flight_save(context):
+    """Save a flight with a gate change: occupancy and gate sync hooks"""
+    flight = frappe.get_doc("Airplane Flight", context.busiest_flight)
+    flight.gate_number = "Z98"
+    flight.flags.ignore_validate_update_after_submit = True
+    flight.save(ignore_permissions=True)
+
+
+@benchmark("flight.occupancy_single", writes=True)
+def flight_occupancy_single(context):
+    from airplane_mode.airplane_mode.doctype.airplane_flight.airplane_flight import update_flight_occupancy
+
+    update_flight_occupancy(frappe._dict(flight=context.busiest_flight))
+
+
+@benchmark("flight.occupancy_all", repeat=3, writes=True)
+def flight_occupancy_all(context):
+    """Nightly recalculation over every flight"""
+    from airplane_mode.airplane_mode.doctype.airplane_flight.airplane_flight import recalculate_all_flight_occupancy
+
+    recalculate_all_flight_occupancy()
+
+
+@benchmark("flight.booking_curve_snapshot", repeat=3, writes=True)
+def flight_booking_curve_snapshot(context):
+    """Daily booking curve snapshot for every flight in the next 180 days"""
+    from airplane_mode.airplane_mode.booking_curves import record_booking_curves
+
+    record_booking_curves(context.plan["anchor_date"])
+
+
+@benchmark("flight.booking_pace")
+def flight_booking_pace(context):
+    from airplane_mode.airplane_mode.booking_curves import get_booking_pace
+
+    get_booking_pace(group_by="route")
+
+
+@benchmark("flight.departures_board")
+def flight_departures_board(context):
+    """Board read for the /flights page and airport screens, warm cache"""
+    from airplane_mode.airplane_mode.departures_board import get_board
+
+    get_board()
+
+
+@benchmark("flight.gate_plan", repeat=3, writes=True)
+def flight_gate_plan(context):
+    """Plan and apply gates for the anchor day's departures at every airport"""
+    from airplane_mode.airplane_mode.gate_optimizer import optimize_gates
+
+    optimize_gates(context.plan["anchor_date"], apply=True)
+
+
+# Shops, leases and invoicing
+
+BULK_LEASES = 1000
+
+
+def insert_benchmark_leases(context, docstatus):
+    """Insert BULK_LEASES Draft leases on the dataset's shops; rolled back with the iteration"""
+    prefix = context.plan["prefix"]
+    leases = frappe.get_all(
+        "Shop Lease Contract",
+        filters={"name": ["like", f"{prefix}-LEASE-%"]},
+        fields=["contract_shop", "tenant", "rent_amount"],
+        order_by="name"
+    )
+    anchor = getdate(context.plan["anchor_date"])
+    now = frappe.utils.now_datetime()
+    fields = ["name", "creation", "modified", "owner", "modified_by", "docstatus", "contract_shop", "tenant",
+              "rent_amount", "start_date", "end_date", "status"]
+
+    names, values = [], []
+    for i in range(BULK_LEASES):
+        lease = leases[i % len(leases)]
+        name = f"{prefix}-ACT-{i:05d}"
+        names.append(name)
+        values.append((name, now, now, "Administrator", "Administrator", docstatus, lease.contract_shop, lease.tenant,
+                       lease.rent_amount, anchor, frappe.utils.add_months(anchor, 12), "Draft"))
+
+    frappe.db.bulk_insert("Shop Lease Contract", fields, values)
+    return names
+
+
+@benchmark("lease.activate_1000_submit", repeat=1, writes=True)
+def lease_activate_submit(context):
+    """Submit 1,000 leases one by one: each one occupies its shop with targeted writes"""
+    for name in insert_benchmark_leases(context, docstatus=0):
+        frappe.get_doc("Shop Lease Contract", name).submit()
+
+
+@benchmark("lease.activate_1000_bulk", repeat=3, writes=True)
+def lease_activate_bulk(context):
+    """Activate 1,000 submitted leases with shop_state_sync.activate_contracts"""
+    from airplane_mode.airport_shop_management.shop_state_sync import activate_contracts
+
+    activate_contracts(insert_benchmark_leases(context, docstatus=1))
+
+
+@benchmark("invoicing.monthly", repeat=3, writes=True)
+def invoicing_monthly(context):
+    """Create this month's Monthly Invoices for all active leases"""
+    from airplane_mode.airport_shop_management.doctype.monthly_invoice.monthly_invoice import (
+        create_monthly_invoices_for_active_contracts
+    )
+
+    create_monthly_invoices_for_active_contracts()
+
+
+@benchmark("metrics.monthly_build")
+def metrics_monthly_build(context):
+    from airplane_mode.airport_shop_management.analytics import MonthlyMetricsBuilder
+
+    anchor = getdate(context.plan["anchor_date"])
+    MonthlyMetricsBuilder(anchor.year, anchor.month).build()
+
+
+@benchmark("forecast.build")
+def forecast_build(context):
+    """Load the lease book and project 24 months under every renewal scenario, uncached"""
+    from airplane_mode.airport_shop_management.forecasting import build_forecast
+
+    build_forecast(context.plan["anchor_date"])
+
+
+@benchmark("search.shops")
+def search_shops(context):
+    from airplane_mode.api.shop_portal import search_shops
+
+    search_shops(query="retail", limit=20)
+
+
+# Hot filter paths
+
+@benchmark("db.hot_queries")
+def db_hot_queries(context):
+    """Every query in db_indexes.HOT_QUERIES once, as served by the live indexes"""
+    from airplane_mode.db_indexes import HOT_QUERIES, get_query_params
+
+    for query in HOT_QUERIES:
+        try:
+            frappe.db.sql(query["sql"].format(hint=""), get_query_params(query))
+        except Exception:
+            # Tables or columns missing on this site, e.g. Sales Invoice without ERPNext
+            continue
+
+
+# Dashboard APIs
+
+@benchmark("api.airplane_dashboard")
+def api_airplane_dashboard(context):
+    from airplane_mode.api.dashboard import get_airplane_dashboard_data
+
+    get_airplane_dashboard_data()
+
+
+@benchmark("api.ticket_statistics")
+def api_ticket_statistics(context):
+    from airplane_mode.api.dashboard import get_ticket_statistics
+
+    get_ticket_statistics()
+
+
+@benchmark("api.flight_statistics")
+def api_flight_statistics(context):
+    from airplane_mode.api.dashboard import get_flight_statistics
+
+    get_flight_statistics()
+
+
+@benchmark("api.shop_dashboard")
+def api_shop_dashboard(context):
+    from airplane_mode.api.shop_portal import get_dashboard_data
+
+    get_dashboard_data()
+
+
+@benchmark("api.financial_summary")
+def api_financial_summary(context):
+    from airplane_mode.api.analytics import get_financial_summary
+
+    get_financial_summary()
+
+
+@benchmark("api.airport_stats")
+def api_airport_stats(context):
+    from airplane_mode.airport_stats import compute_stats
+
+    compute_stats()
+
+
+# Reports
+
+@benchmark("report.rent_collection_summary")
+def report_rent_collection_summary(context):
+    from frappe.desk.query_report import run
+
+    run("Rent Collection Summary", filters={})
+
+
+@benchmark("report.airport_shop_report")
+def report_airport_shop_report(context):
+    from frappe.desk.query_report import run
+
+    run("Airport Shop Report", filters={})
+
+
+@benchmark("report.revenue_by_airline")
+def report_revenue_by_airline(context):
+    from frappe.desk.query_report import run
+
+    run("Revenue by Airline", filters={})
+
+
+@benchmark("report.weekly_snapshot", repeat=3, writes=True)
+def report_weekly_snapshot(context):
+    """Snapshot and build stages of the weekly report run, without sending"""
+    from airplane_mode.airplane_mode.report_automation import REPORT_BUILDERS, build_reports, read_report_snapshot
+
+    report_types = list(REPORT_BUILDERS)
+    build_reports(read_report_snapshot(report_types), report_types)
@@ -0,0 +1,249 @@
+import json
+import os
+import statistics
+from contextlib import contextmanager
+
+import frappe
+from frappe.utils import now_datetime
+
+from airplane_mode.instrumentation import QueryCounter
+
+
+DATASET_PREFIX = "BENCH"
+DATASET_SEED = 1234
+# Fixed so every run sees the same flights, leases and invoices
+DATASET_ANCHOR = "2025-06-15"
+
+DEFAULT_THRESHOLD = 0.20
+# Timing differences below this are noise, whatever the percentage
+NOISE_FLOOR_MS = 2.0
+
+BENCHMARKS = {}
+
+
+class BenchmarkRegression(frappe.ValidationError):
+    pass
+
+
+def benchmark(name, repeat=5, writes=False):
+    """
+    Register a hot-path benchmark. The function receives the dataset
+    context and runs the operation once. Benchmarks with writes=True run
+    inside a transaction that is rolled back after every iteration, with
+    commits and job enqueues held back, so the dataset stays fixed.
+    """
+    def decorator(fn):
+        BENCHMARKS[name] = frappe._dict(name=name, fn=fn, repeat=repeat, writes=writes)
+        return fn
+    return decorator
+
+
+@contextmanager
+def isolated_writes(counters):
+    """Hold back commits and background jobs, then roll everything back"""
+    db = frappe.db
+    original_commit = db.commit
+    original_enqueue = frappe.enqueue
+
+    def enqueue(method, *args, **kwargs):
+        counters["jobs_enqueued"] += 1
+
+    db.commit = lambda *args, **kwargs: None
+    frappe.enqueue = enqueue
+    try:
+        yield
+    finally:
+        db.commit = original_commit
+        frappe.enqueue = original_enqueue
+        db.rollback()
+
+
+def measure(case, context):
+    """Run one benchmark: a warm-up iteration, then case.repeat timed iterations"""
+    timings, queries, rows = [], [], []
+    counters = {"jobs_enqueued": 0}
+
+    for iteration in range(case.repeat + 1):
+        if case.writes:
+            with isolated_writes(counters), QueryCounter() as counter:
+                case.fn(context)
+        else:
+            with QueryCounter() as counter:
+                case.fn(context)
+
+        if iteration:
+            timings.append(counter.wall_time * 1000)
+            queries.append(counter.queries)
+            rows.append(counter.rows)
+
+    timings.sort()
+    return {
+        "median_ms": round(statistics.median(timings), 3),
+        "min_ms": round(timings[0], 3),
+        "p95_ms": round(timings[min(int(len(timings) * 0.95), len(timings) - 1)], 3),
+        "queries": int(statistics.median(queries)),
+        "rows": int(statistics.median(rows)),
+        "jobs_enqueued": counters["jobs_enqueued"] // (case.repeat + 1),
+        "repeat": case.repeat
+    }
+
+
+def ensure_dataset(scale):
+    """Seed the fixed benchmark dataset once per scale"""
+    from airplane_mode.synthetic_data import drop, generate, load_manifest
+
+    manifest = load_manifest(DATASET_PREFIX)
+    if manifest and manifest["plan"]["scale"] == scale:
+        return manifest["plan"]
+
+    if manifest:
+        drop(prefix=DATASET_PREFIX)
+
+    return generate(scale=scale, seed=DATASET_SEED, prefix=DATASET_PREFIX, anchor_date=DATASET_ANCHOR)["plan"]
+
+
+def get_context(plan):
+    """Representative documents from the benchmark dataset"""
+    prefix = plan["prefix"]
+    busiest_flight = frappe.db.get_value(
+        "Airplane Flight",
+        {"name": ["like", f"{prefix}-FL-%"], "status": "Completed"},
+        "name",
+        order_by="occupancy_count desc"
+    )
+    open_flight = frappe.db.get_value(
+        "Airplane Flight",
+        {"name": ["like", f"{prefix}-FL-%"], "status": "Scheduled"},
+        "name",
+        order_by="occupancy_count asc"
+    )
+
+    return frappe._dict({
+        "plan": plan,
+        "busiest_flight": busiest_flight,
+        "open_flight": open_flight,
+        "open_ticket": frappe.db.get_value("Airplane Ticket", {"flight": open_flight}, "name"),
+        "sample_ticket": frappe.db.get_value("Airplane Ticket", {"flight": busiest_flight}, "name"),
+        "lease": frappe.db.get_value("Shop Lease Contract", {"name": ["like", f"{prefix}-LEASE-%"], "status": "Active"}, "name")
+    })
+
+
+def get_results_dir():
+    return frappe.get_site_path("private", "benchmarks")
+
+
+def write_json(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(data, f, indent=1, default=str)
+
+
+def read_json(path):
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare(results, baseline, threshold=DEFAULT_THRESHOLD):
+    """
+    Regressions against the baseline: the median is slower by more than
+    threshold (and the noise floor), or the case issues more queries.
+    Query counts are deterministic on a fixed dataset, so any increase counts.
+    """
+    regressions = []
+    for name, current in results.items():
+        previous = (baseline or {}).get(name)
+        if not previous or "error" in current or "error" in previous:
+            continue
+
+        slower_ms = current["median_ms"] - previous["median_ms"]
+        if slower_ms > NOISE_FLOOR_MS and current["median_ms"] > previous["median_ms"] * (1 + threshold):
+            regressions.append({
+                "benchmark": name,
+                "metric": "median_ms",
+                "baseline": previous["median_ms"],
+                "current": current["median_ms"]
+            })
+
+        if current["queries"] > previous["queries"]:
+            regressions.append({
+                "benchmark": name,
+                "metric": "queries",
+                "baseline": previous["queries"],
+                "current": current["queries"]
+            })
+
+    return regressions
+
+
+def run(scale="tiny", only=None, threshold=DEFAULT_THRESHOLD, save_baseline=False, fail_on_regression=True):
+    """
+    Seed the benchmark dataset, time every registered hot path and compare
+    against the stored baseline.
+
+        bench --site <site> execute airplane_mode.benchmarks.run --kwargs "{'scale': 'small'}"
+
+    Results are written to private/benchmarks/<timestamp>.json and
+    latest.json; save_baseline=True also makes them the new baseline.
+    Raises BenchmarkRegression when a case regresses beyond threshold.
+    """
+    # Registers the benchmark cases
+    from airplane_mode.benchmarks import cases
+
+    if isinstance(only, str):
+        only = [name.strip() for name in only.split(",")]
+
+    frappe.set_user("Administrator")
+    plan = ensure_dataset(scale)
+    context = get_context(plan)
+
+    results = {}
+    for name, case in BENCHMARKS.items():
+        if only and not any(name.startswith(prefix) for prefix in only):
+            continue
+        try:
+            results[name] = measure(case, context)
+        except Exception as e:
+            frappe.db.rollback()
+            results[name] = {"error": str(e)}
+
+    baseline_path = os.path.join(get_results_dir(), f"baseline-{scale}.json")
+    baseline = read_json(baseline_path)
+    regressions = compare(results, baseline and baseline["results"], float(threshold))
+
+    report = {
+        "run_at": now_datetime(),
+        "scale": scale,
+        "dataset": plan,
+        "threshold": float(threshold),
+        "results": results,
+        "regressions": regressions
+    }
+
+    write_json(os.path.join(get_results_dir(), f"{now_datetime().strftime('%Y%m%d-%H%M%S')}-{scale}.json"), report)
+    write_json(os.path.join(get_results_dir(), "latest.json"), report)
+    if save_baseline or not baseline:
+        write_json(baseline_path, report)
+
+    print_report(report)
+
+    if regressions and fail_on_regression and baseline and not save_baseline:
+        raise BenchmarkRegression(
+            "Performance regression in: " + ", ".join(sorted({r["benchmark"] for r in regressions}))
+        )
+
+    return report
+
+
+def print_report(report):
+    print(f"{'benchmark':<36} {'median ms':>10} {'p95 ms':>10} {'queries':>8} {'rows':>8}")
+    for name, result in report["results"].items():
+        if "error" in result:
+            print(f"{name:<36} error: {result['error']}")
+        else:
+            print(f"{name:<36} {result['median_ms']:>10} {result['p95_ms']:>10} {result['queries']:>8} {result['rows']:>8}")
+
+    for regression in report["regressions"]:
+        print(f"REGRESSION {regression['benchmark']} {regression['metric']}: "
+              f"{regression['baseline']} -> {regression['current']}")
@@ -0,0 +1,153 @@
+import json
+
+import click
+import frappe
+from frappe.commands import get_site, pass_context
+
+
+@click.command("generate-synthetic-data")
+@click.option("--scale", default="small", type=click.Choice(["tiny", "small", "medium", "large"]), help="Dataset size preset")
+@click.option("--seed", default=42, type=int, help="Random seed; the same seed gives the same dataset")
+@click.option("--prefix", default="SYN", help="Name prefix for generated records")
+@click.option("--anchor-date", default=None, help="Date treated as today (YYYY-MM-DD)")
+@click.option("--workers", default=None, type=int, help="Parallel processes per dependency level")
+@click.option("--only", multiple=True, help="Generate only these tables, e.g. --only flights --only tickets")
+@click.option("--flights", default=None, type=int, help="Override the preset flight count")
+@click.option("--shops", default=None, type=int, help="Override the preset shop count")
+@click.option("--leads", default=None, type=int, help="Override the preset lead count")
+@click.option("--passengers", default=None, type=int, help="Override the preset passenger count")
+@pass_context
+def generate_synthetic_data(context, scale, seed, prefix, anchor_date, workers, only, flights, shops, leads,
+                            passengers):
+    """Bulk generate a seeded synthetic dataset for load tests and benchmarks"""
+    from airplane_mode.synthetic_data import generate
+
+    site = get_site(context)
+    frappe.init(site=site)
+    frappe.connect()
+    try:
+        result = generate(
+            scale=scale,
+            seed=seed,
+            prefix=prefix,
+            anchor_date=anchor_date,
+            workers=workers,
+            only=list(only) or None,
+            overrides={"flights": flights, "shops": shops, "leads": leads, "passengers": passengers}
+        )
+    finally:
+        frappe.destroy()
+
+    for row in result["results"]:
+        if row.get("skipped"):
+            click.echo(f"{row['doctype']:<22} skipped: {row['skipped']}")
+        else:
+            click.echo(f"{row['doctype']:<22} {row['rows']:>10} rows  {row['seconds']:>8}s  {row['rows_per_s']:>8} rows/s")
+
+
+@click.command("drop-synthetic-data")
+@click.option("--prefix", default="SYN", help="Name prefix used when generating")
+@pass_context
+def drop_synthetic_data(context, prefix):
+    """Delete a synthetic dataset generated with generate-synthetic-data"""
+    from airplane_mode.synthetic_data import drop
+
+    site = get_site(context)
+    frappe.init(site=site)
+    frappe.connect()
+    try:
+        click.echo(json.dumps(drop(prefix=prefix), indent=1))
+    finally:
+        frappe.destroy()
+
+
+@click.command("run-benchmarks")
+@click.option("--scale", default="tiny", type=click.Choice(["tiny", "small", "medium", "large"]), help="Benchmark dataset size")
+@click.option("--only", default=None, help="Comma separated benchmark name prefixes, e.g. ticket.,api.")
+@click.option("--threshold", default=0.2, type=float, help="Allowed slowdown of the median before failing")
+@click.option("--save-baseline", is_flag=True, default=False, help="Store this run as the new baseline")
+@pass_context
+def run_benchmarks(context, scale, only, threshold, save_baseline):
+    """Time the app's hot paths and fail on regressions against the baseline"""
+    from airplane_mode.benchmarks import run
+    from airplane_mode.benchmarks.runner import BenchmarkRegression
+
+    site = get_site(context)
+    frappe.init(site=site)
+    frappe.connect()
+    try:
+        run(scale=scale, only=only, threshold=threshold, save_baseline=save_baseline)
+    except BenchmarkRegression as e:
+        click.secho(str(e), fg="red")
+        raise SystemExit(1)
+    finally:
+        frappe.destroy()
+
+
+@click.command("check-hot-query-indexes")
+@click.option("--fix", is_flag=True, default=False, help="Create missing hot-path indexes before checking")
+@click.option("--benchmark", is_flag=True, default=False, help="Also time each query with and without its index")
+@click.option("--repeat", default=50, type=int, help="Runs per query when benchmarking")
+@pass_context
+def check_hot_query_indexes(context, fix, benchmark, repeat):
+    """EXPLAIN the app's hot queries and fail on full table scans"""
+    from airplane_mode.db_indexes import benchmark_hot_queries, ensure_hot_indexes, explain_hot_queries
+
+    site = get_site(context)
+    frappe.init(site=site)
+    frappe.connect()
+    try:
+        if fix:
+            ensure_hot_indexes(verbose=True)
+            frappe.db.commit()
+
+        report = explain_hot_queries()
+        timings = benchmark_hot_queries(repeat=repeat) if benchmark else []
+    finally:
+        frappe.destroy()
+
+    colors = {"ok": "green", "other index": "yellow", "full scan": "red", "error": "red"}
+    for entry in report:
+        detail = entry.get("error") or f"type={entry['type']} key={entry['key']} rows={entry['rows']}"
+        click.secho(f"{entry['status']:<12} {entry['query']:<38} {detail}", fg=colors[entry["status"]])
+
+    for entry in timings:
+        if entry.get("error"):
+            click.echo(f"{entry['query']:<38} {entry['error']}")
+        else:
+            click.echo(f"{entry['query']:<38} {entry['without_index_ms']:>9}ms -> {entry['with_index_ms']:>9}ms  x{entry['speedup']}")
+
+    if any(entry["status"] == "full scan" for entry in report):
+        raise SystemExit(1)
+
+
+@click.command("validate-crew-roster")
+@click.option("--from-date", required=True, help="First departure date of the season (YYYY-MM-DD)")
+@click.option("--to-date", required=True, help="Last departure date of the season (YYYY-MM-DD)")
+@click.option("--json", "as_json", is_flag=True, default=False, help="Print the full report as JSON")
+@pass_context
+def validate_crew_roster(context, from_date, to_date, as_json):
+    """List crew members booked on overlapping flights; exits 1 on any conflict"""
+    from airplane_mode.airplane_mode.crew_roster import validate_roster
+
+    site = get_site(context)
+    frappe.init(site=site)
+    frappe.connect()
+    try:
+        report = validate_roster(from_date, to_date)
+    finally:
+        frappe.destroy()
+
+    if as_json:
+        click.echo(json.dumps(report, indent=1))
+    else:
+        click.echo(f"{report['assignments']} assignments for {report['crew_members']} crew members, "
+                   f"{report['from_date']} to {report['to_date']}")
+        for conflict in report["conflicts"]:
+            click.secho(f"{conflict['crew_member']:<24} {conflict['flight']} overlaps {conflict['overlaps_with']}", fg="red")
+
+    if report["conflicts"]:
+        raise SystemExit(1)
+
+
+commands = [generate_synthetic_data, drop_synthetic_data, run_benchmarks, check_hot_query_indexes, validate_crew_roster]
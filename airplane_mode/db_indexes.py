@@ -0,0 +1,213 @@
+import time
+
+import frappe
+from frappe.utils import add_months, get_first_day, today
+
+
+# Composite indexes for the app's hot filter paths: index name -> (doctype, columns).
+# Frappe can only declare single-column indexes in doctype JSON, so these
+# are created by the add_hot_path_indexes patch and re-checked after migrate.
+HOT_INDEXES = {
+    "ticket_flight_status_index": ("Airplane Ticket", ["flight", "docstatus", "status"]),
+    "contract_invoice_due_index": ("Contract Shop", ["docstatus", "end_date", "next_invoice_date"]),
+    "sales_invoice_contract_index": ("Sales Invoice", ["custom_contract_shop", "posting_date"]),
+    "monthly_invoice_contract_index": ("Monthly Invoice", ["contract", "payment_status"]),
+    "shop_status_type_airport_index": ("Airport Shop", ["status", "shop_type", "airport"]),
+    "crew_member_flight_index": ("Flight Crew", ["crew_member", "parenttype", "parent"]),
+    # Created by add_shop_lead_dedupe_index; listed so it is checked like the others
+    "lead_dedupe_index": ("Shop Lead", ["email", "preferred_shop", "status"])
+}
+
+# The hot queries the indexes exist for. {hint} sits after the table name
+# so the benchmark can run each query with its index ignored.
+HOT_QUERIES = [
+    {
+        "name": "flight occupancy count",
+        "index": "ticket_flight_status_index",
+        "sql": """SELECT COUNT(*) FROM `tabAirplane Ticket` {hint}
+            WHERE flight = %(flight)s AND docstatus != 2""",
+        "sample": "SELECT flight FROM `tabAirplane Ticket` WHERE flight IS NOT NULL LIMIT 1"
+    },
+    {
+        "name": "gate sync tickets",
+        "index": "ticket_flight_status_index",
+        "sql": """SELECT name FROM `tabAirplane Ticket` {hint}
+            WHERE flight = %(flight)s AND docstatus IN (0, 1) AND status != 'Boarded'""",
+        "sample": "SELECT flight FROM `tabAirplane Ticket` WHERE flight IS NOT NULL LIMIT 1"
+    },
+    {
+        "name": "contracts due for invoicing",
+        "index": "contract_invoice_due_index",
+        "sql": """SELECT name, shop_name, monthly_rent FROM `tabContract Shop` {hint}
+            WHERE docstatus = 1 AND end_date >= %(today)s
+            AND (next_invoice_date <= %(today)s OR next_invoice_date IS NULL)"""
+    },
+    {
+        "name": "existing sales invoice for contract",
+        "index": "sales_invoice_contract_index",
+        "sql": """SELECT name FROM `tabSales Invoice` {hint}
+            WHERE custom_contract_shop = %(contract)s
+            AND posting_date >= %(month_start)s AND posting_date < %(next_month)s""",
+        "sample": "SELECT name AS contract FROM `tabContract Shop` LIMIT 1"
+    },
+    {
+        "name": "paid invoices for contract",
+        "index": "monthly_invoice_contract_index",
+        "sql": """SELECT name FROM `tabMonthly Invoice` {hint}
+            WHERE contract = %(contract)s AND payment_status = 'Paid'""",
+        "sample": "SELECT contract FROM `tabMonthly Invoice` WHERE contract IS NOT NULL LIMIT 1"
+    },
+    {
+        "name": "available shops by type and airport",
+        "index": "shop_status_type_airport_index",
+        "sql": """SELECT name, shop_name, rent_per_month FROM `tabAirport Shop` {hint}
+            WHERE status = 'Available' AND shop_type = %(shop_type)s AND airport = %(airport)s""",
+        "sample": "SELECT shop_type, airport FROM `tabAirport Shop` LIMIT 1"
+    },
+    {
+        "name": "crew roster assignments",
+        "index": "crew_member_flight_index",
+        "sql": """SELECT parent FROM `tabFlight Crew` {hint}
+            WHERE crew_member = %(crew_member)s AND parenttype = 'Airplane Flight'""",
+        "sample": "SELECT crew_member FROM `tabFlight Crew` WHERE crew_member IS NOT NULL LIMIT 1"
+    },
+    {
+        "name": "duplicate lead lookup",
+        "index": "lead_dedupe_index",
+        "sql": """SELECT name FROM `tabShop Lead` {hint}
+            WHERE email = %(email)s AND preferred_shop = %(shop)s AND status IN ('Open', 'Contacted', 'Interested')""",
+        "sample": "SELECT email, preferred_shop AS shop FROM `tabShop Lead` LIMIT 1"
+    }
+]
+
+DEFAULT_PARAMS = {
+    "flight": "",
+    "contract": "",
+    "shop_type": "",
+    "airport": "",
+    "email": "",
+    "shop": "",
+    "crew_member": ""
+}
+
+
+def get_missing_columns(doctype, columns):
+    if not frappe.db.table_exists(doctype):
+        return list(columns)
+    return [column for column in columns if not frappe.db.has_column(doctype, column)]
+
+
+def ensure_hot_indexes(verbose=False):
+    """
+    Create any missing hot-path index. Idempotent: add_index skips indexes
+    that already exist, and indexes on tables or columns that are not on
+    this site yet (e.g. Sales Invoice without ERPNext) are reported and skipped.
+    """
+    results = {}
+    for index_name, (doctype, columns) in HOT_INDEXES.items():
+        missing = get_missing_columns(doctype, columns)
+        if missing:
+            results[index_name] = f"skipped, missing {', '.join(missing)}"
+        else:
+            frappe.db.add_index(doctype, columns, index_name=index_name)
+            results[index_name] = "ok"
+
+        if verbose:
+            print(f"{index_name:<34} {doctype:<18} {results[index_name]}")
+
+    return results
+
+
+def get_query_params(query):
+    params = dict(DEFAULT_PARAMS)
+    month_start = get_first_day(today())
+    params.update({"today": today(), "month_start": month_start, "next_month": add_months(month_start, 1)})
+
+    if query.get("sample"):
+        try:
+            rows = frappe.db.sql(query["sample"], as_dict=True)
+        except Exception:
+            rows = []
+        if rows:
+            params.update({key: value for key, value in rows[0].items() if value is not None})
+
+    return params
+
+
+def get_index_table(index_name):
+    return f"tab{HOT_INDEXES[index_name][0]}"
+
+
+def explain_hot_queries():
+    """
+    EXPLAIN every hot query and flag full table scans (type ALL) and plans
+    that do not use the index the query is meant to use.
+    """
+    report = []
+    for query in HOT_QUERIES:
+        index_name = query["index"]
+        table = get_index_table(index_name)
+        entry = {"query": query["name"], "table": table, "expected_index": index_name}
+
+        try:
+            plan = frappe.db.sql(f"EXPLAIN {query['sql'].format(hint='')}", get_query_params(query), as_dict=True)
+        except Exception as e:
+            entry.update({"status": "error", "error": str(e).splitlines()[0]})
+            report.append(entry)
+            continue
+
+        row = next((row for row in plan if row.get("table") in (table, table.lower())), plan[0] if plan else {})
+        entry.update({
+            "type": row.get("type"),
+            "key": row.get("key"),
+            "rows": row.get("rows"),
+            "extra": row.get("Extra")
+        })
+
+        if row.get("type") == "ALL":
+            entry["status"] = "full scan"
+        elif row.get("key") != index_name:
+            entry["status"] = "other index"
+        else:
+            entry["status"] = "ok"
+        report.append(entry)
+
+    return report
+
+
+def benchmark_hot_queries(repeat=50):
+    """
+    Time every hot query with its index and with the index ignored
+    (IGNORE INDEX), which gives the before/after without dropping anything.
+    """
+    results = []
+    for query in HOT_QUERIES:
+        index_name = query["index"]
+        params = get_query_params(query)
+        entry = {"query": query["name"], "index": index_name}
+
+        try:
+            entry["without_index_ms"] = time_query(query["sql"].format(hint=f"IGNORE INDEX (`{index_name}`)"), params, repeat)
+            entry["with_index_ms"] = time_query(query["sql"].format(hint=""), params, repeat)
+        except Exception as e:
+            entry["error"] = str(e).splitlines()[0]
+            results.append(entry)
+            continue
+
+        with_index = entry["with_index_ms"]
+        entry["speedup"] = round(entry["without_index_ms"] / with_index, 1) if with_index else None
+        results.append(entry)
+
+    return results
+
+
+def time_query(sql, params, repeat):
+    frappe.db.sql(sql, params)
+    timings = []
+    for _ in range(int(repeat)):
+        started = time.perf_counter()
+        frappe.db.sql(sql, params)
+        timings.append(time.perf_counter() - started)
+
+    timings.sort()
+    return round(timings[len(timings) // 2] * 1000, 3)
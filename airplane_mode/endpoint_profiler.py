@@ -0,0 +1,156 @@
+import json
+import time
+from functools import wraps
+
+import frappe
+
+from airplane_mode.instrumentation import QueryCounter
+
+
+RING_SIZE = 500
+SAMPLES_KEY = "airplane_mode_endpoint_samples"
+INDEX_KEY = "airplane_mode_endpoint_index"
+ENABLED_KEY = "airplane_mode_endpoint_profiling"
+DEFAULT_SLOW_MS = 1000
+
+
+def is_profiling_enabled():
+    """
+    Profiling is opt-in: on when site config sets airplane_mode_endpoint_profiling
+    or an admin switched it on with set_endpoint_profiling. Resolved once per request.
+    """
+    enabled = getattr(frappe.local, "airplane_mode_profiling_enabled", None)
+    if enabled is None:
+        enabled = bool(frappe.conf.get(ENABLED_KEY) or frappe.cache().get_value(ENABLED_KEY))
+        frappe.local.airplane_mode_profiling_enabled = enabled
+    return enabled
+
+
+def profile_endpoint(fn):
+    """
+    Record query count, DB time, rows and wall time for each call of a
+    whitelisted method. Apply below @frappe.whitelist() so the profiled
+    wrapper is the function that gets whitelisted.
+    """
+    method = f"{fn.__module__}.{fn.__qualname__}"
+
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        if not is_profiling_enabled():
+            return fn(*args, **kwargs)
+
+        failed = False
+        counter = QueryCounter()
+        try:
+            with counter:
+                return fn(*args, **kwargs)
+        except Exception:
+            failed = True
+            raise
+        finally:
+            record_sample(method, counter, failed)
+
+    return wrapper
+
+
+def record_sample(method, counter, failed=False):
+    sample = {
+        "ts": round(time.time(), 3),
+        "ms": round(counter.wall_time * 1000, 3),
+        "db_ms": round(counter.db_time * 1000, 3),
+        "queries": counter.queries,
+        "rows": counter.rows,
+        "failed": failed
+    }
+
+    try:
+        cache = frappe.cache()
+        key = get_samples_key(method)
+        cache.lpush(key, json.dumps(sample))
+        cache.ltrim(key, 0, RING_SIZE - 1)
+        cache.hset(INDEX_KEY, method, sample["ts"])
+    except Exception:
+        # Profiling must never break the endpoint it observes
+        return
+
+    slow_ms = frappe.conf.get("airplane_mode_slow_endpoint_ms") or DEFAULT_SLOW_MS
+    if sample["ms"] >= slow_ms:
+        frappe.logger("airplane_mode.slow_endpoints").warning(dict(sample, method=method, user=frappe.session.user))
+
+
+def get_samples_key(method):
+    return f"{SAMPLES_KEY}:{method}"
+
+
+def get_samples(method):
+    entries = frappe.cache().lrange(get_samples_key(method), 0, RING_SIZE - 1) or []
+    return [json.loads(entry) for entry in entries]
+
+
+def percentile(values, p):
+    """Nearest-rank percentile of an already sorted list"""
+    if not values:
+        return 0
+    index = max(int(round(p / 100 * len(values) + 0.5)) - 1, 0)
+    return values[min(index, len(values) - 1)]
+
+
+def summarize(method, samples):
+    summary = {"method": method, "calls": len(samples), "failed": sum(1 for s in samples if s["failed"])}
+    for metric in ("ms", "db_ms", "queries", "rows"):
+        values = sorted(s[metric] for s in samples)
+        summary[metric] = {
+            "p50": percentile(values, 50),
+            "p95": percentile(values, 95),
+            "p99": percentile(values, 99),
+            "max": values[-1] if values else 0
+        }
+    summary["last_call"] = max((s["ts"] for s in samples), default=None)
+    return summary
+
+
+@frappe.whitelist()
+def get_endpoint_profiles(sort_by="queries"):
+    """Percentile summaries for every profiled endpoint, heaviest first"""
+    frappe.only_for("System Manager")
+
+    methods = frappe.cache().hgetall(INDEX_KEY) or {}
+    summaries = [summarize(frappe.safe_decode(method), get_samples(frappe.safe_decode(method))) for method in methods]
+
+    if sort_by not in ("ms", "db_ms", "queries", "rows"):
+        sort_by = "queries"
+    summaries.sort(key=lambda summary: summary[sort_by]["p95"], reverse=True)
+
+    return {
+        "enabled": is_profiling_enabled(),
+        "ring_size": RING_SIZE,
+        "endpoints": summaries
+    }
+
+
+@frappe.whitelist()
+def get_endpoint_samples(method):
+    """Raw samples for one endpoint, newest first"""
+    frappe.only_for("System Manager")
+    return get_samples(method)
+
+
+@frappe.whitelist()
+def set_endpoint_profiling(enabled):
+    frappe.only_for("System Manager")
+
+    enabled = frappe.utils.cint(enabled)
+    frappe.cache().set_value(ENABLED_KEY, enabled)
+    frappe.local.airplane_mode_profiling_enabled = bool(enabled)
+    return {"enabled": bool(enabled)}
+
+
+@frappe.whitelist()
+def reset_endpoint_profiles():
+    frappe.only_for("System Manager")
+
+    cache = frappe.cache()
+    for method in cache.hgetall(INDEX_KEY) or {}:
+        cache.delete_value(get_samples_key(frappe.safe_decode(method)))
+    cache.delete_value(INDEX_KEY)
+    return {"status": "success"}
@@ -43,7 +43,31 @@ doctype_js = {
 # Document Events
 doc_events = {
     "Airplane Flight": {
-        "on_update": "airplane_mode.airplane_mode.doctype.airplane_flight.airplane_flight.sync_gate_to_tickets"
+        "on_update": [
+            "airplane_mode.airplane_mode.doctype.airplane_flight.airplane_flight.sync_gate_to_tickets",
+            "airplane_mode.airplane_mode.departures_board.update_flight",
+            "airplane_mode.airplane_mode.flight_page_cache.invalidate_flight_page",
+            "airplane_mode.airplane_mode.crew_roster.invalidate_flight_crew"
+        ],
+        "on_update_after_submit": [
+            "airplane_mode.airplane_mode.departures_board.update_flight",
+            "airplane_mode.airplane_mode.flight_page_cache.invalidate_flight_page",
+            "airplane_mode.airplane_mode.crew_roster.invalidate_flight_crew"
+        ],
+        "on_submit": [
+            "airplane_mode.airplane_mode.departures_board.update_flight",
+            "airplane_mode.airplane_mode.flight_page_cache.invalidate_flight_page"
+        ],
+        "on_cancel": [
+            "airplane_mode.airplane_mode.departures_board.update_flight",
+            "airplane_mode.airplane_mode.flight_page_cache.invalidate_flight_page",
+            "airplane_mode.airplane_mode.crew_roster.invalidate_flight_crew"
+        ],
+        "on_trash": [
+            "airplane_mode.airplane_mode.departures_board.update_flight",
+            "airplane_mode.airplane_mode.flight_page_cache.invalidate_flight_page",
+            "airplane_mode.airplane_mode.crew_roster.invalidate_flight_crew"
+        ]
     },
     "Airplane Ticket": {
         "after_insert": "airplane_mode.airplane_mode.doctype.airplane_flight.airplane_flight.update_flight_occupancy",
@@ -53,7 +77,11 @@ doc_events = {
     },
     "Contract Shop": {
         "on_submit": "airplane_mode.airport_shop_management.doctype.contract_shop.contract_shop.create_invoice",
-        "validate": "airplane_mode.airport_shop_management.doctype.contract_shop.contract_shop.validate_contract"
+        "validate": "airplane_mode.airport_shop_management.doctype.contract_shop.contract_shop.validate_contract",
+        "on_update": "airplane_mode.airport_stats.invalidate_stats",
+        "on_update_after_submit": "airplane_mode.airport_stats.invalidate_stats",
+        "on_cancel": "airplane_mode.airport_stats.invalidate_stats",
+        "on_trash": "airplane_mode.airport_stats.invalidate_stats"
     },
     "Monthly Invoice": {
         "on_submit": "airplane_mode.airport_shop_management.doctype.monthly_invoice.monthly_invoice.update_payment_status"
@@ -68,17 +96,65 @@ doc_events = {
         "on_submit": "airplane_mode.airplane_mode.doctype.contract_shop.contract_shop.update_contract_payment_status"
     },
     "Shop Lead": {
-        "after_insert": "airplane_mode.airport_shop_management.lead_notifications.send_lead_notifications"
+        "after_insert": "airplane_mode.airport_shop_management.lead_notifications.send_lead_notifications",
+        "on_update": "airplane_mode.airport_stats.invalidate_stats",
+        "on_trash": "airplane_mode.airport_stats.invalidate_stats"
+    },
+    "Airport Shop": {
+        "on_update": [
+            "airplane_mode.airport_shop_management.shop_search.on_shop_update",
+            "airplane_mode.airport_stats.invalidate_stats"
+        ],
+        "on_trash": [
+            "airplane_mode.airport_shop_management.shop_search.on_shop_trash",
+            "airplane_mode.airport_stats.invalidate_stats"
+        ],
+        "after_rename": "airplane_mode.airport_shop_management.shop_search.on_shop_rename"
+    },
+    "Shop Type": {
+        "on_update": "airplane_mode.reference_cache.invalidate_reference",
+        "on_trash": "airplane_mode.reference_cache.invalidate_reference",
+        "after_rename": "airplane_mode.reference_cache.invalidate_reference"
+    },
+    "Airport": {
+        "on_update": "airplane_mode.reference_cache.invalidate_reference",
+        "on_trash": "airplane_mode.reference_cache.invalidate_reference",
+        "after_rename": "airplane_mode.reference_cache.invalidate_reference"
+    },
+    "Airline": {
+        "on_update": "airplane_mode.reference_cache.invalidate_reference",
+        "on_trash": "airplane_mode.reference_cache.invalidate_reference",
+        "after_rename": "airplane_mode.reference_cache.invalidate_reference"
+    },
+    "Airplane": {
+        "on_update": "airplane_mode.reference_cache.invalidate_reference",
+        "on_trash": "airplane_mode.reference_cache.invalidate_reference",
+        "after_rename": "airplane_mode.reference_cache.invalidate_reference"
+    },
+    "Airport Shop Settings": {
+        "on_update": "airplane_mode.reference_cache.invalidate_reference",
+        "on_trash": "airplane_mode.reference_cache.invalidate_reference",
+        "after_rename": "airplane_mode.reference_cache.invalidate_reference"
     }
 }
 
 # Scheduled Tasks
 scheduler_events = {
+    "all": [
+        "airplane_mode.job_telemetry.flush_job_runs"
+    ],
+    "hourly": [
+        "airplane_mode.airplane_mode.departures_board.rebuild_board"
+    ],
     "daily": [
         "airplane_mode.airport_shop_management.rent_reminder.send_rent_reminders",
         "airplane_mode.airport_shop_management.rent_collection.process_monthly_invoices",
         "airplane_mode.airport_shop_management.doctype.rent_remainder_alerts.rent_remainder_alerts.check_rent_due_alerts",
-        "airplane_mode.airplane_mode.doctype.airplane_flight.airplane_flight.recalculate_all_flight_occupancy"
+        "airplane_mode.airplane_mode.doctype.airplane_flight.airplane_flight.recalculate_all_flight_occupancy",
+        "airplane_mode.airport_shop_management.shop_search.rebuild_search_index",
+        "airplane_mode.airport_shop_management.contract_sweeper.sweep_contracts",
+        "airplane_mode.airplane_mode.booking_curves.record_booking_curves",
+        "airplane_mode.airplane_mode.flight_page_cache.warm_flight_pages"
     ],
     "weekly": [
         "airplane_mode.airplane_mode.report_automation.send_weekly_reports"
@@ -88,6 +164,11 @@ scheduler_events = {
     ]
 }
 
+# Guest HTML cache for /flights and the flight pages
+page_renderer = [
+    "airplane_mode.airplane_mode.flight_page_cache.FlightPageRenderer"
+]
+
 # Website Routes - Updated for proper route handling
 website_route_rules = [
     {"from_route": "/shop-portal", "to_route": "shop-portal"},
@@ -141,6 +222,16 @@ jinja = {
 # Boot Session - FIXED: Changed to list format
 boot_session = ["airplane_mode.utils.boot_session"]
 
+# Request Hooks
+after_request = ["airplane_mode.permission_context.log_permission_stats"]
+
+# Job Hooks
+before_job = ["airplane_mode.job_telemetry.before_job"]
+after_job = ["airplane_mode.job_telemetry.after_job"]
+
+# Migration Hooks
+after_migrate = ["airplane_mode.db_indexes.ensure_hot_indexes"]
+
 # User Data Protection
 user_data_fields = [
     {
@@ -159,7 +250,9 @@ default_log_clearing_doctypes = {
     "Shop Lead": 90,  # 3 months
     "Contract Shop": 365,  # 1 year
     "Monthly Invoice": 365,  # 1 year
-    "Rent Remainder Alerts": 180  # 6 months
+    "Rent Remainder Alerts": 180,  # 6 months
+    "Job Run Log": 90,  # 3 months
+    "Boarding Scan": 90  # 3 months
 }
 
 # Website Theme
@@ -0,0 +1,63 @@
+import time
+
+import frappe
+
+
+class QueryCounter:
+    """
+    Count queries, rows and database time issued through frappe.db.sql
+    while the block is active. Counters can be nested; each one sees
+    every query run inside it.
+
+        with QueryCounter() as counter:
+            frappe.get_all("Airport Shop")
+        counter.queries, counter.db_time
+    """
+
+    def __init__(self):
+        self.queries = 0
+        self.rows = 0
+        self.db_time = 0.0
+        self.wall_time = 0.0
+        self._db = None
+        self._original_sql = None
+        self._started = None
+
+    def __enter__(self):
+        self._db = frappe.db
+        self._started = time.perf_counter()
+
+        if self._db is not None:
+            self._original_sql = self._db.sql
+            self._db.sql = self._counted_sql
+
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.wall_time = time.perf_counter() - self._started
+
+        if self._db is not None:
+            self._db.sql = self._original_sql
+
+        return False
+
+    def _counted_sql(self, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            result = self._original_sql(*args, **kwargs)
+        finally:
+            self.db_time += time.perf_counter() - started
+            self.queries += 1
+
+        if isinstance(result, (list, tuple)):
+            self.rows += len(result)
+
+        return result
+
+    def as_dict(self):
+        return {
+            "queries": self.queries,
+            "rows": self.rows,
+            "db_time_ms": round(self.db_time * 1000, 3),
+            "wall_time_ms": round(self.wall_time * 1000, 3)
+        }
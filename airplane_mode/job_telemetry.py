@@ -0,0 +1,270 @@
+import json
+import sys
+import time
+
+import frappe
+from frappe.utils import add_days, cint, flt, get_datetime, now_datetime
+
+from airplane_mode.instrumentation import QueryCounter
+
+
+JOB_RUN_DOCTYPE = "Job Run Log"
+BUFFER_KEY = "airplane_mode_job_run_buffer"
+FLUSH_BATCH_SIZE = 500
+SCHEDULED_JOB_RUNNER = "frappe.core.doctype.scheduled_job_type.scheduled_job_type.run_scheduled_job"
+FLUSH_METHOD = "airplane_mode.job_telemetry.flush_job_runs"
+FREQUENCY_ORDER = ("Daily", "Weekly", "Monthly", "Hourly", "All", "Cron")
+JOB_RUN_FIELDS = (
+    "job_name", "method", "frequency", "status", "started_at", "ended_at", "duration_ms",
+    "rows_processed", "failures", "throughput", "queries", "db_time_ms", "error"
+)
+
+
+class JobRun:
+    """
+    Telemetry for one scheduled job run. Started by the before_job hook,
+    fed by the job through record_progress and finished by after_job.
+    """
+
+    def __init__(self, method, frequency):
+        self.method = method
+        self.frequency = frequency
+        self.started_at = now_datetime()
+        self.started = time.perf_counter()
+        self.rows = 0
+        self.failures = 0
+        self.errors = []
+        self.counter = QueryCounter().__enter__()
+
+    def finish(self, error=None):
+        self.counter.__exit__(None, None, None)
+        duration = time.perf_counter() - self.started
+
+        if error:
+            self.errors.append(error)
+        status = "Failed" if error else ("Partial" if self.failures else "Success")
+
+        return {
+            "job_name": self.method.rsplit(".", 1)[-1],
+            "method": self.method,
+            "frequency": self.frequency,
+            "status": status,
+            "started_at": str(self.started_at),
+            "ended_at": str(now_datetime()),
+            "duration_ms": round(duration * 1000, 3),
+            "rows_processed": self.rows,
+            "failures": self.failures,
+            "throughput": round(self.rows / duration, 3) if duration else 0,
+            "queries": self.counter.queries,
+            "db_time_ms": round(self.counter.db_time * 1000, 3),
+            "error": "\n".join(self.errors)[:10000] or None
+        }
+
+
+def get_scheduled_jobs():
+    """Map each of this app's scheduler_events methods to its frequency"""
+    jobs = {}
+    for event, methods in frappe.get_hooks("scheduler_events", app_name="airplane_mode").items():
+        if event == "cron":
+            for cron_methods in methods.values():
+                jobs.update((method, "Cron") for method in cron_methods)
+            continue
+
+        frequency = event.replace("_long", "").title()
+        jobs.update((method, frequency) for method in methods)
+
+    jobs.pop(FLUSH_METHOD, None)
+    return jobs
+
+
+def resolve_job(method, kwargs):
+    """Scheduled jobs run through frappe's runner; the real method is its job_type"""
+    if method == SCHEDULED_JOB_RUNNER:
+        method = (kwargs or {}).get("job_type")
+    return method
+
+
+def get_current_run():
+    return getattr(frappe.local, "airplane_mode_job_run", None)
+
+
+def before_job(method=None, kwargs=None, transaction_type=None):
+    """before_job hook: start telemetry for this app's scheduled jobs"""
+    method = resolve_job(method, kwargs)
+    frequency = get_scheduled_jobs().get(method)
+    frappe.local.airplane_mode_job_run = JobRun(method, frequency) if frequency else None
+
+
+def after_job(method=None, kwargs=None, result=None):
+    """after_job hook: finish the run and buffer it for the next flush"""
+    run = get_current_run()
+    if not run:
+        return
+    frappe.local.airplane_mode_job_run = None
+
+    try:
+        error = get_job_error(run, method)
+        buffer_job_run(run.finish(error))
+    except Exception:
+        # Telemetry must never fail the job it observes
+        pass
+
+
+def get_job_error(run, method):
+    exc_type, exc_value = sys.exc_info()[:2]
+    if exc_type:
+        return f"{exc_type.__name__}: {exc_value}"
+
+    if method != SCHEDULED_JOB_RUNNER:
+        return None
+
+    # The scheduled job runner swallows exceptions and records them on its own log
+    job_type = frappe.db.get_value("Scheduled Job Type", {"method": run.method}, "name")
+    log = frappe.db.get_value(
+        "Scheduled Job Log",
+        {"scheduled_job_type": job_type, "creation": [">=", run.started_at]},
+        ["status", "details"],
+        order_by="creation desc",
+        as_dict=True
+    ) if job_type else None
+
+    if log and log.status == "Failed":
+        return log.details or "Failed"
+    return None
+
+
+def record_progress(rows=0, failures=0, error=None):
+    """
+    Report work done by the running scheduled job. A no-op when the
+    caller is not running as a scheduled job, e.g. from the desk.
+    """
+    run = get_current_run()
+    if not run:
+        return
+
+    run.rows += cint(rows)
+    run.failures += cint(failures)
+    if error:
+        run.errors.append(str(error))
+
+
+def buffer_job_run(entry):
+    frappe.cache().lpush(BUFFER_KEY, json.dumps(entry, default=str))
+    frappe.logger("airplane_mode.jobs").info(entry)
+
+
+def flush_job_runs():
+    """
+    Move buffered runs into Job Run Log with one bulk insert per batch.
+    Runs on the scheduler's "all" tick, so finished jobs never touch the
+    table themselves.
+    """
+    cache = frappe.cache()
+    flushed = 0
+
+    while True:
+        entries = []
+        for _ in range(FLUSH_BATCH_SIZE):
+            entry = cache.rpop(BUFFER_KEY)
+            if entry is None:
+                break
+            entries.append(json.loads(entry))
+
+        if not entries:
+            break
+
+        try:
+            insert_job_runs(entries)
+            frappe.db.commit()
+        except Exception:
+            frappe.db.rollback()
+            # Put the batch back so the next tick retries it
+            for entry in reversed(entries):
+                cache.rpush(BUFFER_KEY, json.dumps(entry, default=str))
+            frappe.log_error(frappe.get_traceback(), "Job Telemetry Flush Error")
+            break
+
+        flushed += len(entries)
+
+    return flushed
+
+
+def insert_job_runs(entries):
+    now = now_datetime()
+    user = frappe.session.user
+    fields = ["name", "creation", "modified", "owner", "modified_by", "docstatus", *JOB_RUN_FIELDS]
+
+    values = [
+        (frappe.generate_hash(length=10), now, now, user, user, 0, *(entry.get(field) for field in JOB_RUN_FIELDS))
+        for entry in entries
+    ]
+    frappe.db.bulk_insert(JOB_RUN_DOCTYPE, fields, values)
+
+
+def summarize_runs(runs):
+    durations = sorted(flt(run.duration_ms) for run in runs)
+    finished = [run for run in runs if run.status != "Failed"]
+    last = runs[-1] if runs else None
+
+    return {
+        "runs": len(runs),
+        "failed_runs": sum(1 for run in runs if run.status == "Failed"),
+        "failures": sum(cint(run.failures) for run in runs),
+        "rows": sum(cint(run.rows_processed) for run in runs),
+        "avg_ms": round(sum(durations) / len(durations), 3) if durations else 0,
+        "p95_ms": durations[min(int(len(durations) * 0.95), len(durations) - 1)] if durations else 0,
+        "avg_throughput": round(sum(flt(run.throughput) for run in finished) / len(finished), 3) if finished else 0,
+        "last_status": last.status if last else None,
+        "last_run": str(last.started_at) if last else None
+    }
+
+
+@frappe.whitelist()
+def get_job_summary(days=90):
+    """Per-job run history and summary for the Job Telemetry page"""
+    frappe.only_for("System Manager")
+
+    since = add_days(now_datetime(), -cint(days or 90))
+    runs = frappe.get_all(
+        JOB_RUN_DOCTYPE,
+        filters={"started_at": [">=", since]},
+        fields=["method", "status", "started_at", "duration_ms", "rows_processed", "failures", "throughput", "queries"],
+        order_by="started_at asc"
+    )
+
+    by_method = {}
+    for run in runs:
+        by_method.setdefault(run.method, []).append(run)
+
+    scheduled = get_scheduled_jobs()
+    jobs = []
+    for method in sorted(set(scheduled) | set(by_method)):
+        method_runs = by_method.get(method, [])
+        jobs.append({
+            "method": method,
+            "job_name": method.rsplit(".", 1)[-1],
+            "frequency": scheduled.get(method) or "Removed",
+            "summary": summarize_runs(method_runs),
+            "history": [
+                {
+                    "started_at": str(get_datetime(run.started_at)),
+                    "status": run.status,
+                    "duration_s": round(flt(run.duration_ms) / 1000, 3),
+                    "rows": cint(run.rows_processed),
+                    "throughput": flt(run.throughput),
+                    "queries": cint(run.queries)
+                }
+                for run in method_runs
+            ]
+        })
+
+    jobs.sort(key=lambda job: (
+        FREQUENCY_ORDER.index(job["frequency"]) if job["frequency"] in FREQUENCY_ORDER else len(FREQUENCY_ORDER),
+        job["method"]
+    ))
+
+    return {
+        "days": cint(days or 90),
+        "buffered": frappe.cache().llen(BUFFER_KEY) or 0,
+        "jobs": jobs
+    }
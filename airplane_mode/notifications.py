@@ -107,7 +107,8 @@ def has_permission(doc, ptype="read", user=None):
         return True
         
     # Check role-based permissions
-    user_roles = frappe.get_roles(user)
+    from airplane_mode.permission_context import get_permission_context
+    user_roles = get_permission_context(user).roles
     
     if "Airport Manager" in user_roles:
         return True
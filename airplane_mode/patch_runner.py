@@ -0,0 +1,165 @@
+import time
+
+import frappe
+from frappe.utils import cint, now_datetime
+
+
+CHECKPOINT_TABLE = "__airplane_mode_patch_checkpoint"
+DEFAULT_CHUNK_SIZE = 2000
+
+
+class BatchedPatch:
+    """
+    Run a data patch in chunks, committing and checkpointing after each one,
+    so a patch interrupted by a timeout resumes where it stopped.
+
+        patch = BatchedPatch("populate_seats", get_keys=get_unseated_flights)
+        patch.run(assign_seats)
+
+    get_keys(last_key, limit) returns the next sorted batch of keys after
+    last_key (by default names of `doctype`). process_chunk(keys) does the
+    work for the whole batch with set-based SQL and returns the number of
+    rows it changed. Keys must be unique and sortable; the checkpoint stores
+    the last key of each finished chunk.
+    """
+
+    def __init__(self, name, doctype=None, get_keys=None, count=None, chunk_size=DEFAULT_CHUNK_SIZE):
+        if not (doctype or get_keys):
+            frappe.throw("BatchedPatch needs a doctype or a get_keys function")
+
+        self.name = name
+        self.doctype = doctype
+        self.get_keys = get_keys or self.get_doctype_keys
+        self.count = count
+        self.chunk_size = cint(chunk_size) or DEFAULT_CHUNK_SIZE
+
+    def get_doctype_keys(self, last_key, limit):
+        return frappe.db.sql_list(
+            f"""SELECT name FROM `tab{self.doctype}`
+            WHERE name > %(last_key)s
+            ORDER BY name
+            LIMIT %(limit)s""",
+            {"last_key": last_key or "", "limit": limit}
+        )
+
+    def get_total(self):
+        if callable(self.count):
+            return cint(self.count())
+        if self.doctype:
+            return frappe.db.count(self.doctype)
+        return None
+
+    def run(self, process_chunk):
+        ensure_checkpoint_table()
+        checkpoint = get_checkpoint(self.name)
+
+        if checkpoint and checkpoint.status == "Completed":
+            print(f"{self.name}: already completed, skipping")
+            return checkpoint
+
+        if checkpoint:
+            print(f"{self.name}: resuming after {checkpoint.last_key!r} ({checkpoint.rows_done} rows done)")
+        else:
+            checkpoint = start_checkpoint(self.name)
+
+        total = self.get_total()
+        started = time.perf_counter()
+        keys_done = 0
+
+        while True:
+            keys = self.get_keys(checkpoint.last_key, self.chunk_size)
+            if not keys:
+                break
+
+            chunk_started = time.perf_counter()
+            changed = cint(process_chunk(keys))
+
+            checkpoint.last_key = keys[-1]
+            checkpoint.rows_done += changed
+            checkpoint.chunks_done += 1
+            save_checkpoint(checkpoint)
+            frappe.db.commit()
+
+            keys_done += len(keys)
+            self.report_progress(checkpoint, keys_done, total, started, time.perf_counter() - chunk_started)
+
+            if len(keys) < self.chunk_size:
+                break
+
+        checkpoint.status = "Completed"
+        save_checkpoint(checkpoint)
+        frappe.db.commit()
+
+        elapsed = time.perf_counter() - started
+        print(f"{self.name}: completed, {checkpoint.rows_done} rows in {checkpoint.chunks_done} chunks ({elapsed:.1f}s this run)")
+        return checkpoint
+
+    def report_progress(self, checkpoint, keys_done, total, started, chunk_time):
+        elapsed = time.perf_counter() - started
+        rate = keys_done / elapsed if elapsed else 0
+        message = f"{self.name}: chunk {checkpoint.chunks_done}, {keys_done} keys this run, {checkpoint.rows_done} rows changed"
+
+        if total:
+            remaining = max(total - keys_done, 0)
+            eta = remaining / rate if rate else 0
+            message += f" ({min(keys_done / total, 1):.0%} of ~{total}, eta {eta:.0f}s)"
+
+        print(f"{message}, {chunk_time * 1000:.0f}ms")
+        frappe.logger("airplane_mode.patches").info({
+            "patch": self.name,
+            "chunk": checkpoint.chunks_done,
+            "last_key": checkpoint.last_key,
+            "rows_done": checkpoint.rows_done,
+            "chunk_ms": round(chunk_time * 1000, 3),
+            "keys_per_s": round(rate, 1)
+        })
+
+
+def ensure_checkpoint_table():
+    # Patches run before doctypes are synced, so checkpoints live in a plain table
+    frappe.db.sql_ddl(f"""CREATE TABLE IF NOT EXISTS `{CHECKPOINT_TABLE}` (
+        `patch` VARCHAR(140) NOT NULL PRIMARY KEY,
+        `last_key` VARCHAR(140),
+        `rows_done` BIGINT NOT NULL DEFAULT 0,
+        `chunks_done` INT NOT NULL DEFAULT 0,
+        `status` VARCHAR(20) NOT NULL DEFAULT 'Running',
+        `started_at` DATETIME(6),
+        `updated_at` DATETIME(6)
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci""")
+
+
+def get_checkpoint(name):
+    rows = frappe.db.sql(
+        f"SELECT patch, last_key, rows_done, chunks_done, status FROM `{CHECKPOINT_TABLE}` WHERE patch = %s",
+        name,
+        as_dict=True
+    )
+    return rows[0] if rows else None
+
+
+def start_checkpoint(name):
+    checkpoint = frappe._dict(patch=name, last_key=None, rows_done=0, chunks_done=0, status="Running")
+    frappe.db.sql(
+        f"""INSERT INTO `{CHECKPOINT_TABLE}` (patch, status, started_at, updated_at)
+        VALUES (%(patch)s, 'Running', %(now)s, %(now)s)""",
+        {"patch": name, "now": now_datetime()}
+    )
+    frappe.db.commit()
+    return checkpoint
+
+
+def save_checkpoint(checkpoint):
+    frappe.db.sql(
+        f"""UPDATE `{CHECKPOINT_TABLE}`
+        SET last_key = %(last_key)s, rows_done = %(rows_done)s, chunks_done = %(chunks_done)s,
+            status = %(status)s, updated_at = %(now)s
+        WHERE patch = %(patch)s""",
+        dict(checkpoint, now=now_datetime())
+    )
+
+
+def reset_checkpoint(name):
+    """Forget a patch's progress so the next run starts from the beginning"""
+    ensure_checkpoint_table()
+    frappe.db.sql(f"DELETE FROM `{CHECKPOINT_TABLE}` WHERE patch = %s", name)
+    frappe.db.commit()
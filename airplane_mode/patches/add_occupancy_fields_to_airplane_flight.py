@@ -2,6 +2,8 @@ import frappe
 from frappe.model.utils.rename_field import rename_field
 from frappe.custom.doctype.custom_field.custom_field import create_custom_fields
 
+from airplane_mode.patch_runner import BatchedPatch
+
 def execute():
     """
     Patch to add occupancy fields to Airplane Flight DocType
@@ -75,44 +77,36 @@ def add_occupancy_fields():
 
 
 def recalculate_all_flight_occupancy():
-    """Recalculate occupancy for all existing flights."""
+    """
+    Recalculate occupancy for all existing flights, one chunk of flights
+    per UPDATE. Resumable: a restarted migrate continues after the last
+    committed chunk.
+    """
     frappe.logger().info("Recalculating occupancy for all flights")
     
-    # Get all flights
-    flights = frappe.get_all("Airplane Flight", fields=["name", "capacity"])
-    
-    for flight in flights:
-        try:
-            calculate_flight_occupancy(flight.name, flight.capacity)
-        except Exception as e:
-            frappe.logger().error(f"Error calculating occupancy for flight {flight.name}: {e}")
+    patch = BatchedPatch("add_occupancy_fields_to_airplane_flight", doctype="Airplane Flight")
+    checkpoint = patch.run(update_occupancy_for_flights)
     
-    frappe.db.commit()
-    frappe.logger().info(f"Recalculated occupancy for {len(flights)} flights")
+    frappe.logger().info(f"Recalculated occupancy for {checkpoint.rows_done} flights")
 
 
-def calculate_flight_occupancy(flight_name, capacity):
-    """Calculate occupancy for a specific flight."""
-    # Count tickets for this flight (excluding cancelled tickets)
-    booked_tickets = frappe.db.count(
-        "Airplane Ticket",
-        filters={
-            "flight": flight_name,
-            "docstatus": ["!=", 2]  # Don't count cancelled tickets
-        }
-    )
-    
-    # Calculate occupancy percentage
-    occupancy_count = booked_tickets
-    occupancy_percentage = 0
-    
-    if capacity and capacity > 0:
-        occupancy_percentage = round((booked_tickets / capacity) * 100, 2)
-    
-    # Update the flight document
-    frappe.db.set_value("Airplane Flight", flight_name, {
-        "occupancy_count": occupancy_count,
-        "occupancy_percentage": occupancy_percentage
-    }, update_modified=False)
+def update_occupancy_for_flights(flights):
+    """Set occupancy for a chunk of flights from one grouped ticket count."""
+    # Cancelled tickets (docstatus 2) are not counted
+    frappe.db.sql("""
+        UPDATE `tabAirplane Flight` flight
+        LEFT JOIN (
+            SELECT flight, COUNT(*) AS booked
+            FROM `tabAirplane Ticket`
+            WHERE flight IN %(flights)s AND docstatus != 2
+            GROUP BY flight
+        ) tickets ON tickets.flight = flight.name
+        SET flight.occupancy_count = IFNULL(tickets.booked, 0),
+            flight.occupancy_percentage = CASE
+                WHEN flight.capacity > 0 THEN ROUND(IFNULL(tickets.booked, 0) / flight.capacity * 100, 2)
+                ELSE 0
+            END
+        WHERE flight.name IN %(flights)s
+    """, {"flights": tuple(flights)})
     
-    frappe.logger().debug(f"Flight {flight_name}: {occupancy_count}/{capacity} ({occupancy_percentage}%)")
+    return len(flights)
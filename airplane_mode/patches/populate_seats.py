@@ -1,29 +1,79 @@
-import random
-import string
 import frappe
 
+from airplane_mode.patch_runner import BatchedPatch
+
+LETTERS = ["A", "B", "C", "D", "E", "F"]
+
+
 def execute():
-    letters = ["A", "B", "C", "D", "E", "F"]
+    """
+    Give every open ticket without a seat the first free seat on its flight.
+    Cancelled tickets are left unseated.
+
+    Works a chunk of flights at a time: one read of the chunk's tickets,
+    seats picked in memory, one UPDATE for the chunk. Seated tickets drop
+    out of get_unseated_flights, so a restarted run simply carries on.
+    """
+    patch = BatchedPatch("populate_seats", get_keys=get_unseated_flights, count=count_unseated_flights, chunk_size=500)
+    patch.run(assign_seats)
+
+
+def get_unseated_flights(last_flight, limit):
+    return frappe.db.sql_list("""
+        SELECT DISTINCT flight
+        FROM `tabAirplane Ticket`
+        WHERE IFNULL(seat, '') = '' AND docstatus < 2 AND flight > %(last_flight)s
+        ORDER BY flight
+        LIMIT %(limit)s
+    """, {"last_flight": last_flight or "", "limit": limit})
+
 
-    tickets = frappe.get_all("Airplane Ticket", filters={"seat": ""}, fields=["name", "flight"])
+def count_unseated_flights():
+    return frappe.db.sql("""
+        SELECT COUNT(DISTINCT flight)
+        FROM `tabAirplane Ticket`
+        WHERE IFNULL(seat, '') = '' AND docstatus < 2
+    """)[0][0]
 
+
+def assign_seats(flights):
+    tickets = frappe.db.sql("""
+        SELECT name, flight, seat, docstatus
+        FROM `tabAirplane Ticket`
+        WHERE flight IN %(flights)s
+        ORDER BY flight, creation, name
+    """, {"flights": tuple(flights)}, as_dict=True)
+
+    occupied, unseated = {}, []
     for ticket in tickets:
-        existing = frappe.get_all(
-            "Airplane Ticket",
-            filters={"flight": ticket.flight, "docstatus": ["<", 2]},
-            pluck="seat"
+        if ticket.seat and ticket.docstatus < 2:
+            occupied.setdefault(ticket.flight, set()).add(ticket.seat)
+        elif not ticket.seat and ticket.docstatus < 2:
+            unseated.append(ticket)
+
+    seats, free = {}, {}
+    for ticket in unseated:
+        if ticket.flight not in free:
+            free[ticket.flight] = free_seats(occupied.get(ticket.flight, set()))
+        seats[ticket.name] = next(free[ticket.flight])
+
+    if seats:
+        frappe.db.sql(
+            f"""UPDATE `tabAirplane Ticket`
+            SET seat = CASE name {" ".join(["WHEN %s THEN %s"] * len(seats))} END
+            WHERE name IN %s""",
+            (*[value for item in seats.items() for value in item], tuple(seats))
         )
 
-        occupied = {s for s in existing if s}
-        row = 1
-        while True:
-            for letter in letters:
-                seat = f"{row}{letter}"
-                if seat not in occupied:
-                    frappe.db.set_value("Airplane Ticket", ticket.name, "seat", seat)
-                    occupied.add(seat)
-                    break
-            else:
-                row += 1
-                continue
-            break
+    return len(seats)
+
+
+def free_seats(taken):
+    """Free seats of a flight in seat order: 1A..1F, 2A.."""
+    row = 1
+    while True:
+        for letter in LETTERS:
+            seat = f"{row}{letter}"
+            if seat not in taken:
+                yield seat
+        row += 1
@@ -0,0 +1,17 @@
+# airplane_mode/patches/v1_0/add_hot_path_indexes.py
+
+import frappe
+
+def execute():
+    """
+    Add composite indexes for the hot filter paths listed in
+    airplane_mode.db_indexes.HOT_INDEXES
+    """
+    try:
+        from airplane_mode.db_indexes import ensure_hot_indexes
+        
+        ensure_hot_indexes(verbose=True)
+        
+    except Exception as e:
+        print(f"Error adding hot path indexes: {str(e)}")
+        frappe.log_error(f"Error in add_hot_path_indexes patch: {str(e)}")
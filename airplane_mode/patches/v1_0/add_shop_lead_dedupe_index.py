@@ -0,0 +1,26 @@
+# airplane_mode/patches/v1_0/add_shop_lead_dedupe_index.py
+
+import frappe
+
+def execute():
+    """
+    Add a composite index for the duplicate application lookup
+    (email, preferred_shop, status) run on every guest submission
+    """
+    try:
+        if not frappe.db.table_exists("Shop Lead"):
+            return
+        
+        columns = ["email", "preferred_shop", "status"]
+        missing = [column for column in columns if not frappe.db.has_column("Shop Lead", column)]
+        if missing:
+            print(f"Skipping Shop Lead dedupe index, missing columns: {', '.join(missing)}")
+            return
+        
+        # add_index is a no-op when the index already exists
+        frappe.db.add_index("Shop Lead", columns, index_name="lead_dedupe_index")
+        print("Added lead_dedupe_index on Shop Lead")
+        
+    except Exception as e:
+        print(f"Error adding Shop Lead dedupe index: {str(e)}")
+        frappe.log_error(f"Error in add_shop_lead_dedupe_index patch: {str(e)}")
@@ -0,0 +1,20 @@
+# airplane_mode/patches/v1_0/create_booking_curve_table.py
+
+import frappe
+
+def execute():
+    """
+    Create the packed booking curve table and backfill it from ticket
+    creation dates for flights of the last two years
+    """
+    try:
+        from frappe.utils import add_days, today
+        from airplane_mode.airplane_mode.booking_curves import backfill_booking_curves, ensure_curve_table
+        
+        ensure_curve_table()
+        flights = backfill_booking_curves(add_days(today(), -730))
+        print(f"Backfilled booking curves for {flights} flights")
+        
+    except Exception as e:
+        print(f"Error creating booking curve table: {str(e)}")
+        frappe.log_error(f"Error in create_booking_curve_table patch: {str(e)}")
@@ -0,0 +1,148 @@
+import frappe
+
+from airplane_mode.instrumentation import QueryCounter
+
+
+AIRPORT_ROLES = ["Airport Manager", "Shop Manager", "Ground Staff", "Tenant"]
+SHOP_MANAGER_ROLES = ["Airport Manager", "Shop Manager"]
+ADMIN_ROLES = ["System Manager"]
+
+
+class PermissionContext:
+    """
+    Request-scoped view of what a user may access.
+
+    Roles, owned-document checks and accessible shop sets are resolved
+    at most once per request and shared by every permission hook.
+    Each resolution that goes past the memo is counted, together with
+    the queries it issued, so the cost of permission evaluation per
+    request can be tracked.
+    """
+
+    def __init__(self, user):
+        self.user = user
+        self._roles = None
+        self._owned = {}
+        self._contracted_shops = None
+        self.resolutions = 0
+        self.queries = 0
+        self.hits = 0
+
+    def _resolve(self, fn, *args, **kwargs):
+        with QueryCounter() as counter:
+            value = fn(*args, **kwargs)
+        self.resolutions += 1
+        self.queries += counter.queries
+        return value
+
+    @property
+    def is_administrator(self):
+        return self.user == "Administrator"
+
+    @property
+    def roles(self):
+        if self._roles is None:
+            self._roles = frozenset(self._resolve(frappe.get_roles, self.user))
+        else:
+            self.hits += 1
+        return self._roles
+
+    def has_role(self, *roles):
+        user_roles = self.roles
+        return any(role in user_roles for role in roles)
+
+    @property
+    def is_system_manager(self):
+        return self.is_administrator or self.has_role(*ADMIN_ROLES)
+
+    @property
+    def is_shop_manager(self):
+        return self.has_role(*SHOP_MANAGER_ROLES)
+
+    @property
+    def has_airport_access(self):
+        return self.is_administrator or self.has_role(*AIRPORT_ROLES)
+
+    def owns(self, doctype, field="owner"):
+        """Whether the user has at least one document of doctype linked through field"""
+        key = (doctype, field)
+        if key not in self._owned:
+            self._owned[key] = bool(self._resolve(frappe.db.exists, doctype, {field: self.user}))
+        else:
+            self.hits += 1
+        return self._owned[key]
+
+    @property
+    def contracted_shops(self):
+        """Shops the user holds an active Contract Shop for"""
+        if self._contracted_shops is None:
+            self._contracted_shops = frozenset(self._resolve(
+                frappe.get_all,
+                "Contract Shop",
+                filters={"tenant_email": self.user, "status": "Active"},
+                pluck="shop"
+            ))
+        else:
+            self.hits += 1
+        return self._contracted_shops
+
+    def as_dict(self):
+        return {
+            "user": self.user,
+            "resolutions": self.resolutions,
+            "queries": self.queries,
+            "hits": self.hits
+        }
+
+
+def get_permission_context(user=None):
+    """Return the memoized permission context for user in the current request"""
+    user = user or frappe.session.user
+
+    contexts = getattr(frappe.local, "airplane_mode_permission_contexts", None)
+    if contexts is None:
+        contexts = frappe.local.airplane_mode_permission_contexts = {}
+
+    if user not in contexts:
+        contexts[user] = PermissionContext(user)
+
+    return contexts[user]
+
+
+def clear_permission_context(user=None):
+    """Drop memoized contexts, e.g. after roles change within a request"""
+    contexts = getattr(frappe.local, "airplane_mode_permission_contexts", None)
+    if not contexts:
+        return
+
+    if user:
+        contexts.pop(user, None)
+    else:
+        contexts.clear()
+
+
+def get_permission_stats():
+    """Permission evaluation counters for the current request"""
+    contexts = getattr(frappe.local, "airplane_mode_permission_contexts", None) or {}
+    users = [context.as_dict() for context in contexts.values()]
+    return {
+        "resolutions": sum(user["resolutions"] for user in users),
+        "queries": sum(user["queries"] for user in users),
+        "hits": sum(user["hits"] for user in users),
+        "users": users
+    }
+
+
+def log_permission_stats(response=None, request=None):
+    """after_request hook: record how much permission evaluation the request cost"""
+    stats = get_permission_stats()
+    if not stats["resolutions"]:
+        return
+
+    path = getattr(request, "path", None) if request else None
+    frappe.logger("airplane_mode.permissions").debug({
+        "path": path,
+        "resolutions": stats["resolutions"],
+        "queries": stats["queries"],
+        "hits": stats["hits"]
+    })
@@ -0,0 +1,224 @@
+import frappe
+
+
+# Small, rarely changing master data. Every doctype listed here needs the
+# invalidate_reference doc events in hooks.py.
+REFERENCE_DOCTYPES = ("Shop Type", "Airport", "Airline", "Airplane", "Airport Shop Settings")
+SINGLE_DOCTYPES = ("Airport Shop Settings",)
+
+VERSIONS_KEY = "airplane_mode_reference_versions"
+DATA_KEY = "airplane_mode_reference"
+STATS_KEY = "airplane_mode_reference_stats"
+STATS_FLUSH_EVERY = 100
+
+# Per-worker copies: (site, doctype) -> (version, data)
+_worker_cache = {}
+# Per-worker lookup counters: (site, doctype) -> {"hits": n, "shared": n, "loads": n}
+_worker_stats = {}
+_pending_stats = {}
+
+
+def get_versions():
+    """
+    Current version of every reference doctype, read with one cache call and
+    then kept for the rest of the web request, so lookups are plain dict
+    reads. Background jobs and the console can run for a long time, so
+    outside a request the versions are read again on every call.
+    """
+    versions = getattr(frappe.local, "airplane_mode_reference_versions", None)
+    if versions is None:
+        versions = {frappe.safe_decode(key): frappe.safe_decode(value)
+                    for key, value in (frappe.cache().hgetall(VERSIONS_KEY) or {}).items()}
+        if getattr(frappe.local, "request", None):
+            frappe.local.airplane_mode_reference_versions = versions
+    return versions
+
+
+def get_version(doctype):
+    versions = get_versions()
+    if doctype not in versions:
+        versions[doctype] = bump_version(doctype)
+    return versions[doctype]
+
+
+def bump_version(doctype):
+    version = frappe.generate_hash(length=10)
+    frappe.cache().hset(VERSIONS_KEY, doctype, version)
+    return version
+
+
+def get_reference(doctype):
+    """
+    All records of a reference doctype as {name: row}, or the values of a
+    single doctype. Served from this worker's memory while the version is
+    current, then from the site cache, then from the database. Treat the
+    result as read-only; it is shared by every caller in the worker.
+    """
+    if doctype not in REFERENCE_DOCTYPES:
+        frappe.throw(f"{doctype} is not cached reference data")
+
+    key = (frappe.local.site, doctype)
+    version = get_version(doctype)
+
+    cached = _worker_cache.get(key)
+    if cached and cached[0] == version:
+        record_lookup(key, "hits")
+        return cached[1]
+
+    shared = frappe.cache().get_value(f"{DATA_KEY}:{doctype}")
+    if shared and shared.get("version") == version:
+        data = shared["data"]
+        record_lookup(key, "shared")
+    else:
+        data = load_reference(doctype)
+        frappe.cache().set_value(f"{DATA_KEY}:{doctype}", {"version": version, "data": data})
+        record_lookup(key, "loads")
+
+    data = frappe._dict(data) if doctype in SINGLE_DOCTYPES else {
+        name: frappe._dict(row) for name, row in data.items()
+    }
+    _worker_cache[key] = (version, data)
+    return data
+
+
+def load_reference(doctype):
+    if doctype in SINGLE_DOCTYPES:
+        return frappe.db.get_singles_dict(doctype, cast=True)
+
+    rows = frappe.get_all(doctype, fields=["*"], order_by="name asc")
+    if doctype == "Shop Type":
+        # Templates and APIs read shop_type_name; the doctype field is type_name
+        for row in rows:
+            row["shop_type_name"] = row.get("type_name") or row["name"]
+
+    return {row["name"]: dict(row) for row in rows}
+
+
+def get_reference_doc(doctype, name):
+    """
+    One cached record as a read-only dict, or None. Records created earlier
+    in the same transaction are not in the cached copy until it commits, so
+    a miss falls back to the database.
+    """
+    if not name:
+        return None
+
+    row = get_reference(doctype).get(name)
+    if row is None and doctype not in SINGLE_DOCTYPES:
+        row = frappe.db.get_value(doctype, name, "*", as_dict=True)
+        if row and doctype == "Shop Type":
+            row["shop_type_name"] = row.get("type_name") or row["name"]
+    return row
+
+
+def get_reference_value(doctype, name, fieldname, default=None):
+    row = get_reference_doc(doctype, name)
+    return row.get(fieldname, default) if row else default
+
+
+def get_reference_list(doctype, filters=None, fields=None, order_by=None, limit=None):
+    """
+    get_all-style listing over the cached records. Filters are plain
+    equality; order_by is "field" or "field desc". Returns copies.
+    """
+    rows = list(get_reference(doctype).values())
+
+    for fieldname, value in (filters or {}).items():
+        rows = [row for row in rows if row.get(fieldname) == value]
+
+    if order_by:
+        fieldname, _, direction = order_by.partition(" ")
+        rows.sort(key=lambda row: (row.get(fieldname) is None, row.get(fieldname) or ""),
+                  reverse=direction.strip().lower() == "desc")
+
+    if limit:
+        rows = rows[:int(limit)]
+
+    if fields:
+        return [frappe._dict({fieldname: row.get(fieldname) for fieldname in fields}) for row in rows]
+    return [frappe._dict(row) for row in rows]
+
+
+def get_settings(doctype="Airport Shop Settings"):
+    return get_reference(doctype)
+
+
+def invalidate_reference(doc, method=None):
+    """Doc event for reference doctypes: publish a new version once the change commits"""
+    doctype = doc.doctype
+
+    def bump():
+        bump_version(doctype)
+        versions = getattr(frappe.local, "airplane_mode_reference_versions", None)
+        if versions is not None:
+            versions.pop(doctype, None)
+
+    frappe.db.after_commit.add(bump)
+
+
+def record_lookup(key, outcome):
+    counters = _worker_stats.setdefault(key, {"hits": 0, "shared": 0, "loads": 0})
+    counters[outcome] += 1
+
+    pending = _pending_stats.setdefault(key, {"hits": 0, "shared": 0, "loads": 0})
+    pending[outcome] += 1
+    if outcome != "hits" or pending["hits"] >= STATS_FLUSH_EVERY:
+        flush_stats(key)
+
+
+def flush_stats(key):
+    """Add this worker's pending counters to the site-wide totals"""
+    pending = _pending_stats.pop(key, None)
+    if not pending:
+        return
+
+    site, doctype = key
+    try:
+        cache = frappe.cache()
+        for outcome, count in pending.items():
+            if count:
+                cache.incrby(cache.make_key(f"{STATS_KEY}:{doctype}:{outcome}"), count)
+    except Exception:
+        # Metrics must never break a lookup
+        pass
+
+
+def summarize_counters(counters):
+    lookups = sum(counters.values())
+    return dict(counters, lookups=lookups, hit_rate=round(counters["hits"] / lookups, 4) if lookups else None)
+
+
+@frappe.whitelist()
+def get_reference_cache_stats():
+    """Hit rates per reference doctype: site-wide totals and this worker's counters"""
+    frappe.only_for("System Manager")
+
+    cache = frappe.cache()
+    site = frappe.local.site
+    versions = get_versions()
+    stats = {}
+
+    for doctype in REFERENCE_DOCTYPES:
+        flush_stats((site, doctype))
+        site_counters = {
+            outcome: int(cache.get(cache.make_key(f"{STATS_KEY}:{doctype}:{outcome}")) or 0)
+            for outcome in ("hits", "shared", "loads")
+        }
+        stats[doctype] = {
+            "version": versions.get(doctype),
+            "site": summarize_counters(site_counters),
+            "worker": summarize_counters(_worker_stats.get((site, doctype), {"hits": 0, "shared": 0, "loads": 0}))
+        }
+
+    return stats
+
+
+@frappe.whitelist()
+def clear_reference_cache():
+    """Force every worker to reload reference data on its next lookup"""
+    frappe.only_for("System Manager")
+
+    for doctype in REFERENCE_DOCTYPES:
+        bump_version(doctype)
+    frappe.local.airplane_mode_reference_versions = None
+    return {"status": "success"}
@@ -0,0 +1,753 @@
+"""
+Seeded synthetic data for load testing and benchmarks.
+
+Generates flights, tickets, shops, leases, contracts, Monthly Invoices and
+leads at production scale. Rows are written with frappe.db.bulk_insert, so
+controllers and doc events do not run; every derived field they would
+maintain (occupancy, codes, lease durations, payment status) is computed
+here instead. Doctypes in the same dependency level are generated in
+parallel worker processes.
+
+The same seed, scale and anchor date always produce the same rows and
+names. All names carry the dataset prefix so a dataset can be dropped again.
+
+    bench --site <site> generate-synthetic-data --scale medium --seed 42
+"""
+
+import calendar
+import json
+import math
+import multiprocessing
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+
+import frappe
+from frappe.utils import add_months, getdate
+
+
+SCALES = {
+    "tiny": {
+        "airlines": 3, "airports": 6, "airplanes": 10, "passengers": 1_000, "flights": 100,
+        "shops": 50, "leads": 200
+    },
+    "small": {
+        "airlines": 8, "airports": 20, "airplanes": 60, "passengers": 20_000, "flights": 2_000,
+        "shops": 500, "leads": 5_000
+    },
+    "medium": {
+        "airlines": 20, "airports": 60, "airplanes": 400, "passengers": 250_000, "flights": 25_000,
+        "shops": 5_000, "leads": 100_000
+    },
+    "large": {
+        "airlines": 40, "airports": 150, "airplanes": 2_000, "passengers": 2_000_000, "flights": 200_000,
+        "shops": 25_000, "leads": 1_000_000
+    }
+}
+
+DEFAULT_PREFIX = "SYN"
+CHUNK_SIZE = 5_000
+
+AIRPLANE_MODELS = [
+    ("A320neo", 180), ("A321neo", 220), ("B737-800", 189), ("B737 MAX 8", 178),
+    ("A330-300", 300), ("B787-9", 290), ("ATR 72-600", 72), ("E190", 100)
+]
+
+SHOP_TYPES = [
+    # (type, share of inventory, rent per sq ft per month)
+    ("Retail", 0.35, 420), ("Food & Beverage", 0.30, 380), ("Duty Free", 0.10, 560),
+    ("Electronics", 0.10, 460), ("Services", 0.10, 300), ("Lounge", 0.05, 250)
+]
+
+LEAD_STATUSES = [("Open", 0.30), ("Contacted", 0.25), ("Interested", 0.15), ("Converted", 0.10), ("Lost", 0.20)]
+
+# Tenant payment behaviour: (profile, share, min days late, max days late, chance of never paying)
+PAYER_PROFILES = [
+    ("punctual", 0.70, -5, 0, 0.0),
+    ("late", 0.22, 3, 40, 0.02),
+    ("chronic", 0.08, 20, 90, 0.25)
+]
+
+TICKET_PRICE_PER_MINUTE = 55
+INVOICE_DUE_DAY = 5
+
+
+class GenerationPlan(frappe._dict):
+    """Everything a worker needs to generate its doctype deterministically"""
+
+
+def get_plan(scale="small", seed=42, prefix=DEFAULT_PREFIX, anchor_date=None, overrides=None):
+    if scale not in SCALES:
+        frappe.throw(f"Unknown scale {scale}, choose one of {', '.join(SCALES)}")
+
+    counts = dict(SCALES[scale])
+    counts.update({key: int(value) for key, value in (overrides or {}).items() if value})
+
+    return GenerationPlan({
+        "scale": scale,
+        "seed": int(seed),
+        "prefix": prefix,
+        "anchor_date": str(getdate(anchor_date)),
+        "counts": counts,
+        # Airport and Flight Passenger use autoincrement names; new rows start after existing ones
+        "airport_base": get_autoincrement_base("Airport"),
+        "passenger_base": get_autoincrement_base("Flight Passenger")
+    })
+
+
+def get_autoincrement_base(doctype):
+    if not frappe.db.table_exists(doctype):
+        return 0
+    return int(frappe.db.sql(f"SELECT IFNULL(MAX(name), 0) FROM `tab{doctype}`")[0][0])
+
+
+def get_rng(plan, key):
+    return random.Random(f"{plan.seed}:{key}")
+
+
+def weighted_choice(rng, choices):
+    """Pick from [(value, weight, ...)] tuples"""
+    return rng.choices(choices, weights=[choice[1] for choice in choices])[0]
+
+
+def seasonal_factor(date):
+    """Demand multiplier: peaks in late spring/summer and the December holidays"""
+    day = date.timetuple().tm_yday
+    summer = math.exp(-((day - 190) / 45) ** 2)
+    holidays = math.exp(-((day - 355) / 12) ** 2) + math.exp(-((day + 10) / 12) ** 2)
+    weekday = 1.08 if date.weekday() in (4, 6) else 0.95 if date.weekday() in (1, 2) else 1.0
+    return (0.8 + 0.35 * summer + 0.3 * holidays) * weekday
+
+
+def make_row(plan, name, creation, docstatus=0, **fields):
+    row = {
+        "name": name,
+        "owner": "Administrator",
+        "modified_by": "Administrator",
+        "creation": creation,
+        "modified": creation,
+        "docstatus": docstatus
+    }
+    row.update(fields)
+    return row
+
+
+def get_anchor(plan):
+    return datetime.combine(getdate(plan.anchor_date), datetime.min.time())
+
+
+# Level 0: no dependencies
+
+def generate_airlines(plan, rng):
+    for i in range(plan.counts["airlines"]):
+        yield make_row(
+            plan, f"{plan.prefix} Air {i + 1:03d}", get_anchor(plan) - timedelta(days=900),
+            founding_year=rng.randint(1950, 2015),
+            customer_care_number=f"+91-80-{rng.randint(10000000, 99999999)}",
+            headquarters=rng.choice(["Mumbai", "Delhi", "Bengaluru", "Dubai", "Singapore", "London"]),
+            website=f"https://{plan.prefix.lower()}air{i + 1}.example.com"
+        )
+
+
+def generate_airports(plan, rng):
+    for i in range(plan.counts["airports"]):
+        code = get_airport_code(plan, i)
+        yield make_row(
+            plan, plan.airport_base + i + 1, get_anchor(plan) - timedelta(days=900),
+            code=code,
+            city=f"City {code}",
+            country=rng.choice(["India", "India", "India", "UAE", "Singapore", "United Kingdom"]),
+            airport_name=f"{code} International Airport"
+        )
+
+
+def get_airport_code(plan, i):
+    letters = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+    return plan.prefix[0] + letters[(i // 26) % 26] + letters[i % 26]
+
+
+def generate_shop_types(plan, rng):
+    for shop_type, share, rate in SHOP_TYPES:
+        yield make_row(
+            plan, get_shop_type_name(plan, shop_type), get_anchor(plan) - timedelta(days=900),
+            type_name=get_shop_type_name(plan, shop_type),
+            enabled=1,
+            description=f"Synthetic {shop_type} outlets"
+        )
+
+
+def get_shop_type_name(plan, shop_type):
+    return f"{plan.prefix} {shop_type}"
+
+
+def generate_passengers(plan, rng):
+    first_names = ["Aarav", "Diya", "Kabir", "Meera", "Rohan", "Sara", "Vikram", "Zoya", "Arjun", "Isha"]
+    last_names = ["Sharma", "Iyer", "Khan", "Patel", "Reddy", "Das", "Singh", "Nair", "Gupta", "Rao"]
+    anchor = get_anchor(plan)
+
+    for i in range(plan.counts["passengers"]):
+        yield make_row(
+            plan, plan.passenger_base + i + 1, anchor - timedelta(days=rng.randint(30, 900)),
+            first_name=rng.choice(first_names),
+            last_name=rng.choice(last_names),
+            date_of_birth=(anchor - timedelta(days=rng.randint(18 * 365, 80 * 365))).date(),
+            contact_number=f"+91-9{rng.randint(100000000, 999999999)}"
+        )
+
+
+# Level 1: depend on level 0 names only
+
+def generate_airplanes(plan, rng):
+    for i in range(plan.counts["airplanes"]):
+        airline = f"{plan.prefix} Air {i % plan.counts['airlines'] + 1:03d}"
+        model, capacity = rng.choice(AIRPLANE_MODELS)
+        yield make_row(
+            plan, get_airplane_name(plan, i), get_anchor(plan) - timedelta(days=800),
+            model=model,
+            airline=airline,
+            capacity=capacity,
+            initial_audit_completed=1
+        )
+
+
+def get_airplane_name(plan, i):
+    return f"{plan.prefix}-AP-{i + 1:05d}"
+
+
+def generate_shops(plan, rng):
+    """Shops across airports; roughly three quarters are let, a few are under maintenance"""
+    for i in range(plan.counts["shops"]):
+        shop_type, share, rate = weighted_choice(rng, SHOP_TYPES)
+        # Hub airports carry most of the inventory
+        airport_index = (int(rng.paretovariate(1.2)) - 1) % plan.counts["airports"]
+        code = get_airport_code(plan, airport_index)
+        area = round(min(rng.lognormvariate(6.0, 0.5), 6000), 1)
+        status = weighted_choice(rng, [("Occupied", 0.74), ("Available", 0.22), ("Maintenance", 0.04)])[0]
+        name = get_shop_name(plan, i)
+        # Occupied shops carry their tenant, as the lease sync would leave them
+        occupied = status == "Occupied"
+
+        yield make_row(
+            plan, name, get_anchor(plan) - timedelta(days=rng.randint(400, 1200)),
+            shop_number=f"{code}-{i + 1:05d}",
+            shop_name=f"{shop_type} {code} {i + 1}",
+            shop_type=get_shop_type_name(plan, shop_type),
+            shop_type_name=get_shop_type_name(plan, shop_type),
+            airport=plan.airport_base + airport_index + 1,
+            airport_name=f"{code} International Airport",
+            status=status,
+            tenant=get_tenant_full_name(plan, name) if occupied else "",
+            contact_number=get_tenant_phone(rng) if occupied else "",
+            area=area,
+            rent_per_month=round(area * rate * rng.uniform(0.85, 1.2), -2),
+            description=f"{shop_type} unit at {code}, {area} sq ft"
+        )
+
+
+def get_shop_name(plan, i):
+    return f"{plan.prefix}-SHOP-{i + 1:06d}"
+
+
+# Level 2: read their parents back from the database
+
+def generate_flights(plan, rng):
+    """
+    Flights spread over the year before and the quarter after the anchor
+    date, with seasonal demand driving both the schedule and load factors
+    """
+    anchor = get_anchor(plan)
+    start = anchor - timedelta(days=365)
+    days = [start + timedelta(days=offset) for offset in range(365 + 90)]
+    weights = [seasonal_factor(day) for day in days]
+
+    airplanes = frappe.get_all(
+        "Airplane",
+        filters={"name": ["like", f"{plan.prefix}-AP-%"]},
+        fields=["name", "airline", "capacity"],
+        order_by="name"
+    )
+    airports = plan.counts["airports"]
+
+    for i, day in enumerate(sorted(rng.choices(days, weights=weights, k=plan.counts["flights"]))):
+        airplane = airplanes[rng.randrange(len(airplanes))]
+        source = rng.randrange(airports)
+        destination = (source + rng.randrange(1, airports)) % airports
+        departure_hour = weighted_choice(rng, [(6, 3), (8, 4), (11, 2), (14, 2), (17, 4), (20, 3), (23, 1)])[0]
+        duration = rng.randint(50, 300) * 60
+        is_past = day < anchor
+
+        status = "Cancelled" if rng.random() < 0.015 else ("Completed" if is_past else "Scheduled")
+        load_factor = 0 if status == "Cancelled" else get_load_factor(rng, day, anchor)
+        occupancy = int(airplane.capacity * load_factor)
+        name = f"{plan.prefix}-FL-{i + 1:08d}"
+
+        yield make_row(
+            plan, name, day - timedelta(days=120), docstatus=1,
+            airplane=airplane.name,
+            date_of_departure=day.date(),
+            time_of_departure=f"{departure_hour:02d}:{rng.choice([0, 15, 30, 45]):02d}:00",
+            duration=duration,
+            status=status,
+            source_airport=plan.airport_base + source + 1,
+            destination_airport=plan.airport_base + destination + 1,
+            source_airport_code=get_airport_code(plan, source),
+            destination_airport_code=get_airport_code(plan, destination),
+            route=f"flights/{name}",
+            is_published=1,
+            airline=airplane.airline,
+            capacity=airplane.capacity,
+            occupancy_count=occupancy,
+            occupancy_percentage=round(occupancy / airplane.capacity * 100, 2) if airplane.capacity else 0,
+            gate_number=f"{rng.choice('ABCD')}{rng.randint(1, 40)}"
+        )
+
+
+def get_load_factor(rng, day, anchor):
+    """Seasonal load factor; future flights are only partly sold, following the booking curve"""
+    load = min(0.98, max(0.25, rng.gauss(0.62 + 0.2 * (seasonal_factor(day) - 0.8), 0.08)))
+    days_out = (day - anchor).days
+    if days_out > 0:
+        load *= booked_share(days_out)
+    return load
+
+
+def booked_share(days_out):
+    """Share of final bookings already made this many days before departure"""
+    return math.exp(-days_out / 28)
+
+
+def generate_leases(plan, rng):
+    """One Shop Lease Contract per occupied shop, plus completed history for some shops"""
+    anchor = get_anchor(plan)
+    shops = frappe.get_all(
+        "Airport Shop",
+        filters={"name": ["like", f"{plan.prefix}-SHOP-%"]},
+        fields=["name", "status", "rent_per_month"],
+        order_by="name"
+    )
+
+    i = 0
+    for shop in shops:
+        leases = []
+        if shop.status == "Occupied":
+            months = rng.choice([12, 24, 36, 60])
+            start = add_months(anchor.date(), -rng.randint(0, months - 1)).replace(day=1)
+            leases.append((start, months, "Active"))
+        if rng.random() < 0.4:
+            months = rng.choice([12, 24, 36])
+            before = leases[0][0] if leases else anchor.date().replace(day=1)
+            leases.append((add_months(before, -months), months, "Completed"))
+
+        for start, months, status in leases:
+            i += 1
+            end = add_months(start, months) - timedelta(days=1)
+            remaining = max(0, (end.year - anchor.year) * 12 + end.month - anchor.month) if status == "Active" else 0
+            yield make_row(
+                plan, f"{plan.prefix}-LEASE-{i:07d}", datetime.combine(start, datetime.min.time()) - timedelta(days=20),
+                docstatus=1,
+                contract_shop=shop.name,
+                tenant=get_tenant_name(plan, shop.name),
+                rent_amount=shop.rent_per_month,
+                start_date=start,
+                end_date=end,
+                status=status,
+                lease_duration=months,
+                remaining_months=remaining,
+                total_paid_amount=0,
+                outstanding_amount=0
+            )
+
+
+def get_tenant_name(plan, shop_name):
+    return shop_name.replace(f"{plan.prefix}-SHOP-", f"{plan.prefix}-TEN-")
+
+
+def get_tenant_full_name(plan, shop_name):
+    return f"Tenant {get_tenant_name(plan, shop_name).rsplit('-', 1)[-1]}"
+
+
+def get_tenant_phone(rng):
+    return f"+91-9{rng.randint(100000000, 999999999)}"
+
+
+def generate_tenants(plan, rng):
+    """
+    One tenant per shop, not only the let ones: completed lease history is
+    generated for some vacant shops too, and every lease needs its tenant.
+    Tenants have no Customer, so shops show the tenant's full name.
+    """
+    shops = frappe.get_all(
+        "Airport Shop",
+        filters={"name": ["like", f"{plan.prefix}-SHOP-%"]},
+        fields=["name", "status", "creation", "contact_number"],
+        order_by="name"
+    )
+    for shop in shops:
+        name = get_tenant_name(plan, shop.name)
+        number = name.rsplit("-", 1)[-1]
+        yield make_row(
+            plan, name, shop.creation,
+            full_name=get_tenant_full_name(plan, shop.name),
+            email=f"tenant{number}@{plan.prefix.lower()}.example.com",
+            phone_number=shop.contact_number or get_tenant_phone(rng),
+            shop=shop.name,
+            contract_start_date=shop.creation.date(),
+            contract_end_date=add_months(shop.creation.date(), 36)
+        )
+
+
+def generate_leads(plan, rng):
+    """Leads arrive on a seasonal curve over the past year and prefer available shops"""
+    anchor = get_anchor(plan)
+    available = frappe.get_all(
+        "Airport Shop",
+        filters={"name": ["like", f"{plan.prefix}-SHOP-%"], "status": "Available"},
+        pluck="name",
+        order_by="name"
+    )
+    days = [anchor - timedelta(days=offset) for offset in range(365)]
+    weights = [seasonal_factor(day) for day in days]
+
+    for i in range(plan.counts["leads"]):
+        created = rng.choices(days, weights=weights)[0] + timedelta(minutes=rng.randint(0, 1439))
+        age_days = (anchor - created).days
+        status = weighted_choice(rng, LEAD_STATUSES)[0] if age_days > 14 else "Open"
+        yield make_row(
+            plan, f"{plan.prefix}-LEAD-{i + 1:08d}", created,
+            lead_name=f"Applicant {i + 1}",
+            email=f"lead{i + 1}@{plan.prefix.lower()}.example.com",
+            phone=f"+91-8{rng.randint(100000000, 999999999)}",
+            preferred_shop=rng.choice(available) if available and rng.random() < 0.8 else None,
+            preferred_shop_type=get_shop_type_name(plan, weighted_choice(rng, SHOP_TYPES)[0]),
+            business_type=rng.choice(["Retail", "Food", "Services", "Franchise"]),
+            status=status,
+            source=rng.choice(["Website", "Website Application", "Referral", "Walk-in"])
+        )
+
+
+# Level 3: depend on level 2 rows
+
+def generate_tickets(plan, rng):
+    """
+    Tickets for every flight, matching its occupancy_count. Booking times
+    follow the booking curve; past flights are boarded and submitted.
+    """
+    anchor = get_anchor(plan)
+    passengers = plan.counts["passengers"]
+    seat_letters = "ABCDEF"
+    i = 0
+
+    for flights in iter_chunks("Airplane Flight", plan, f"{plan.prefix}-FL-%", [
+        "name", "date_of_departure", "time_of_departure", "duration", "status", "destination_airport",
+        "source_airport_code", "destination_airport_code", "occupancy_count", "gate_number"
+    ]):
+        for flight in flights:
+            departure = datetime.combine(flight.date_of_departure, datetime.min.time())
+            base_price = max(2500, int(flight.duration / 60 * TICKET_PRICE_PER_MINUTE * seasonal_factor(departure)))
+            is_past = departure < anchor
+
+            for seat in range(flight.occupancy_count or 0):
+                i += 1
+                days_out = min(int(rng.expovariate(1 / 28)), 180)
+                booked_on = min(departure - timedelta(days=days_out, minutes=rng.randint(0, 1439)), anchor)
+                price = int(base_price * (1.6 if days_out < 7 else 1.2 if days_out < 21 else 1.0) * rng.uniform(0.9, 1.1))
+                add_ons = rng.choice([0, 0, 0, 350, 600, 1200])
+
+                if is_past:
+                    status, docstatus = "Boarded", 1
+                else:
+                    status, docstatus = ("Checked-In" if (departure - anchor).days < 1 and rng.random() < 0.5 else "Booked"), 0
+
+                yield make_row(
+                    plan, f"{plan.prefix}-TK-{i:09d}", booked_on, docstatus=docstatus,
+                    passenger=plan.passenger_base + rng.randrange(passengers) + 1,
+                    destination_airport=flight.destination_airport,
+                    source_airport_code=flight.source_airport_code,
+                    destination_airport_code=flight.destination_airport_code,
+                    flight=flight.name,
+                    departure_date=flight.date_of_departure,
+                    departure_time=flight.time_of_departure,
+                    duration_of_flight=flight.duration,
+                    status=status,
+                    seat=f"{seat // len(seat_letters) + 1}{seat_letters[seat % len(seat_letters)]}",
+                    flight_price=price,
+                    total_price=price + add_ons,
+                    gate_number=flight.gate_number
+                )
+
+
+def generate_invoices(plan, rng):
+    """
+    Monthly Invoices for every lease month up to the anchor date.
+    Each tenant gets a payer profile, so late payers and arrears cluster
+    on the same tenants the way they do in production.
+    """
+    anchor = get_anchor(plan).date()
+    i = 0
+
+    for leases in iter_chunks("Shop Lease Contract", plan, f"{plan.prefix}-LEASE-%", [
+        "name", "tenant", "contract_shop", "rent_amount", "start_date", "end_date"
+    ]):
+        for lease in leases:
+            profile, share, min_late, max_late, default_rate = weighted_choice(get_rng(plan, lease.tenant), PAYER_PROFILES)
+            month = lease.start_date.replace(day=1)
+            last_month = min(lease.end_date, anchor).replace(day=1)
+
+            while month <= last_month:
+                i += 1
+                due = month.replace(day=INVOICE_DUE_DAY)
+                paid_on = due + timedelta(days=rng.randint(min_late, max_late))
+
+                if rng.random() < default_rate or paid_on > anchor:
+                    status, paid_on = ("Overdue" if due < anchor else "Unpaid"), None
+                else:
+                    status = "Paid"
+
+                yield make_row(
+                    plan, f"{plan.prefix}-INV-{i:09d}", datetime.combine(month, datetime.min.time()), docstatus=1,
+                    contract=lease.name,
+                    tenant_name=lease.tenant,
+                    shop_details=lease.contract_shop,
+                    month=f"{calendar.month_name[month.month]} {month.year}",
+                    due_date=due,
+                    invoice_date=month,
+                    invoice_amount=lease.rent_amount,
+                    payment_status=status,
+                    payment_mode=rng.choice(["Bank Transfer", "UPI", "Cheque"]) if paid_on else None,
+                    payment_date=paid_on
+                )
+                month = add_months(month, 1)
+
+
+def generate_contract_shops(plan, rng):
+    """Contract Shop records mirroring each lease"""
+    anchor = get_anchor(plan).date()
+    i = 0
+
+    for leases in iter_chunks("Shop Lease Contract", plan, f"{plan.prefix}-LEASE-%", [
+        "name", "tenant", "contract_shop", "rent_amount", "start_date", "end_date", "status"
+    ]):
+        for lease in leases:
+            i += 1
+            number = lease.tenant.rsplit("-", 1)[-1]
+            yield make_row(
+                plan, f"{plan.prefix}-CSH-{i:07d}", datetime.combine(lease.start_date, datetime.min.time()),
+                shop_name=lease.contract_shop,
+                tenant_name=f"Tenant {number}",
+                start_date=lease.start_date,
+                end_date=lease.end_date,
+                monthly_rent=lease.rent_amount,
+                security_deposit=lease.rent_amount * 3,
+                status="Active" if lease.end_date >= anchor and lease.status == "Active" else "Expired",
+                tenant_email=f"tenant{number}@{plan.prefix.lower()}.example.com"
+            )
+
+
+def iter_chunks(doctype, plan, name_pattern, fields, chunk_size=CHUNK_SIZE):
+    """Stream parent rows in name order without loading them all at once"""
+    last_name = ""
+    while True:
+        rows = frappe.get_all(
+            doctype,
+            filters=[["name", "like", name_pattern], ["name", ">", last_name]],
+            fields=fields,
+            order_by="name asc",
+            limit_page_length=chunk_size
+        )
+        if not rows:
+            return
+        yield rows
+        last_name = rows[-1].name
+
+
+# Specs: (doctype, dependency level, generator)
+TABLES = {
+    "airlines": ("Airline", 0, generate_airlines),
+    "airports": ("Airport", 0, generate_airports),
+    "shop_types": ("Shop Type", 0, generate_shop_types),
+    "passengers": ("Flight Passenger", 0, generate_passengers),
+    "airplanes": ("Airplane", 1, generate_airplanes),
+    "shops": ("Airport Shop", 1, generate_shops),
+    "flights": ("Airplane Flight", 2, generate_flights),
+    "tenants": ("Tenant", 2, generate_tenants),
+    "leases": ("Shop Lease Contract", 2, generate_leases),
+    "leads": ("Shop Lead", 2, generate_leads),
+    "tickets": ("Airplane Ticket", 3, generate_tickets),
+    "invoices": ("Monthly Invoice", 3, generate_invoices),
+    "contract_shops": ("Contract Shop", 3, generate_contract_shops)
+}
+
+
+def get_columns(doctype, row):
+    """Columns of row that exist on this site's table"""
+    table_columns = set(frappe.db.get_table_columns(doctype))
+    return [column for column in row if column in table_columns]
+
+
+def generate_table(key, plan):
+    """Generate and bulk insert one doctype, committing per chunk. Returns rows written and timing."""
+    doctype, level, generator = TABLES[key]
+    if not frappe.db.table_exists(doctype):
+        return {"table": key, "doctype": doctype, "skipped": "table does not exist"}
+
+    started = time.perf_counter()
+    rows = generator(plan, get_rng(plan, key))
+    columns, chunk, written = None, [], 0
+
+    for row in rows:
+        if columns is None:
+            columns = get_columns(doctype, row)
+        chunk.append(tuple(row.get(column) for column in columns))
+        if len(chunk) >= CHUNK_SIZE:
+            written += write_chunk(doctype, columns, chunk)
+            chunk = []
+
+    if chunk:
+        written += write_chunk(doctype, columns, chunk)
+
+    elapsed = time.perf_counter() - started
+    return {
+        "table": key,
+        "doctype": doctype,
+        "rows": written,
+        "seconds": round(elapsed, 2),
+        "rows_per_s": round(written / elapsed) if elapsed else 0
+    }
+
+
+def write_chunk(doctype, columns, chunk):
+    frappe.db.bulk_insert(doctype, columns, chunk, ignore_duplicates=True)
+    frappe.db.commit()
+    return len(chunk)
+
+
+def generate_table_in_worker(site, sites_path, key, plan):
+    """Entry point for worker processes: each opens its own site connection"""
+    frappe.init(site=site, sites_path=sites_path)
+    frappe.connect()
+    try:
+        return generate_table(key, GenerationPlan(plan))
+    finally:
+        frappe.destroy()
+
+
+def generate(scale="small", seed=42, prefix=DEFAULT_PREFIX, anchor_date=None, workers=None, only=None,
+             overrides=None):
+    """
+    Generate a full dataset level by level. Tables within a level run in
+    parallel processes; the next level starts once its parents are written.
+    Returns the plan and per-table results.
+    """
+    plan = get_plan(scale, seed, prefix, anchor_date, overrides)
+    selected = [key for key in TABLES if not only or key in only]
+    workers = int(workers or min(multiprocessing.cpu_count(), 4))
+    results = []
+
+    frappe.db.commit()
+    for level in sorted({TABLES[key][1] for key in selected}):
+        keys = [key for key in selected if TABLES[key][1] == level]
+
+        if workers <= 1 or len(keys) == 1:
+            results.extend(generate_table(key, plan) for key in keys)
+            continue
+
+        with ProcessPoolExecutor(max_workers=min(workers, len(keys)), mp_context=multiprocessing.get_context("spawn")) as pool:
+            futures = [
+                pool.submit(generate_table_in_worker, frappe.local.site, frappe.local.sites_path, key, dict(plan))
+                for key in keys
+            ]
+            results.extend(future.result() for future in futures)
+
+    after_generate(selected)
+    save_manifest(plan, results)
+
+    frappe.logger("airplane_mode.synthetic_data").info({"plan": dict(plan), "results": results})
+    return {"plan": dict(plan), "results": results}
+
+
+def after_generate(selected):
+    """Refresh derived state that per-document hooks would normally keep current"""
+    advance_autoincrement_sequences(selected)
+
+    if "shops" in selected:
+        from airplane_mode.airport_shop_management.shop_search import rebuild_search_index
+        rebuild_search_index()
+
+    from airplane_mode.airport_stats import bump_stats_version
+    bump_stats_version()
+    frappe.clear_cache()
+
+
+def advance_autoincrement_sequences(selected):
+    """
+    Rows for autoincrement doctypes are bulk inserted with explicit ids, which
+    does not consume the doctype's id sequence. Move the sequence past the
+    largest id so the next insert() does not reuse a generated name.
+    """
+    from frappe.database.sequence import set_next_val
+
+    for key, doctype in (("airports", "Airport"), ("passengers", "Flight Passenger")):
+        if key not in selected or not frappe.db.table_exists(doctype):
+            continue
+        last_id = get_autoincrement_base(doctype)
+        if last_id:
+            set_next_val(doctype, last_id, is_val_used=True)
+
+
+def get_manifest_path(prefix):
+    return frappe.get_site_path("private", "synthetic_data", f"{prefix}.json")
+
+
+def save_manifest(plan, results):
+    """Record the plan so the dataset, including autoincrement rows, can be dropped later"""
+    path = get_manifest_path(plan.prefix)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump({"plan": dict(plan), "results": results}, f, indent=1, default=str)
+
+
+def load_manifest(prefix):
+    path = get_manifest_path(prefix)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def drop(prefix=DEFAULT_PREFIX):
+    """Delete every row generated with prefix, children first"""
+    manifest = load_manifest(prefix)
+    plan = GenerationPlan(manifest["plan"]) if manifest else None
+    deleted = {}
+
+    for key in reversed(list(TABLES)):
+        doctype = TABLES[key][0]
+        if not frappe.db.table_exists(doctype):
+            continue
+
+        if key in ("airports", "passengers"):
+            # Autoincrement names carry no prefix; use the id range from the manifest
+            if not plan:
+                continue
+            base = plan.airport_base if key == "airports" else plan.passenger_base
+            filters = {"name": ["between", [base + 1, base + plan.counts[key]]]}
+        elif key == "shop_types":
+            filters = {"name": ["like", f"{prefix} %"]}
+        elif key == "airlines":
+            filters = {"name": ["like", f"{prefix} Air %"]}
+        else:
+            filters = {"name": ["like", f"{prefix}-%"]}
+
+        deleted[doctype] = frappe.db.count(doctype, filters)
+        frappe.db.delete(doctype, filters)
+        frappe.db.commit()
+
+    if manifest:
+        os.remove(get_manifest_path(prefix))
+
+    # Id sequences are left where they are: moving them back after the
+    # delete could hand out ids that are still referenced elsewhere
+    after_generate(["shops"])
+    return deleted
@@ -3,6 +3,9 @@ from frappe import _
 from frappe.utils import get_datetime, getdate, format_datetime
 from frappe.utils.password import get_decrypted_password
 
+from airplane_mode.airport_stats import compute_stats, get_cached_stats, get_stats_token
+from airplane_mode.permission_context import get_permission_context
+
 
 def boot_session(bootinfo):
     """
@@ -17,17 +20,21 @@ def boot_session(bootinfo):
     except Exception:
         site_url = frappe.local.site or "localhost"
     
+    context = get_permission_context(user)
+    airport_access = context.has_airport_access
+    
     # Add user-specific airport management data
     bootinfo.airport_data = {
-        "user_roles": frappe.get_roles(user),
+        "user_roles": list(context.roles),
         "site_url": site_url,
         "user_email": user,
-        "has_airport_access": has_airport_access(user)
+        "has_airport_access": airport_access
     }
     
-    # Add quick stats for dashboard
-    if has_airport_access(user):
-        bootinfo.airport_stats = get_quick_stats()
+    # Stats are not computed on the boot path; boot carries the cached
+    # numbers if warm and a version token, see airport_stats.get_airport_stats
+    if airport_access:
+        bootinfo.airport_stats = get_stats_token()
     
     # Add notification preferences
     bootinfo.notification_settings = get_user_notification_settings(user)
@@ -37,16 +44,7 @@ def has_airport_access(user=None):
     """
     Check if user has access to airport management features
     """
-    if not user:
-        user = frappe.session.user
-    
-    if user == "Administrator":
-        return True
-        
-    user_roles = frappe.get_roles(user)
-    airport_roles = ["Airport Manager", "Shop Manager", "Ground Staff", "Tenant"]
-    
-    return any(role in user_roles for role in airport_roles)
+    return get_permission_context(user).has_airport_access
 
 
 def get_quick_stats():
@@ -54,13 +52,7 @@ def get_quick_stats():
     Get quick statistics for the airport management dashboard
     """
     try:
-        stats = {
-            "total_shops": frappe.db.count("Airport Shop"),
-            "available_shops": frappe.db.count("Airport Shop", {"status": "Available"}),
-            "active_contracts": frappe.db.count("Contract Shop", {"status": "Active"}),
-            "pending_leads": frappe.db.count("Shop Lead", {"status": "Open"})
-        }
-        return stats
+        return (get_cached_stats() or compute_stats())["stats"]
     except Exception:
         return {}
 
@@ -70,7 +62,7 @@ def get_user_notification_settings(user):
     Get user notification preferences
     """
     try:
-        settings = frappe.db.get_value(
+        settings = frappe.get_cached_value(
             "User", 
             user, 
             ["email", "phone", "enabled"], 
@@ -233,20 +225,6 @@ def days_until(date):
         return 0
 
 
-def before_job(job_name):
-    """
-    Execute before scheduled job
-    """
-    frappe.log_error(f"Starting job: {job_name}", "Job Start")
-
-
-def after_job(job_name):
-    """
-    Execute after scheduled job
-    """
-    frappe.log_error(f"Completed job: {job_name}", "Job Complete")
-
-
 def get_portal_menu_items(user=None):
     """
     Get custom portal menu items for airport management
@@ -255,7 +233,7 @@ def get_portal_menu_items(user=None):
         user = frappe.session.user
         
     menu_items = []
-    user_roles = frappe.get_roles(user)
+    user_roles = get_permission_context(user).roles
     
     if "Tenant" in user_roles:
         menu_items.extend([
@@ -1,6 +1,8 @@
 import frappe
 from frappe import _
 
+from airplane_mode.permission_context import get_permission_context
+
 
 def get_context(context):
     """
@@ -16,12 +18,12 @@ def get_context(context):
         context.login_url = "/login"
     else:
         context.show_login_prompt = False
+        permission_context = get_permission_context()
         context.user_name = frappe.get_value("User", frappe.session.user, "full_name")
-        context.user_roles = frappe.get_roles(frappe.session.user)
+        context.user_roles = list(permission_context.roles)
         
         # Check if user has airport access
-        from airplane_mode.utils import has_airport_access
-        context.has_access = has_airport_access(frappe.session.user)
+        context.has_access = permission_context.has_airport_access
         
         if not context.has_access:
             context.no_access = True
@@ -78,7 +80,7 @@ def get_context(context):
     context.nav_items = []
     
     if frappe.session.user != "Guest":
-        user_roles = frappe.get_roles(frappe.session.user)
+        user_roles = get_permission_context().roles
         
         if "Airport Manager" in user_roles or "Shop Manager" in user_roles:
             context.nav_items.extend([
@@ -1,6 +1,8 @@
 import frappe
 from frappe import _
 
+from airplane_mode.reference_cache import get_reference_list
+
 
 def get_context(context):
     """
@@ -31,7 +33,7 @@ def get_context(context):
     
     # Get available shop types for dropdown
     try:
-        context.shop_types = frappe.get_all(
+        context.shop_types = get_reference_list(
             "Shop Type",
             fields=["name", "shop_type_name", "description"],
             order_by="shop_type_name"
@@ -53,8 +55,10 @@ def get_context(context):
     # Handle form submission
     if frappe.form_dict.get('submit_application'):
         try:
-            create_shop_lead(frappe.form_dict)
+            submit_application(frappe.form_dict)
             context.success_message = _("Your application has been submitted successfully! We will contact you soon.")
+        except (frappe.TooManyRequestsError, frappe.DuplicateEntryError) as e:
+            context.error_message = str(e)
         except Exception as e:
             context.error_message = _("There was an error submitting your application. Please try again.")
             frappe.log_error(f"Shop application error: {str(e)}")
@@ -62,6 +66,22 @@ def get_context(context):
     return context
 
 
+def submit_application(form_data):
+    """
+    Pass the application through the lead intake layer (rate limits,
+    idempotency keys, duplicate check) before creating the lead
+    """
+    from airplane_mode.airport_shop_management.lead_intake import submit_lead
+    
+    preferred_shop = form_data.get('preferred_shop')
+    return submit_lead(
+        preferred_shop if preferred_shop != 'any' else None,
+        form_data.get('email'),
+        lambda: {"lead_id": create_shop_lead(form_data).name},
+        idempotency_key=form_data.get('idempotency_key')
+    )
+
+
 def create_shop_lead(form_data):
     """
     Create a new Shop Lead from the application form
@@ -109,14 +129,20 @@ def submit_shop_application():
                 frappe.throw(_("Please fill all required fields"))
         
         # Create the lead
-        lead = create_shop_lead(frappe.form_dict)
+        result = submit_application(frappe.form_dict)
         
         return {
             "success": True,
             "message": _("Application submitted successfully!"),
-            "lead_id": lead.name
+            "lead_id": result.get("lead_id")
         }
         
+    except frappe.TooManyRequestsError as e:
+        frappe.local.response["http_status_code"] = 429
+        return {
+            "success": False,
+            "message": str(e)
+        }
     except Exception as e:
         frappe.log_error(f"Shop application API error: {str(e)}")
         return {
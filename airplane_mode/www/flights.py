@@ -1,14 +1,13 @@
 # apps/airplane_mode/airplane_mode/www/flights.py
 import frappe
+from frappe.utils import cint
+
+from airplane_mode.airplane_mode.departures_board import DEFAULT_WINDOW_HOURS, REALTIME_EVENT, get_board
 
 def get_context(context):
-    context.docs = frappe.get_all(
-        "Airplane Flight",
-        filters={"is_published": 1},
-        fields=[
-            "name", "route", "airplane",
-            "source_airport_code", "destination_airport_code",
-            "date_of_departure", "time_of_departure", "duration"
-        ],
-        order_by="date_of_departure asc, time_of_departure asc"
-    )
+    # Served from the departures board cache; guest HTML is cached by
+    # flight_page_cache and dropped whenever a listed flight changes
+    context.hours = DEFAULT_WINDOW_HOURS
+    context.airports = get_board(hours=context.hours)
+    context.realtime_event = REALTIME_EVENT
+    context.no_cache = 1
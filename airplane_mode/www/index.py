@@ -1,6 +1,8 @@
 import frappe
 from frappe import _
 
+from airplane_mode.reference_cache import get_reference, get_reference_list
+
 
 def get_context(context):
     """
@@ -24,7 +26,7 @@ def get_context(context):
             "total_shops": frappe.db.count("Airport Shop"),
             "available_shops": frappe.db.count("Airport Shop", {"status": "Available"}),
             "active_flights": frappe.db.count("Airplane Flight", {"status": "Scheduled"}),
-            "shop_types": frappe.db.count("Shop Type")
+            "shop_types": len(get_reference("Shop Type"))
         }
     except Exception:
         context.stats = {
@@ -36,7 +38,7 @@ def get_context(context):
     
     # Get featured shop types
     try:
-        context.shop_types = frappe.get_all(
+        context.shop_types = get_reference_list(
             "Shop Type",
             fields=["shop_type_name", "description"],
             limit=6
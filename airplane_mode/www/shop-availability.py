@@ -1,5 +1,9 @@
 import frappe
 from frappe import _
+from frappe.utils import flt
+
+from airplane_mode.airport_shop_management.shop_search import MAX_PAGE_SIZE, search as search_shops
+from airplane_mode.reference_cache import get_reference_list
 
 
 def get_context(context):
@@ -10,45 +14,41 @@ def get_context(context):
     context.description = _("Browse available retail spaces at the airport")
     
     # Get filter parameters
+    search_query = frappe.form_dict.get('q')
     shop_type_filter = frappe.form_dict.get('shop_type')
+    airport_filter = frappe.form_dict.get('airport')
+    terminal_filter = frappe.form_dict.get('terminal')
+    rent_band_filter = frappe.form_dict.get('rent_band')
     min_area = frappe.form_dict.get('min_area')
     max_rent = frappe.form_dict.get('max_rent')
     
-    # Build filters
-    filters = {"status": "Available"}
-    if shop_type_filter:
-        filters["shop_type"] = shop_type_filter
-    if min_area:
-        filters["area"] = [">=", int(min_area)]
-    
-    # Get available shops
+    # Get available shops from the search index
     try:
-        available_shops = frappe.get_all(
-            "Airport Shop",
-            filters=filters,
-            fields=[
-                "name", "shop_name", "shop_type", "area", "location", 
-                "rent_per_month", "description", "image"
-            ],
-            order_by="rent_per_month asc"
+        result = search_shops(
+            query=search_query,
+            shop_type=shop_type_filter,
+            airport=airport_filter,
+            terminal=terminal_filter,
+            rent_band=rent_band_filter,
+            min_area=flt(min_area) if min_area else None,
+            max_rent=flt(max_rent) if max_rent else None,
+            limit=MAX_PAGE_SIZE,
+            order_by=None if search_query else "rent_per_month"
         )
         
-        # Filter by max rent if specified
-        if max_rent:
-            max_rent_val = int(max_rent)
-            available_shops = [shop for shop in available_shops if (shop.rent_per_month or 0) <= max_rent_val]
-        
-        context.available_shops = available_shops
-        context.total_available = len(available_shops)
+        context.available_shops = result["results"]
+        context.total_available = result["total"]
+        context.facets = result["facets"]
         
     except Exception as e:
         frappe.log_error(f"Shop availability error: {str(e)}")
         context.available_shops = []
         context.total_available = 0
+        context.facets = {}
     
     # Get shop types for filter dropdown
     try:
-        context.shop_types = frappe.get_all(
+        context.shop_types = get_reference_list(
             "Shop Type",
             fields=["name", "shop_type_name"],
             order_by="shop_type_name"
@@ -78,7 +78,11 @@ def get_context(context):
     
     # Current filters for display
     context.current_filters = {
+        "q": search_query,
         "shop_type": shop_type_filter,
+        "airport": airport_filter,
+        "terminal": terminal_filter,
+        "rent_band": rent_band_filter,
         "min_area": min_area,
         "max_rent": max_rent
     }
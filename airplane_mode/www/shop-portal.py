@@ -1,6 +1,8 @@
 import frappe
 from frappe import _
 
+from airplane_mode.reference_cache import get_reference_list
+
 
 def get_context(context):
     """
@@ -36,7 +38,7 @@ def get_context(context):
     
     # Get shop types for filters
     try:
-        context.shop_types = frappe.get_all(
+        context.shop_types = get_reference_list(
             "Shop Type",
             fields=["name", "shop_type_name"],
             order_by="shop_type_name"